@@ -0,0 +1,317 @@
+# headless query API -- downstream jobs ke liye, UI scrape ya SQL dobara likhne ki zaroorat nahi
+# asyncio server (sirf stdlib, HTTP/1.1 keep-alive); har DB kaam thread pool me, shared read-only
+# ConnectionPool (db_pool.py) ke saath. Queries wahi jo dashboards chalate hai: queries.read_rows (fetch_data),
+# build_grid_select (map grid), profile_agg.depth_profile, aur NL sawaal template -> cache -> Ollama, sql_guard se.
+#
+#   python api.py --db argo.db --port 8765
+#   curl 'localhost:8765/query?lat=8,20&lon=60,75&depth=0,100&time=2020-01-01,2020-12-31&limit=1000'
+#   curl 'localhost:8765/query?lat=8,20&lon=60,75&format=arrow' -o rows.arrows
+#   curl 'localhost:8765/profile?lat=8,20&lon=60,75&depth=0,2000'
+#   curl 'localhost:8765/nl?q=average+temperature+in+the+arabian+sea+in+2020'
+#
+# endpoints: /health, /query, /grid, /profile, /nl (GET, query string; /nl bhi POST {"q": ...})
+# format=json (default) ya format=arrow (Arrow IPC stream) -- ya "Accept: application/vnd.apache.arrow.stream"
+import argparse
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from db_pool import DEFAULT_POOL_SIZE, ConnectionPool
+from grid_agg import DEFAULT_TARGET_CELLS, add_cell_centers, cell_size
+from nl_cache import CACHE_PATH, NLSQLCache
+from nl_sql import DEFAULT_TIMEOUT, MODEL, GenerationCancelled, GenerationTimeout, schema_hash, stream_sql
+from nl_templates import parse_question
+from profile_agg import depth_profile
+from queries import TABLE_NAME, build_grid_select, compact_codes, read_rows, use_rtree_for
+from sql_guard import DEFAULT_TIME_BUDGET, QueryRejected, QueryTimeout, run_guarded
+
+DB_PATH = "argo.db"
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 5000
+MAX_LIMIT = 200_000
+MAX_BODY = 64 * 1024
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+# bina filter ke = poora globe / saari depths
+DEFAULT_LAT = (-90.0, 90.0)
+DEFAULT_LON = (-180.0, 360.0)
+DEFAULT_DEPTH = (0.0, 12000.0)
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+               502: "Bad Gateway", 504: "Gateway Timeout"}
+
+
+class BadRequest(ValueError):
+    """Malformed query parameter (400)."""
+
+
+class NotFound(LookupError):
+    """Unknown route, or data this DB doesn't have (404)."""
+
+
+def parse_range(params: Dict[str, str], name: str, default=None, cast=float):
+    """``lat=8,20`` -> (8.0, 20.0); missing -> default."""
+    raw = params.get(name)
+    if raw is None or raw == "":
+        return default
+    parts = [p.strip() for p in raw.split(",")]
+    if len(parts) != 2:
+        raise BadRequest(f"{name} must be 'lo,hi'")
+    try:
+        lo, hi = cast(parts[0]), cast(parts[1])
+    except ValueError as e:
+        raise BadRequest(f"bad {name}: {e}") from e
+    return (lo, hi) if cast is str or lo <= hi else (hi, lo)
+
+
+def parse_int(params: Dict[str, str], name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        value = int(params.get(name, default))
+    except ValueError as e:
+        raise BadRequest(f"{name} must be an integer") from e
+    return max(lo, min(value, hi))
+
+
+def parse_filters(params: Dict[str, str]):
+    """(lat_rng, lon_rng, depth_rng, t_range) with the dashboard's semantics (time = inclusive dates)."""
+    t_range = parse_range(params, "time", cast=str)
+    if t_range:
+        try:
+            pd.to_datetime(list(t_range))
+        except (ValueError, TypeError) as e:
+            raise BadRequest(f"bad time: {e}") from e
+    return (parse_range(params, "lat", DEFAULT_LAT), parse_range(params, "lon", DEFAULT_LON),
+            parse_range(params, "depth", DEFAULT_DEPTH), t_range)
+
+
+def frame_body(df: pd.DataFrame, fmt: str, meta: Optional[Dict[str, object]] = None) -> Tuple[str, bytes]:
+    """(content type, body) -- JSON {"columns", "data", "rows", ...meta} or an Arrow IPC stream."""
+    if fmt == "arrow":
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if meta:
+            table = table.replace_schema_metadata({k: json.dumps(v, default=str) for k, v in meta.items()})
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ARROW_MIME, sink.getvalue()
+    payload = json.loads(df.to_json(orient="split", index=False, date_format="iso"))
+    payload = {**(meta or {}), "rows": len(df), **payload}
+    return "application/json", json.dumps(payload).encode()
+
+
+class QueryAPI:
+    """Routes -> blocking handlers run on the thread pool; the event loop only does I/O."""
+
+    def __init__(self, db_path: str = DB_PATH, table: str = TABLE_NAME, workers: int = DEFAULT_POOL_SIZE,
+                 time_budget: float = DEFAULT_TIME_BUDGET, llm_timeout: float = DEFAULT_TIMEOUT,
+                 cache_path: Optional[str] = CACHE_PATH):
+        self.table = table
+        self.time_budget = time_budget
+        self.llm_timeout = llm_timeout
+        # har worker thread ko ek connection -- pool checkout kabhi wait nahi karta
+        self.pool = ConnectionPool(db_path, size=workers)
+        self.db_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        # Ollama calls alag pool me -- slow model DB queries ke threads nahi gherta
+        self.llm_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm")
+        self.nl_cache = NLSQLCache(cache_path) if cache_path else None
+        self.routes = {"/health": self.health, "/query": self.query, "/grid": self.grid,
+                       "/profile": self.profile, "/nl": self.nl}
+        self.requests = 0
+        self.started = time.time()
+
+    # ---------- handlers (thread pool) ----------
+    def health(self, params: Dict[str, str]):
+        return {"ok": True, "uptime_s": round(time.time() - self.started, 1), "requests": self.requests,
+                "pool": self.pool.stats()}
+
+    def query(self, params: Dict[str, str]):
+        lat, lon, depth, t_range = parse_filters(params)
+        limit = parse_int(params, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+        with self.pool.connection() as conn:
+            return read_rows(conn, lat, lon, depth, t_range, table=self.table, limit=limit), {"limit": limit}
+
+    def grid(self, params: Dict[str, str]):
+        lat, lon, depth, t_range = parse_filters(params)
+        cell = cell_size(lat, lon, parse_int(params, "cells", DEFAULT_TARGET_CELLS, 1, 100_000))
+        with self.pool.connection() as conn:
+            use_rtree = use_rtree_for(conn, self.table, t_range)
+            codes = compact_codes(conn, lat, lon, depth, t_range, self.table)
+            sql, sql_params = build_grid_select(lat, lon, depth, t_range, table=self.table, cell=cell,
+                                                use_rtree=use_rtree, codes=codes)
+            cells = pd.read_sql(sql, conn, params=sql_params)
+        return add_cell_centers(cells, lat, lon, cell), {"cell_deg": cell}
+
+    def profile(self, params: Dict[str, str]):
+        lat, lon, depth, t_range = parse_filters(params)
+        with self.pool.connection() as conn:
+            prof = depth_profile(conn, lat, lon, depth, t_range, table=self.table)
+        if prof is None:
+            raise NotFound("this database has no argo_profile_agg table (rebuild with ingest.py)")
+        return prof, {}
+
+    def nl_fast(self, question: str) -> Optional[Tuple[str, list, str]]:
+        """(sql, params, source) from the template parser or the NL cache, else None."""
+        template = parse_question(question, table=self.table)
+        if template:
+            return template["sql"], template["params"], "template"
+        cached = self.nl_cache.get(question, MODEL, schema_hash()) if self.nl_cache else None
+        return (cached["sql"], [], "cache") if cached else None
+
+    def nl_llm(self, question: str) -> Tuple[str, list, str]:
+        """Ask Ollama (blocking, streamed until the SQL is complete); nl() caches it once it has run."""
+        return stream_sql(question, timeout=self.llm_timeout), [], "llm"
+
+    def nl(self, params: Dict[str, str], resolved: Optional[Tuple[str, list, str]] = None):
+        question = (params.get("q") or "").strip()
+        if not question:
+            raise BadRequest("q (the question) is required")
+        limit = parse_int(params, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+        sql, sql_params, source = resolved or self.nl_fast(question) or self.nl_llm(question)
+        with self.pool.connection() as conn:
+            df, report = run_guarded(conn, sql, sql_params, max_rows=limit, time_budget=self.time_budget)
+        # dashboard jaisa -- model ka SQL tabhi cache hota hai jab guard ne chala diya (reject / error wala nahi)
+        if source == "llm" and self.nl_cache:
+            self.nl_cache.put(question, MODEL, schema_hash(), sql, None)
+        return df, {"question": question, "source": source, "sql": report["sql"], "params": sql_params,
+                    "truncated": report["truncated"], "elapsed_ms": round(report["elapsed_ms"], 1)}
+
+    def call(self, path: str, params: Dict[str, str], resolved=None) -> Tuple[int, str, bytes]:
+        """Run one route; exceptions -> HTTP status + JSON error."""
+        handler = self.routes.get(path)
+        try:
+            if handler is None:
+                raise NotFound(f"no route {path} (have {', '.join(sorted(self.routes))})")
+            fmt = params.get("format", "json")
+            if fmt not in ("json", "arrow"):
+                raise BadRequest("format must be json or arrow")
+            out = handler(params, resolved) if resolved is not None else handler(params)
+            if isinstance(out, dict):
+                return 200, "application/json", json.dumps(out, default=str).encode()
+            df, meta = out
+            return (200, *frame_body(df, fmt, meta))
+        except Exception as e:
+            return self.error(e)
+
+    @staticmethod
+    def error(e: Exception) -> Tuple[int, str, bytes]:
+        """Exception -> (status, content type, JSON error body)."""
+        if isinstance(e, BadRequest):
+            status, error = 400, str(e)
+        elif isinstance(e, NotFound):
+            status, error = 404, str(e)
+        elif isinstance(e, QueryRejected):
+            status, error = 422, f"query rejected: {e}"
+        elif isinstance(e, (QueryTimeout, GenerationTimeout)):
+            status, error = 504, str(e)
+        elif isinstance(e, (GenerationCancelled, ConnectionError)):
+            status, error = 502, f"model error: {e}"
+        else:
+            status, error = 500, f"{type(e).__name__}: {e}"
+        return status, "application/json", json.dumps({"error": error}).encode()
+
+    # ---------- HTTP (event loop) ----------
+    async def dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes
+                       ) -> Tuple[int, str, bytes]:
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if method == "POST" and body:
+            try:
+                params.update({k: str(v) for k, v in json.loads(body).items()})
+            except (ValueError, AttributeError):
+                return 400, "application/json", b'{"error": "body must be a JSON object"}'
+        elif method not in ("GET", "POST"):
+            return 405, "application/json", b'{"error": "use GET or POST"}'
+        if "format" not in params and ARROW_MIME in headers.get("accept", ""):
+            params["format"] = "arrow"
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        path = url.path.rstrip("/") or "/"
+        resolved = None
+        question = (params.get("q") or "").strip()
+        if path == "/nl" and question:
+            # template / cache DB threads pe; sirf cache miss hi Ollama wale (chhote) pool me jata hai
+            try:
+                resolved = await loop.run_in_executor(self.db_executor, self.nl_fast, question)
+                if resolved is None:
+                    resolved = await loop.run_in_executor(self.llm_executor, self.nl_llm, question)
+            except Exception as e:
+                return self.error(e)
+        return await loop.run_in_executor(self.db_executor, self.call, path, params, resolved)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """One client connection; HTTP/1.1 keep-alive until the client closes or sends Connection: close."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, ctype, payload = 413, "application/json", b'{"error": "body too large"}'
+                    keep = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, ctype, payload = await self.dispatch(method, target, headers, body)
+                    keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\nContent-Type: {ctype}\r\n"
+                        f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n")
+                writer.write(head.encode("latin-1") + payload)
+                await writer.drain()
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"🌊 FloatChat API on http://{host}:{port} (routes: {', '.join(sorted(self.routes))})")
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        self.db_executor.shutdown(wait=False, cancel_futures=True)
+        self.llm_executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless JSON / Arrow query API over argo.db")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--table", default=TABLE_NAME)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_POOL_SIZE, help="DB threads (= pooled connections)")
+    parser.add_argument("--time-budget", type=float, default=DEFAULT_TIME_BUDGET, help="seconds per /nl query")
+    parser.add_argument("--llm-timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--no-nl-cache", action="store_true")
+    args = parser.parse_args()
+
+    api = QueryAPI(args.db, args.table, args.workers, args.time_budget, args.llm_timeout,
+                   cache_path=None if args.no_nl_cache else CACHE_PATH)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+# benchmark suite -- synthetic Argo NetCDF (same TAXIS/ZAX/YAXIS/XAXIS/TEMP/SAL names) banake har stage ka
+# time aur peak memory naapta hai: flatten, ingest, index build, bbox query (fetch_data jaisi), profile, export
+# har stage alag (spawn) process me chalta hai, taki peak RSS sirf usi stage ka ho. Result JSON me;
+# --compare purane JSON se regression pakadta hai (exit code 1).
+#
+# usage:  python bench.py --size small --out bench_small.json
+#         python bench.py --shape 12 27 180 360 --stages ingest index query      (~2 crore cells, full grid jaisa)
+#         python bench.py --size small --compare bench_small.json --tolerance 0.25
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from flatten import VAR_DEPTH, VAR_LAT, VAR_LON, VAR_SAL, VAR_TEMP, VAR_TIME
+
+# (time, depth, lat, lon)
+SIZES: Dict[str, Tuple[int, int, int, int]] = {
+    "tiny": (2, 5, 20, 20),             # 4k cells
+    "small": (4, 10, 60, 80),           # 192k
+    "medium": (12, 20, 120, 160),       # 4.6M
+    "large": (12, 27, 180, 360),        # 21M -- 1.9 crore wale full grid jitna
+}
+STAGES = ("flatten", "flatten_frame", "ingest", "index", "query", "profile", "export")
+DEFAULT_STAGES = ("flatten", "ingest", "index", "query", "profile", "export")
+LAT_RANGE = (-40.0, 40.0)
+LON_RANGE = (30.0, 120.0)
+# bbox queries: chhota / region / almost-global, date range ke saath aur bina
+QUERY_BOXES = {
+    "small_box": ((10.0, 15.0), (80.0, 85.0)),
+    "region_box": ((5.0, 22.0), (80.0, 95.0)),
+    "wide_box": ((-35.0, 35.0), (35.0, 115.0)),
+}
+QUERY_REPEAT = 5
+QUERY_MAX_ROWS = 5000
+
+
+# ---------- synthetic data ----------
+
+def make_synthetic(path: str, shape: Tuple[int, int, int, int], seed: int = 0, land: float = 0.25) -> Dict[str, int]:
+    """Write a synthetic grid with the real variable names, one time step at a time (low memory).
+
+    Temperature falls off with depth and latitude, salinity varies
+    smoothly, plus noise; about ``land`` of the lat/lon cells are NaN land.
+    """
+    from netCDF4 import Dataset
+
+    nt, nz, ny, nx = shape
+    rng = np.random.default_rng(seed)
+    depth = np.round(np.geomspace(5, 2000, nz), 1) if nz > 1 else np.array([5.0])
+    lat = np.linspace(*LAT_RANGE, ny)
+    lon = np.linspace(*LON_RANGE, nx)
+    yy, xx = np.meshgrid(lat, lon, indexing="ij")
+    # smooth blobs => land mask (ek hi saare time/depth pe, jaise asli grid)
+    blobs = np.sin(np.radians(yy) * 7) * np.cos(np.radians(xx) * 5)
+    is_land = blobs > np.quantile(blobs, 1 - land) if land > 0 else np.zeros_like(blobs, dtype=bool)
+    with Dataset(path, "w") as nc:
+        for name, n in ((VAR_TIME, nt), (VAR_DEPTH, nz), (VAR_LAT, ny), (VAR_LON, nx)):
+            nc.createDimension(name, n)
+        t = nc.createVariable(VAR_TIME, "f8", (VAR_TIME,))
+        t.units = "days since 2010-01-01 00:00:00"
+        t[:] = np.arange(nt) * 30.0
+        for name, vals in ((VAR_DEPTH, depth), (VAR_LAT, lat), (VAR_LON, lon)):
+            nc.createVariable(name, "f8", (name,))[:] = vals
+        dims = (VAR_TIME, VAR_DEPTH, VAR_LAT, VAR_LON)
+        temp = nc.createVariable(VAR_TEMP, "f4", dims, fill_value=np.float32(-1e34))
+        sal = nc.createVariable(VAR_SAL, "f4", dims, fill_value=np.float32(-1e34))
+        surface = 28.0 - 0.25 * np.abs(yy)
+        for i in range(nt):
+            z = depth[:, None, None]
+            t_i = surface[None] * np.exp(-z / 800.0) + 2.0 + rng.normal(0, 0.3, (nz, ny, nx))
+            s_i = 34.5 + 0.4 * np.sin(np.radians(xx))[None] + 0.0005 * z + rng.normal(0, 0.05, (nz, ny, nx))
+            t_i[:, is_land] = np.nan
+            s_i[:, is_land] = np.nan
+            temp[i] = np.ma.masked_invalid(t_i.astype("float32"))
+            sal[i] = np.ma.masked_invalid(s_i.astype("float32"))
+    return {"cells": int(np.prod(shape)), "bytes": os.path.getsize(path)}
+
+
+# ---------- stages (spawn child me chalte hai) ----------
+
+def stage_flatten(ctx: Dict[str, object]) -> Dict[str, object]:
+    """Streaming flatten (what ingest uses): iterate every slab, keep nothing."""
+    import xarray as xr
+
+    from flatten import iter_flat_chunks
+
+    rows = 0
+    with xr.open_dataset(ctx["nc"]) as ds:
+        for cols in iter_flat_chunks(ds, depth_chunk=5):
+            rows += len(cols["depth"])
+    return {"rows": rows}
+
+
+def stage_flatten_frame(ctx: Dict[str, object]) -> Dict[str, object]:
+    """Whole grid into one DataFrame (old pickle path) -- memory grows with the grid."""
+    import xarray as xr
+
+    from flatten import flatten_dataset
+
+    with xr.open_dataset(ctx["nc"]) as ds:
+        df = flatten_dataset(ds)
+    return {"rows": len(df), "frame_mb": df.memory_usage(deep=True).sum() / 1e6}
+
+
+def stage_ingest(ctx: Dict[str, object]) -> Dict[str, object]:
+    from ingest import ingest_files
+
+    stats = ingest_files([ctx["nc"]], ctx["db"], replace=True, index=False, verbose=False)
+    return {"rows": stats["rows"], "db_mb": os.path.getsize(ctx["db"]) / 1e6}
+
+
+def stage_index(ctx: Dict[str, object]) -> Dict[str, object]:
+    import sqlite3
+
+    from queries import build_indexes
+
+    conn = sqlite3.connect(ctx["db"], isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        build_indexes(conn)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return {"db_mb": os.path.getsize(ctx["db"]) / 1e6}
+
+
+def _timed(fn: Callable[[], int], repeat: int) -> Dict[str, float]:
+    times, rows = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fn()
+        times.append(1000 * (time.perf_counter() - t0))
+    times.sort()
+    return {"rows": rows, "median_ms": statistics.median(times), "max_ms": times[-1], "min_ms": times[0]}
+
+
+def stage_query(ctx: Dict[str, object]) -> Dict[str, object]:
+    """dashboard.fetch_data's SQL path for each QUERY_BOXES box, with and without a date range."""
+    import sqlite3
+
+    import pandas as pd
+
+    from queries import COL_TIME, build_select, use_rtree_for
+
+    conn = sqlite3.connect(f"file:{ctx['db']}?mode=ro", uri=True)
+    out = {}
+    try:
+        t_range = ctx["t_range"]
+        for name, (lat, lon) in QUERY_BOXES.items():
+            for suffix, tr in (("", None), ("_dated", t_range)):
+                use_rtree = use_rtree_for(conn, "argo_data", tr)
+                sql, params = build_select(lat, lon, (0, 1000), tr, limit=QUERY_MAX_ROWS, use_rtree=use_rtree)
+                out[name + suffix] = _timed(lambda: len(pd.read_sql(sql, conn, params=params,
+                                                                    parse_dates=[COL_TIME])), QUERY_REPEAT)
+    finally:
+        conn.close()
+    return {"queries": out, "median_ms": statistics.median(q["median_ms"] for q in out.values())}
+
+
+def stage_profile(ctx: Dict[str, object]) -> Dict[str, object]:
+    """Exact depth profile per box from argo_profile_agg (profile_agg.depth_profile)."""
+    import sqlite3
+
+    from profile_agg import depth_profile
+
+    conn = sqlite3.connect(f"file:{ctx['db']}?mode=ro", uri=True)
+    out = {}
+    try:
+        for name, (lat, lon) in QUERY_BOXES.items():
+            out[name] = _timed(lambda: len(depth_profile(conn, lat, lon, (0, 2000), ctx["t_range"])),
+                               QUERY_REPEAT)
+    finally:
+        conn.close()
+    return {"queries": out, "median_ms": statistics.median(q["median_ms"] for q in out.values())}
+
+
+def stage_export(ctx: Dict[str, object]) -> Dict[str, object]:
+    """Full region_box query -> csv.gz and parquet through export.py's chunked writer."""
+    from export import sql_chunks, write_chunks
+    from queries import build_select
+
+    lat, lon = QUERY_BOXES["region_box"]
+    sql, params = build_select(lat, lon, (0, 2000), None)
+    out = {}
+    for fmt, comp, suffix in (("csv", "gzip", ".csv.gz"), ("parquet", "zstd", ".parquet")):
+        path = os.path.join(ctx["work"], "export" + suffix)
+        t0 = time.perf_counter()
+        rows = write_chunks(sql_chunks(ctx["db"], sql, params), path, fmt, comp)
+        out[fmt] = {"rows": rows, "seconds": time.perf_counter() - t0, "mb": os.path.getsize(path) / 1e6}
+    return {"formats": out, "rows": out["csv"]["rows"]}
+
+
+STAGE_FUNCS: Dict[str, Callable[[Dict[str, object]], Dict[str, object]]] = {
+    "flatten": stage_flatten, "flatten_frame": stage_flatten_frame, "ingest": stage_ingest,
+    "index": stage_index, "query": stage_query, "profile": stage_profile, "export": stage_export,
+}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KiB me deta hai, macOS bytes me
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_measured(stage: str, ctx: Dict[str, object], trace: bool) -> Dict[str, object]:
+    """Child process: run one stage, return its result + seconds + memory."""
+    import tracemalloc
+
+    # imports pehle, taki baseline me interpreter + libraries aa jaye aur stage ka apna hissa alag dikhe
+    import pandas  # noqa: F401
+    import xarray  # noqa: F401
+    base = _peak_rss_mb()
+    if trace:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    result = STAGE_FUNCS[stage](ctx)
+    seconds = time.perf_counter() - t0
+    result.update({"seconds": seconds, "peak_rss_mb": _peak_rss_mb(), "rss_baseline_mb": base})
+    result["stage_rss_mb"] = result["peak_rss_mb"] - base
+    if trace:
+        result["py_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    if result.get("rows") and "median_ms" not in result:
+        result["rows_per_sec"] = result["rows"] / seconds if seconds else 0.0
+    return result
+
+
+def run_stage(stage: str, ctx: Dict[str, object], trace: bool = False) -> Dict[str, object]:
+    # har stage naye process me => ru_maxrss pichle stage ka peak nahi dikhata
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_measured, stage, ctx, trace).result()
+
+
+# ---------- suite / compare ----------
+
+def git_version() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(shape: Tuple[int, int, int, int], stages: Sequence[str] = DEFAULT_STAGES,
+              work_dir: Optional[str] = None, seed: int = 0, trace: bool = False,
+              verbose: bool = True) -> Dict[str, object]:
+    """Generate the grid, run ``stages`` in order, return the JSON-ready result dict."""
+    work = work_dir or tempfile.mkdtemp(prefix="argo_bench_")
+    os.makedirs(work, exist_ok=True)
+    ctx = {"nc": os.path.join(work, "synthetic.nc"), "db": os.path.join(work, "bench.db"), "work": work,
+           # pehle do time steps -- dated queries ke liye
+           "t_range": ("2010-01-01", "2010-01-31")}
+    t0 = time.perf_counter()
+    gen = make_synthetic(ctx["nc"], shape, seed=seed)
+    gen["seconds"] = time.perf_counter() - t0
+    if verbose:
+        print(f"generated {' x '.join(map(str, shape))} = {gen['cells']:,} cells "
+              f"({gen['bytes'] / 1e6:,.1f} MB) in {gen['seconds']:.1f}s -> {work}")
+    # query / profile / export ko DB chahiye, index ko bhi; zaroorat ho to ingest khud jodo.
+    # query bina index ke full scan naapti -- to query ke saath index bhi
+    needs_db = {"index", "query", "profile", "export"}
+    stages = list(stages)
+    if "query" in stages and "index" not in stages:
+        stages.append("index")
+    if needs_db & set(stages) and "ingest" not in stages:
+        stages.append("ingest")
+    results = {}
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        results[stage] = run_stage(stage, ctx, trace=trace)
+        if verbose:
+            r = results[stage]
+            speed = f"{r['median_ms']:.1f} ms median" if "median_ms" in r else \
+                f"{r.get('rows_per_sec', 0):,.0f} rows/s" if r.get("rows_per_sec") else ""
+            print(f"  {stage:<14} {r['seconds']:8.2f}s  peak {r['peak_rss_mb']:8.1f} MB "
+                  f"(+{r['stage_rss_mb']:.1f})  {speed}")
+    return {
+        "version": git_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "shape": {"time": shape[0], "depth": shape[1], "lat": shape[2], "lon": shape[3]},
+        "cells": gen["cells"],
+        "generate": gen,
+        "stages": results,
+    }
+
+
+# lower is better for all of these
+COMPARE_KEYS = ("seconds", "median_ms", "peak_rss_mb")
+
+
+def compare(new: Dict[str, object], old: Dict[str, object], tolerance: float = 0.2) -> List[str]:
+    """Stage metrics that got worse than ``old`` by more than ``tolerance`` (0.2 = 20%)."""
+    if new.get("shape") != old.get("shape"):
+        return [f"shape differs ({old.get('shape')} vs {new.get('shape')}) -- not comparable"]
+    worse = []
+    for stage, r in new["stages"].items():
+        prev = old.get("stages", {}).get(stage)
+        if not prev:
+            continue
+        for key in COMPARE_KEYS:
+            if key not in r or key not in prev or not prev[key]:
+                continue
+            ratio = r[key] / prev[key]
+            # bahut chhote timings (<50 ms) me noise zyada hai
+            small = key in ("seconds",) and max(r[key], prev[key]) < 0.05
+            if ratio > 1 + tolerance and not small:
+                worse.append(f"{stage}.{key}: {prev[key]:.3g} -> {r[key]:.3g} ({ratio:.2f}x)")
+    return worse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark flatten / ingest / index / query / profile / export")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--size", choices=sorted(SIZES), default="small")
+    size.add_argument("--shape", nargs=4, type=int, metavar=("TIME", "DEPTH", "LAT", "LON"))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(DEFAULT_STAGES),
+                        help="ingest is added when a stage needs the DB, index when query is asked for")
+    parser.add_argument("--work-dir", help="where the synthetic .nc / .db go (default: a temp dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also record Python-heap peak (slower)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="fail (exit 1) if slower / bigger than this run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression for --compare")
+    args = parser.parse_args()
+
+    shape = tuple(args.shape) if args.shape else SIZES[args.size]
+    result = run_suite(shape, args.stages, args.work_dir, args.seed, args.tracemalloc)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ results -> {args.out}")
+    else:
+        print(json.dumps(result, indent=2))
+    if args.compare:
+        with open(args.compare) as f:
+            worse = compare(result, json.load(f), args.tolerance)
+        for line in worse:
+            print(f"❌ regression {line}")
+        if worse:
+            sys.exit(1)
+        print(f"✅ no regression beyond {args.tolerance:.0%} vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# compact encoding -- depth/lat/lon/time grid ke kuch sau values hi hai, par har row me float64/text repeat hote hai
+#   - temperature / salinity: float32 (sensor precision ~0.001, float32 me ~7 digits)
+#   - time: chhota integer time-step index (+ lookup: text aur int64 epoch)
+#   - depth / lat / lon: dictionary codes (uint8/uint16) + chhoti lookup tables
+# codes sorted values ke order me hai => lat BETWEEN a AND b == lat_idx BETWEEN code(a) AND code(b)
+# (queries.compact_codes yahi karta hai -- dashboard filters coded view pe code ranges ban ke index se chalte hai)
+#
+# usage:  python compact.py --db argo.db --out argo_compact.db       (SQLite convert + report)
+#         python compact.py --pickle argo_df.pkl --out argo_df_compact.pkl
+#         python compact.py --nc data/argo_sample.nc                  (full grid: memory report, streamed)
+import argparse
+import os
+import pickle
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from queries import coded_view_name, format_time, has_table, lookup_table
+
+TABLE_NAME = "argo_data"
+COMPACT_TABLE = "argo_data_compact"
+CODED_COLS = ("time", "depth", "lat", "lon")
+_ALIAS = {"time": "t", "depth": "z", "lat": "y", "lon": "x"}
+MEASURE_COLS = ("temperature", "salinity")
+MEASURE_DTYPE = np.float32
+
+
+def code_dtype(n: int) -> np.dtype:
+    """Smallest unsigned int that can index ``n`` lookup values."""
+    for dt in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dt).max + 1:
+            return np.dtype(dt)
+    return np.dtype(np.int64)
+
+
+def build_lookups(values: Dict[str, Iterable]) -> Dict[str, np.ndarray]:
+    """{col: sorted unique values} -- code i means lookup[col][i]."""
+    out = {}
+    for col in CODED_COLS:
+        vals = np.unique(np.asarray(values[col]))
+        out[col] = vals[~pd.isna(vals)]
+    return out
+
+
+def encode_frame(df: pd.DataFrame, lookups: Optional[Dict[str, np.ndarray]] = None
+                 ) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """Flattened argo DataFrame -> (compact DataFrame, lookups).
+
+    Compact columns: time_idx, depth_idx, lat_idx, lon_idx (unsigned codes)
+    and float32 temperature / salinity. Values missing from ``lookups``
+    raise ValueError instead of silently getting a wrong code.
+    """
+    if lookups is None:
+        lookups = build_lookups({c: df[c].to_numpy() for c in CODED_COLS})
+    out = {}
+    for col in CODED_COLS:
+        vals = df[col].to_numpy()
+        lut = lookups[col]
+        codes = np.searchsorted(lut, vals)
+        hit = codes < len(lut)
+        hit[hit] = lut[codes[hit]] == vals[hit]
+        if not hit.all():
+            raise ValueError(f"{col} has {int((~hit).sum())} values not in its lookup table")
+        out[f"{col}_idx"] = codes.astype(code_dtype(len(lut)))
+    for col in MEASURE_COLS:
+        out[col] = df[col].to_numpy(dtype=MEASURE_DTYPE)
+    return pd.DataFrame(out), lookups
+
+
+def decode_frame(cdf: pd.DataFrame, lookups: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Inverse of encode_frame(): the usual time/depth/lat/lon/temperature/salinity frame."""
+    out = {col: lookups[col][cdf[f"{col}_idx"].to_numpy()] for col in CODED_COLS}
+    for col in MEASURE_COLS:
+        out[col] = cdf[col].to_numpy(dtype="float64")
+    return pd.DataFrame(out)
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def lookup_bytes(lookups: Dict[str, np.ndarray]) -> int:
+    return sum(v.nbytes for v in lookups.values())
+
+
+# ---------- SQLite ----------
+
+def create_compact_tables(conn: sqlite3.Connection, lookups: Dict[str, np.ndarray], table: str = TABLE_NAME) -> None:
+    """Lookup tables + integer-coded table + two views.
+
+    ``table`` has exactly the old columns, so ``SELECT *`` / exports look
+    like a normal DB. ``<table>_coded`` adds the rowid and the *_idx codes;
+    queries.compact_codes() turns the dashboard filters into code ranges
+    on it, which the (time_idx, depth_idx) index serves. There is no
+    R*Tree, so a lat/lon-only filter is still a scan of the coded rows.
+    """
+    conn.execute(f'DROP VIEW IF EXISTS "{table}"')
+    conn.execute(f'DROP VIEW IF EXISTS "{coded_view_name(table)}"')
+    conn.execute(f'DROP TABLE IF EXISTS "{COMPACT_TABLE}"')
+    for col in CODED_COLS:
+        name = lookup_table(col)
+        conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        if col == "time":
+            conn.execute(f'CREATE TABLE "{name}" ("idx" INTEGER PRIMARY KEY, "time" TEXT NOT NULL, '
+                         '"epoch" INTEGER NOT NULL)')
+            text = format_time(lookups[col]).tolist()
+            epoch = lookups[col].astype("datetime64[s]").astype("int64").tolist()
+            conn.executemany(f'INSERT INTO "{name}" VALUES (?, ?, ?)', zip(range(len(text)), text, epoch))
+        else:
+            conn.execute(f'CREATE TABLE "{name}" ("idx" INTEGER PRIMARY KEY, "{col}" REAL NOT NULL)')
+            conn.executemany(f'INSERT INTO "{name}" VALUES (?, ?)', enumerate(lookups[col].tolist()))
+    # SQLite me REAL hamesha 8 byte hai (float32 nahi hota); bachat integer codes (1-2 byte) aur text time se hai
+    conn.execute(
+        f'CREATE TABLE "{COMPACT_TABLE}" ("time_idx" INTEGER, "depth_idx" INTEGER, "lat_idx" INTEGER, '
+        '"lon_idx" INTEGER, "temperature" REAL, "salinity" REAL)'
+    )
+    cols = ", ".join(f"{_ALIAS[c]}.{c} AS {c}" for c in CODED_COLS)
+    joins = " ".join(f'JOIN "{lookup_table(c)}" AS {_ALIAS[c]} ON {_ALIAS[c]}.idx = c.{c}_idx' for c in CODED_COLS)
+    measures = ", ".join(f"c.{m} AS {m}" for m in MEASURE_COLS)
+    conn.execute(f'CREATE VIEW "{table}" AS SELECT {cols}, {measures} FROM "{COMPACT_TABLE}" AS c {joins}')
+    codes = ", ".join(f"c.{c}_idx AS {c}_idx" for c in CODED_COLS)
+    conn.execute(f'CREATE VIEW "{coded_view_name(table)}" AS SELECT c.rowid AS rowid, {codes}, {cols}, {measures} '
+                 f'FROM "{COMPACT_TABLE}" AS c {joins}')
+
+
+def convert_sqlite(src_db: str, dst_db: str, table: str = TABLE_NAME, chunk_rows: int = 500_000,
+                   verbose: bool = True) -> Dict[str, float]:
+    """Copy ``table`` from ``src_db`` into a compact ``dst_db``. Returns row count and seconds."""
+    if os.path.abspath(src_db) == os.path.abspath(dst_db):
+        raise ValueError("write the compact DB to a new file (--out), the source table is read while converting")
+    start = time.perf_counter()
+    src = sqlite3.connect(f"file:{src_db}?mode=ro", uri=True)
+    dst = sqlite3.connect(dst_db, isolation_level=None)
+    try:
+        # lookups pehle -- DISTINCT per column, grid chhota hai
+        lookups = {}
+        for col in CODED_COLS:
+            vals = [v for (v,) in src.execute(f'SELECT DISTINCT "{col}" FROM "{table}" WHERE "{col}" IS NOT NULL')]
+            lookups[col] = np.sort(pd.to_datetime(vals).to_numpy() if col == "time" else np.asarray(vals, "float64"))
+        dst.execute("PRAGMA journal_mode=MEMORY")
+        dst.execute("PRAGMA synchronous=OFF")
+        dst.execute("BEGIN")
+        create_compact_tables(dst, lookups, table)
+        rows = 0
+        query = f'SELECT time, depth, lat, lon, temperature, salinity FROM "{table}"'
+        for chunk in pd.read_sql(query, src, chunksize=chunk_rows, parse_dates=["time"]):
+            cdf, _ = encode_frame(chunk, lookups)
+            # float32 -> float64 jaisa hi store hoga, par round trip float32 precision pe
+            dst.executemany(f'INSERT INTO "{COMPACT_TABLE}" VALUES (?, ?, ?, ?, ?, ?)',
+                            zip(*(cdf[c].tolist() for c in cdf.columns)))
+            rows += len(cdf)
+            if verbose:
+                print(f"  {rows:,} rows")
+        dst.execute(f'CREATE INDEX "idx_{COMPACT_TABLE}_time_depth" ON "{COMPACT_TABLE}" ("time_idx", "depth_idx")')
+        dst.execute("ANALYZE")
+        dst.execute("COMMIT")
+        dst.execute("VACUUM")
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        src.close()
+        dst.close()
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": elapsed}
+
+
+def table_bytes(db_path: str, names: Iterable[str]) -> Optional[int]:
+    """On-disk bytes of tables/indexes via the dbstat virtual table (None if SQLite lacks it)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        names = [n for n in names if has_table(conn, n)]
+        marks = ", ".join("?" * len(names))
+        # table ke saath uske indexes bhi gino
+        idx = [n for (n,) in conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ({marks})", names)]
+        allnames = names + idx
+        return conn.execute(f"SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN "
+                            f"({', '.join('?' * len(allnames))})", allnames).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+
+# ---------- report ----------
+
+def grid_report(nc_path: str, depth_chunk: int = 5) -> Dict[str, int]:
+    """Memory of the full flattened grid, plain vs compact -- streamed, the grid is never held at once."""
+    import xarray as xr
+
+    from flatten import VAR_DEPTH, VAR_LAT, VAR_LON, VAR_TIME, iter_flat_chunks
+
+    plain = compact = rows = 0
+    with xr.open_dataset(nc_path) as ds:
+        lookups = build_lookups({"time": ds[VAR_TIME].values, "depth": ds[VAR_DEPTH].values,
+                                 "lat": ds[VAR_LAT].values, "lon": ds[VAR_LON].values})
+        for cols in iter_flat_chunks(ds, depth_chunk=depth_chunk):
+            df = pd.DataFrame(cols)
+            plain += frame_bytes(df)
+            compact += frame_bytes(encode_frame(df, lookups)[0])
+            rows += len(df)
+    return {"rows": rows, "plain_bytes": plain, "compact_bytes": compact + lookup_bytes(lookups)}
+
+
+def print_saving(label: str, before: Optional[int], after: Optional[int]) -> None:
+    if not before or after is None:
+        print(f"   {label}: n/a")
+        return
+    print(f"   {label}: {before / 1e6:,.2f} MB -> {after / 1e6:,.2f} MB "
+          f"({100 * (1 - after / before):.0f}% smaller, {before / max(after, 1):.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert argo data to the compact encoding and report the saving")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--db", help="SQLite DB to convert (needs --out)")
+    src.add_argument("--pickle", help="flattened DataFrame pickle to convert (needs --out)")
+    src.add_argument("--nc", help="NetCDF grid: report full-grid memory only, nothing written")
+    parser.add_argument("--out", help="compact DB / pickle to write")
+    parser.add_argument("--table", default=TABLE_NAME)
+    args = parser.parse_args()
+
+    if args.nc:
+        r = grid_report(args.nc)
+        print(f"Full grid {args.nc}: {r['rows']:,} rows")
+        print_saving("DataFrame memory", r["plain_bytes"], r["compact_bytes"])
+        return
+    if not args.out:
+        parser.error("--out is required with --db / --pickle")
+    if args.pickle:
+        df = pd.read_pickle(args.pickle)
+        cdf, lookups = encode_frame(df)
+        with open(args.out, "wb") as f:
+            pickle.dump({"frame": cdf, "lookups": lookups}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"✅ {len(cdf):,} rows -> {args.out}")
+        print_saving("DataFrame memory", frame_bytes(df), frame_bytes(cdf) + lookup_bytes(lookups))
+        print_saving("pickle on disk", os.path.getsize(args.pickle), os.path.getsize(args.out))
+        return
+    stats = convert_sqlite(args.db, args.out, args.table)
+    print(f"✅ {stats['rows']:,} rows -> {args.out} in {stats['seconds']:.1f}s")
+    before = table_bytes(args.db, [args.table])
+    after = table_bytes(args.out, [COMPACT_TABLE] + [lookup_table(c) for c in CODED_COLS])
+    print_saving(f"{args.table} on disk", before, after)
+    print_saving("whole DB file", os.path.getsize(args.db), os.path.getsize(args.out))
+
+
+if __name__ == "__main__":
+    main()
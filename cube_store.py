@@ -0,0 +1,240 @@
+# cube backend -- NetCDF grid ko rows me explode kiye bina rakhta hai
+# TEMP/SAL (time, depth, lat, lon) .npy chunks me (har chunk = kuch time steps), memory-mapped khulte hai,
+# aur coordinate vectors alag .npy me. Filter = har axis pe searchsorted => slice; sirf wahi bytes disk se aate
+# hai jo bbox ke andar hai. fetch_cube dashboard.fetch_data jaisa hi DataFrame deta hai.
+#
+# usage:  python cube_store.py data/argo_sample.nc --out argo_cube
+import argparse
+import json
+import os
+import shutil
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from flatten import COLUMNS, VAR_DEPTH, VAR_LAT, VAR_LON, VAR_SAL, VAR_TEMP, VAR_TIME, flatten_grid, to_datetime64
+from grid_agg import STATS, VARS, add_cell_centers
+from queries import time_bounds
+
+CUBE_PATH = "argo_cube"
+NC_PATH = "data/argo_sample.nc"
+CUBE_META = "cube.json"
+AXES = ("time", "depth", "lat", "lon")
+SOURCE_VARS = {"temperature": VAR_TEMP, "salinity": VAR_SAL}
+SOURCE_AXES = {"time": VAR_TIME, "depth": VAR_DEPTH, "lat": VAR_LAT, "lon": VAR_LON}
+DEFAULT_BATCH_ROWS = 100_000
+
+
+def chunk_path(path: str, var: str, k: int) -> str:
+    return os.path.join(path, var, f"{k:06d}.npy")
+
+
+def write_cube(nc_path: str = NC_PATH, out_dir: str = CUBE_PATH, time_chunk: int = 1) -> Dict[str, float]:
+    """NetCDF grid -> cube directory, ``time_chunk`` time steps per .npy file.
+
+    Depth/lat/lon are stored ascending (reordered if the file has them
+    descending) so searchsorted works; time must already be ascending.
+    """
+    start = time.perf_counter()
+    with xr.open_dataset(nc_path) as ds:
+        coords = {axis: np.asarray(ds[name].values) for axis, name in SOURCE_AXES.items()}
+        coords["time"] = to_datetime64(coords["time"])
+        if len(coords["time"]) > 1 and not (np.diff(coords["time"]) > np.timedelta64(0)).all():
+            raise ValueError(f"{nc_path}: {VAR_TIME} is not strictly increasing")
+        order = {axis: np.argsort(coords[axis], kind="stable") for axis in AXES[1:]}
+        for axis in AXES[1:]:
+            coords[axis] = coords[axis][order[axis]].astype("float64")
+
+        for var in SOURCE_VARS:
+            shutil.rmtree(os.path.join(out_dir, var), ignore_errors=True)
+            os.makedirs(os.path.join(out_dir, var))
+        for axis in AXES:
+            np.save(os.path.join(out_dir, f"{axis}.npy"), coords[axis])
+        nt = len(coords["time"])
+        dtypes = {}
+        for k, t0 in enumerate(range(0, nt, time_chunk)):
+            for var, name in SOURCE_VARS.items():
+                block = ds[name].isel({VAR_TIME: slice(t0, t0 + time_chunk)}).values
+                for ax, axis in enumerate(AXES[1:], start=1):
+                    if (order[axis] != np.arange(len(order[axis]))).any():
+                        block = np.take(block, order[axis], axis=ax)
+                dtypes[var] = str(block.dtype)
+                np.save(chunk_path(out_dir, var, k), np.ascontiguousarray(block))
+    shape = [len(coords[a]) for a in AXES]
+    # meta sabse aakhir me -- adhuri likhi cube kabhi valid nahi dikhti
+    with open(os.path.join(out_dir, CUBE_META), "w") as f:
+        json.dump({"shape": shape, "time_chunk": time_chunk, "dtypes": dtypes, "source": os.path.abspath(nc_path)}, f)
+    elapsed = time.perf_counter() - start
+    return {"cells": int(np.prod(shape)), "seconds": elapsed}
+
+
+class Cube:
+    """Read side of a cube directory: coordinate vectors + memory-mapped chunks."""
+
+    def __init__(self, path: str = CUBE_PATH):
+        self.path = path
+        with open(os.path.join(path, CUBE_META)) as f:
+            self.meta = json.load(f)
+        self.coords = {axis: np.load(os.path.join(path, f"{axis}.npy")) for axis in AXES}
+        self.time_chunk = int(self.meta["time_chunk"])
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(len(self.coords[a]) for a in AXES)
+
+    def chunk(self, var: str, k: int) -> np.ndarray:
+        # mmap_mode="r" => kuch load nahi hota, slice karne pe OS sirf wahi pages padhta hai
+        return np.load(chunk_path(self.path, var, k), mmap_mode="r")
+
+    def select(self, lat_rng, lon_rng, t_range, depth_rng) -> Dict[str, slice]:
+        """Filter ranges -> one index slice per axis (BETWEEN for lat/lon/depth, whole days for time)."""
+        sel = {}
+        for axis, rng in (("lat", lat_rng), ("lon", lon_rng), ("depth", depth_rng)):
+            v = self.coords[axis]
+            sel[axis] = slice(0, len(v)) if rng is None else \
+                slice(int(np.searchsorted(v, rng[0], "left")), int(np.searchsorted(v, rng[1], "right")))
+        bounds = time_bounds(t_range)
+        t = self.coords["time"]
+        if bounds is None:
+            sel["time"] = slice(0, len(t))
+        else:
+            lo, hi = (np.datetime64(pd.Timestamp(b)) for b in bounds)
+            sel["time"] = slice(int(np.searchsorted(t, lo, "left")), int(np.searchsorted(t, hi, "left")))
+        return sel
+
+    def count(self, sel: Dict[str, slice]) -> int:
+        """Rows the selection would return -- pure index arithmetic, no data read."""
+        return int(np.prod([max(0, sel[a].stop - sel[a].start) for a in AXES]))
+
+    def blocks(self, sel: Dict[str, slice], batch_rows: int = DEFAULT_BATCH_ROWS
+               ) -> Iterator[Tuple[int, slice, Dict[str, np.ndarray]]]:
+        """(time index, depth slice, {var: (1, nz, ny, nx) block}) pieces of about ``batch_rows`` cells."""
+        ys, xs = sel["lat"], sel["lon"]
+        plane = (ys.stop - ys.start) * (xs.stop - xs.start)
+        if ys.stop <= ys.start or xs.stop <= xs.start:
+            return
+        zs = sel["depth"]
+        step = max(1, batch_rows // plane)
+        for ti in range(sel["time"].start, sel["time"].stop):
+            k, local = divmod(ti, self.time_chunk)
+            arrays = {var: self.chunk(var, k) for var in SOURCE_VARS}
+            for z0 in range(zs.start, zs.stop, step):
+                z = slice(z0, min(z0 + step, zs.stop))
+                yield ti, z, {var: np.asarray(a[local:local + 1, z, ys, xs]) for var, a in arrays.items()}
+
+
+@lru_cache(maxsize=8)
+def _open_cube(path: str, stamp: float) -> Cube:
+    return Cube(path)
+
+
+def open_cube(path: str = CUBE_PATH) -> Cube:
+    """Cached Cube; rewriting the cube (new cube.json mtime) opens it fresh."""
+    return _open_cube(path, os.path.getmtime(os.path.join(path, CUBE_META)))
+
+
+def iter_cube(path: str, lat_rng, lon_rng, t_range, depth_rng, batch_rows: int = DEFAULT_BATCH_ROWS,
+              max_rows: Optional[int] = None, cancel=None) -> Iterator[pd.DataFrame]:
+    """Filtered rows as DataFrames (fetch_data columns), in time/depth/lat/lon order like ingest.py writes them."""
+    cube = open_cube(path)
+    sel = cube.select(lat_rng, lon_rng, t_range, depth_rng)
+    left = max_rows
+    c = cube.coords
+    for ti, z, block in cube.blocks(sel, batch_rows if left is None else min(batch_rows, max(left, 1))):
+        if cancel is not None and cancel.is_set():
+            break
+        cols = flatten_grid(c["time"][ti:ti + 1], c["depth"][z], c["lat"][sel["lat"]], c["lon"][sel["lon"]],
+                            block["temperature"], block["salinity"])
+        frame = pd.DataFrame(cols, columns=COLUMNS)
+        if left is not None:
+            frame = frame.iloc[:left]
+            left -= len(frame)
+        if len(frame):
+            yield frame
+        if left is not None and left <= 0:
+            break
+
+
+def fetch_cube(path: str, lat_rng, lon_rng, t_range, depth_rng, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """Cube version of dashboard.fetch_data -- same columns, same filters."""
+    frames = list(iter_cube(path, lat_rng, lon_rng, t_range, depth_rng, max_rows=max_rows))
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == "time" else "float64") for c in COLUMNS})
+    return pd.concat(frames, ignore_index=True)
+
+
+def count_cube(path: str, lat_rng, lon_rng, t_range, depth_rng) -> int:
+    cube = open_cube(path)
+    return cube.count(cube.select(lat_rng, lon_rng, t_range, depth_rng))
+
+
+def fetch_cube_grid(path: str, lat_rng, lon_rng, t_range, depth_rng, cell: float) -> pd.DataFrame:
+    """Map grid aggregation straight from the blocks (same output as grid_agg.aggregate_frame).
+
+    Every (lat, lon) grid column is reduced over time/depth first, then
+    the columns are grouped into map cells -- no per-row frame is built.
+    """
+    cube = open_cube(path)
+    sel = cube.select(lat_rng, lon_rng, t_range, depth_rng)
+    lat, lon = cube.coords["lat"][sel["lat"]], cube.coords["lon"][sel["lon"]]
+    shape = (len(lat), len(lon))
+    acc = {v: {"n": np.zeros(shape), "sum": np.zeros(shape), "min": np.full(shape, np.nan),
+               "max": np.full(shape, np.nan)} for v in VARS}
+    obs = np.zeros(shape)
+    for _, _, block in cube.blocks(sel):
+        flat = {v: block[v].reshape(-1, *shape).astype("float64") for v in VARS}
+        for v, a in flat.items():
+            acc[v]["n"] += (~np.isnan(a)).sum(axis=0)
+            acc[v]["sum"] += np.nansum(a, axis=0)
+            acc[v]["min"] = np.fmin(acc[v]["min"], np.fmin.reduce(a, axis=0))
+            acc[v]["max"] = np.fmax(acc[v]["max"], np.fmax.reduce(a, axis=0))
+        obs += (~(np.isnan(flat["temperature"]) & np.isnan(flat["salinity"]))).sum(axis=0)
+
+    cols = ["iy", "ix", "count"] + [f"{v}_{s}" for v in VARS for s in STATS]
+    if obs.sum() == 0:
+        return add_cell_centers(pd.DataFrame(columns=cols), lat_rng, lon_rng, cell)
+    iy = ((lat - lat_rng[0]) // cell).astype("int64")
+    ix = ((lon - lon_rng[0]) // cell).astype("int64")
+    grid = {"iy": np.repeat(iy, len(lon)), "ix": np.tile(ix, len(lat)), "count": obs.ravel()}
+    for v in VARS:
+        for s in ("n", "sum", "min", "max"):
+            grid[f"{v}_{s}"] = acc[v][s].ravel()
+    grouped = pd.DataFrame(grid).groupby(["iy", "ix"], sort=False)
+    cells = grouped.agg({"count": "sum", **{f"{v}_{s}": f for v in VARS
+                                           for s, f in (("n", "sum"), ("sum", "sum"), ("min", "min"), ("max", "max"))}})
+    for v in VARS:
+        n = cells[f"{v}_n"]
+        cells[f"{v}_mean"] = (cells[f"{v}_sum"] / n).where(n > 0)
+    cells = cells.reset_index()
+    # sirf land (sab NaN) wale cells mat bhejo
+    cells = cells[cells["count"] > 0]
+    cells["count"] = cells["count"].astype("int64")
+    return add_cell_centers(cells[cols], lat_rng, lon_rng, cell)
+
+
+def cube_stats(path: str) -> Tuple[float, float, float, float, Optional[str], Optional[str]]:
+    """Global lat/lon/time bounds straight from the coordinate vectors."""
+    c = open_cube(path).coords
+    if not all(len(c[a]) for a in AXES):
+        return None, None, None, None, None, None
+    return (float(c["lat"][0]), float(c["lat"][-1]), float(c["lon"][0]), float(c["lon"][-1]),
+            str(pd.Timestamp(c["time"][0])), str(pd.Timestamp(c["time"][-1])))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Store a NetCDF Argo grid as a memory-mapped cube")
+    parser.add_argument("nc_path", nargs="?", default=NC_PATH)
+    parser.add_argument("--out", default=CUBE_PATH)
+    parser.add_argument("--time-chunk", type=int, default=1, help="time steps per .npy chunk")
+    args = parser.parse_args()
+
+    stats = write_cube(args.nc_path, args.out, time_chunk=args.time_chunk)
+    print(f"✅ {stats['cells']:,} grid cells -> {args.out} in {stats['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
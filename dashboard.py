@@ -1,15 +1,27 @@
 # dashboard_pro.py
-import sqlite3
 from typing import Tuple
-import io
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+from grid_agg import DEFAULT_TARGET_CELLS, add_cell_centers, cell_size, map_zoom
+from db_pool import ConnectionPool
+from export import EXPORT_FORMATS, ExportJob, sql_chunks, sql_count, sweep_exports
+from meta import hist_quantile, read_meta
+from pager import filter_pager
+from perf import StageTimer, show_timings
+from profile_agg import depth_profile
+from queries import build_grid_select, build_select, compact_codes, read_rows, use_rtree_for
 
 # ---------- CONFIG (edit if your column names differ) ----------
 DB_PATH = "argo.db"
 TABLE_NAME = "argo_data"
 
+# data backend: "sqlite" (DB_PATH/TABLE_NAME), "parquet" (PARQUET_PATH, see parquet_store.py)
+# or "cube" (CUBE_PATH, memory-mapped grid, see cube_store.py)
+BACKEND = "sqlite"
+PARQUET_PATH = "argo_parquet"
+CUBE_PATH = "argo_cube"
+
 # column names in your table (change if different)
 COL_TIME = "time"
 COL_LAT = "lat"
@@ -32,38 +44,66 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# har rerun ke stages (fetch, chart build/render) ka time/rows/bytes -- perf.py, perf_log.jsonl
+perf = StageTimer("dashboard", backend=BACKEND)
+
 # ---------- HELP / INSTRUCTIONS ----------
 with st.expander("How to use this dashboard (quick) ▶", expanded=False):
     st.write(
         """
         1. Use the filters in the left sidebar to limit region, time, depth and variable.  
         2. Map shows float observations (click/hover to inspect).  
-        3. Use the table or Download button to export results as CSV.  
+        3. Page through the table, or export the full filtered query as CSV / Parquet.  
         4. If you use the chatbot, it will generate SQL based on available schema.
         """
     )
 
+# ---------- DB CONNECTION POOL (shared by all sessions) ----------
+@st.cache_resource
+def get_pool(db_path: str) -> ConnectionPool:
+    return ConnectionPool(db_path)
+
 # ---------- SIDEBAR FILTERS ----------
 st.sidebar.header("Filters")
 
+# argo_meta (ingest ke time likha gaya) -- bounds, depth levels, histograms; O(1) read
+@st.cache_data(ttl=300)
+def get_meta(db_path: str):
+    if BACKEND != "sqlite":
+        return None
+    with get_pool(db_path).connection() as conn:
+        return read_meta(conn)
+
 # Connect to DB to get global bounds (cached)
 @st.cache_data(ttl=300)
 def get_db_stats(db_path: str, table: str) -> Tuple[float, float, float, float, str, str]:
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-    # min/max lat lon
-    cur.execute(f"SELECT MIN({COL_LAT}), MAX({COL_LAT}), MIN({COL_LON}), MAX({COL_LON}) FROM {table}")
-    lat_min_db, lat_max_db, lon_min_db, lon_max_db = cur.fetchone()
-    # min/max time
-    try:
-        cur.execute(f"SELECT MIN({COL_TIME}), MAX({COL_TIME}) FROM {table}")
-        tmin, tmax = cur.fetchone()
-    except Exception:
-        tmin, tmax = None, None
-    conn.close()
+    if BACKEND == "parquet":
+        from parquet_store import parquet_stats
+        return parquet_stats(PARQUET_PATH)
+    if BACKEND == "cube":
+        from cube_store import cube_stats
+        return cube_stats(CUBE_PATH)
+    meta = get_meta(db_path)
+    if meta and meta.get("lat") and meta.get("lon"):
+        tmin, tmax = meta.get("time") or (None, None)
+        return meta["lat"][0], meta["lat"][1], meta["lon"][0], meta["lon"][1], tmin, tmax
+    # purane DB (bina argo_meta) -- full scan
+    with get_pool(db_path).connection() as conn:
+        cur = conn.cursor()
+        # min/max lat lon
+        cur.execute(f"SELECT MIN({COL_LAT}), MAX({COL_LAT}), MIN({COL_LON}), MAX({COL_LON}) FROM {table}")
+        lat_min_db, lat_max_db, lon_min_db, lon_max_db = cur.fetchone()
+        # min/max time
+        try:
+            cur.execute(f"SELECT MIN({COL_TIME}), MAX({COL_TIME}) FROM {table}")
+            tmin, tmax = cur.fetchone()
+        except Exception:
+            tmin, tmax = None, None
     return lat_min_db, lat_max_db, lon_min_db, lon_max_db, tmin, tmax
 
-lat_min_db, lat_max_db, lon_min_db, lon_max_db, tmin_db, tmax_db = get_db_stats(DB_PATH, TABLE_NAME)
+with perf.stage("get_db_stats"):
+    lat_min_db, lat_max_db, lon_min_db, lon_max_db, tmin_db, tmax_db = get_db_stats(DB_PATH, TABLE_NAME)
+meta = get_meta(DB_PATH) or {}
 
 # sliders & pickers
 lat_range = st.sidebar.slider(
@@ -93,32 +133,80 @@ if tmin_db and tmax_db:
 else:
     time_range = None
 
-depth_min, depth_max = st.sidebar.slider("Depth range (meters)", 0.0, 6000.0, (0.0, 2000.0), step=1.0)
+# depth slider: DB ke actual depth levels se, warna purane defaults
+depth_levels = meta.get("depth_levels") or []
+depth_lo_db = float(min(depth_levels)) if depth_levels else 0.0
+depth_hi_db = float(max(depth_levels)) if depth_levels else 6000.0
+# sirf ek depth level / sab 2000 m se neeche -- default ka upper kabhi lower se chhota na ho
+depth_hi_db = max(depth_hi_db, depth_lo_db + 1.0)
+depth_min, depth_max = st.sidebar.slider("Depth range (meters)", depth_lo_db, depth_hi_db,
+                                         (depth_lo_db, max(depth_lo_db, min(2000.0, depth_hi_db))), step=1.0)
 variable = st.sidebar.selectbox("Color by variable", ["temperature", "salinity"], index=0)
+# color scale 2%-98% of the stored histogram, so a few outliers don't wash out the map
+color_range = None
+if meta.get("hist"):
+    lo, hi = hist_quantile(meta, variable, 0.02), hist_quantile(meta, variable, 0.98)
+    if lo is not None and hi is not None and hi > lo:
+        color_range = (lo, hi)
+map_mode = st.sidebar.radio("Map mode", ["Aggregated grid", "Raw points"], index=0,
+                            help="Aggregated grid summarises every matching row into lat/lon cells; "
+                                 "raw points shows only the first 'Max points' rows.")
+map_cells = st.sidebar.number_input("Map grid cells (aggregated mode)", min_value=100, max_value=20000,
+                                    value=DEFAULT_TARGET_CELLS, step=100)
 max_points = st.sidebar.number_input("Max points to show on map", min_value=100, max_value=20000, value=5000, step=100)
 
 download_button = st.sidebar.checkbox("Show Download Button", value=True)
 
+if BACKEND == "sqlite":
+    with st.sidebar.expander("DB pool stats"):
+        st.json(get_pool(DB_PATH).stats())
+# stages ka table script ke end pe bharta hai (tab tak saare stages ho chuke hote hai)
+debug_box = st.sidebar.expander("Debug: stage timings") if st.sidebar.checkbox("Show stage timings") else None
+
 # ---------- DATA FETCH (cached for speed) ----------
 @st.cache_data(ttl=60)
 def fetch_data(db_path: str, table: str, lat_rng, lon_rng, t_range, depth_rng, max_rows: int) -> pd.DataFrame:
-    conn = sqlite3.connect(db_path)
-    where_clauses = []
-    where_clauses.append(f"{COL_LAT} BETWEEN {lat_rng[0]} AND {lat_rng[1]}")
-    where_clauses.append(f"{COL_LON} BETWEEN {lon_rng[0]} AND {lon_rng[1]}")
-    where_clauses.append(f"{COL_DEPTH} BETWEEN {depth_rng[0]} AND {depth_rng[1]}")
-    if t_range:
-        t0 = pd.to_datetime(t_range[0]).strftime("%Y-%m-%d")
-        t1 = pd.to_datetime(t_range[1]).strftime("%Y-%m-%d")
-        where_clauses.append(f"date({COL_TIME}) BETWEEN '{t0}' AND '{t1}'")
-    where_sql = " AND ".join(where_clauses)
-    query = f"SELECT * FROM {table} WHERE {where_sql} LIMIT {int(max_rows)};"
-    df = pd.read_sql(query, conn, parse_dates=[COL_TIME])
-    conn.close()
-    return df
-
-with st.spinner("Fetching data..."):
+    if BACKEND == "parquet":
+        # sirf zaroori partitions / row groups padhe jate hai (pyarrow filter pushdown)
+        from parquet_store import fetch_parquet
+        return fetch_parquet(PARQUET_PATH, lat_rng, lon_rng, t_range, depth_rng, max_rows)
+    if BACKEND == "cube":
+        # searchsorted slices + mmap -- sirf bbox ke andar wale cells padhe jate hai
+        from cube_store import fetch_cube
+        return fetch_cube(CUBE_PATH, lat_rng, lon_rng, t_range, depth_rng, max_rows)
+    with get_pool(db_path).connection() as conn:
+        # R*Tree / (time, depth) index agar DB me bane hai to unhi se query hogi (queries.read_rows)
+        return read_rows(conn, lat_rng, lon_rng, depth_rng, t_range, table=table, limit=max_rows)
+
+@st.cache_data(ttl=60)
+def fetch_grid(db_path: str, table: str, lat_rng, lon_rng, t_range, depth_rng, target_cells: int) -> pd.DataFrame:
+    """Whole filtered dataset binned into ~target_cells lat/lon cells (count/mean/min/max)."""
+    cell = cell_size(lat_rng, lon_rng, target_cells)
+    if BACKEND == "parquet":
+        from parquet_store import fetch_parquet_grid
+        return fetch_parquet_grid(PARQUET_PATH, lat_rng, lon_rng, t_range, depth_rng, cell)
+    if BACKEND == "cube":
+        from cube_store import fetch_cube_grid
+        return fetch_cube_grid(CUBE_PATH, lat_rng, lon_rng, t_range, depth_rng, cell)
+    with get_pool(db_path).connection() as conn:
+        use_rtree = use_rtree_for(conn, table, t_range)
+        codes = compact_codes(conn, lat_rng, lon_rng, depth_rng, t_range, table)
+        query, params = build_grid_select(lat_rng, lon_rng, depth_rng, t_range, table=table,
+                                          cell=cell, use_rtree=use_rtree, codes=codes)
+        cells = pd.read_sql(query, conn, params=params)
+    return add_cell_centers(cells, lat_rng, lon_rng, cell)
+
+@st.cache_data(ttl=60)
+def fetch_profile(db_path: str, table: str, lat_rng, lon_rng, t_range, depth_rng):
+    """Exact per-depth mean/std from argo_profile_agg, or None if this DB doesn't have it."""
+    if BACKEND != "sqlite":
+        return None
+    with get_pool(db_path).connection() as conn:
+        return depth_profile(conn, lat_rng, lon_rng, depth_rng, t_range, table=table)
+
+with st.spinner("Fetching data..."), perf.stage("fetch_data") as s:
     df = fetch_data(DB_PATH, TABLE_NAME, lat_range, lon_range, time_range, (depth_min, depth_max), max_points)
+    s.measure(df)
 
 # ---------- TOP METRICS ----------
 col1, col2, col3, col4 = st.columns(4)
@@ -140,59 +228,237 @@ st.subheader("Map — Observations")
 if df.empty:
     st.info("No records match the filters. Try widening filters or increase 'Max points' in the sidebar.")
 else:
+    # plotly.express ka cold import bhari hai -- sirf tab jab map sach me banta hai, header/metrics pehle dikh jate hai
+    import plotly.express as px
+
     # color variable selection
     color_col = COL_TEMP if variable == "temperature" else COL_SAL
     mapbox_style = "open-street-map"  # works without token
+    zoom = map_zoom(lat_range, lon_range)
+    center = {"lat": (lat_range[0] + lat_range[1]) / 2, "lon": (lon_range[0] + lon_range[1]) / 2}
 
-    fig_map = px.scatter_mapbox(
-        df,
-        lat=COL_LAT,
-        lon=COL_LON,
-        color=color_col,
-        hover_name=COL_TIME,
-        hover_data={COL_DEPTH: True, COL_TEMP: True, COL_SAL: True},
-        zoom=3,
-        height=600,
-        size_max=8,
-    )
+    if map_mode == "Aggregated grid":
+        # poora filtered data cells me summarise hota hai, map pe sirf cells jate hai
+        with st.spinner("Aggregating..."), perf.stage("fetch_grid") as s:
+            cells = fetch_grid(DB_PATH, TABLE_NAME, lat_range, lon_range, time_range,
+                               (depth_min, depth_max), int(map_cells))
+            s.measure(cells)
+        mean_col = f"{color_col}_mean"
+        with perf.stage("chart.map.build") as s:
+            s.measure(cells)
+            fig_map = px.scatter_mapbox(
+                cells,
+                lat=COL_LAT,
+                lon=COL_LON,
+                color=mean_col,
+                range_color=color_range,
+                size="count",
+                hover_data={
+                    "count": True,
+                    f"{COL_TEMP}_mean": ":.2f", f"{COL_TEMP}_min": ":.2f", f"{COL_TEMP}_max": ":.2f",
+                    f"{COL_SAL}_mean": ":.2f", f"{COL_SAL}_min": ":.2f", f"{COL_SAL}_max": ":.2f",
+                    COL_LAT: ":.2f", COL_LON: ":.2f",
+                },
+                zoom=zoom,
+                center=center,
+                height=600,
+                size_max=12,
+            )
+        st.caption(f"{len(cells):,} cells of {cell_size(lat_range, lon_range, int(map_cells)):.2f}° "
+                   f"summarising {int(cells['count'].sum()):,} observations")
+    else:
+        with perf.stage("chart.map.build") as s:
+            s.measure(df)
+            fig_map = px.scatter_mapbox(
+                df,
+                lat=COL_LAT,
+                lon=COL_LON,
+                color=color_col,
+                range_color=color_range,
+                hover_name=COL_TIME,
+                hover_data={COL_DEPTH: True, COL_TEMP: True, COL_SAL: True},
+                zoom=zoom,
+                center=center,
+                height=600,
+                size_max=8,
+            )
     fig_map.update_layout(mapbox_style=mapbox_style, margin={"r":0,"t":0,"l":0,"b":0})
-    st.plotly_chart(fig_map, use_container_width=True)
+    # render = figure -> JSON -> browser; bade raw-point maps me asli kharcha yahi hota hai
+    with perf.stage("chart.map.render"):
+        st.plotly_chart(fig_map, use_container_width=True)
 
 # ---------- PROFILE PLOT: depth vs variable (mean profile) ----------
 st.subheader("Depth profile (averaged)")
 if df.empty:
     st.info("No profile to show.")
 else:
-    # compute mean per depth bin
+    import plotly.express as px
+
+    # exact profile from the pre-aggregated tile sums (profile_agg.py) when the DB has them,
+    # otherwise the old way: mean per depth bin over the sampled rows
     try:
-        # create depth bins
-        bins = list(range(int(max(0, depth_min)), int(depth_max)+1, max(1, int((depth_max-depth_min)//20))))
-        df['depth_bin'] = pd.cut(df[COL_DEPTH], bins=bins, labels=[f"{int(b)}" for b in bins[:-1]])
-        profile = df.groupby('depth_bin')[[COL_TEMP, COL_SAL]].mean().reset_index()
-        profile = profile.dropna()
-        if not profile.empty:
-            # invert y-axis for depth
-            fig_prof = px.line(profile, x=COL_TEMP if variable=="temperature" else COL_SAL, y="depth_bin",
+        with perf.stage("fetch_profile") as s:
+            exact = fetch_profile(DB_PATH, TABLE_NAME, lat_range, lon_range, time_range, (depth_min, depth_max))
+            if exact is not None:
+                s.measure(exact)
+        var_label = 'Temp (°C)' if variable == "temperature" else 'Salinity'
+        if exact is not None and not exact.empty:
+            fig_prof = px.line(exact, x=f"{variable}_mean", y=COL_DEPTH, error_x=f"{variable}_std",
                                orientation='h', markers=True,
-                               labels={'depth_bin':'Depth (m)', COL_TEMP:'Temp (°C)', COL_SAL:'Salinity'})
+                               hover_data={f"{variable}_count": True},
+                               labels={COL_DEPTH: 'Depth (m)', f"{variable}_mean": var_label,
+                                       f"{variable}_std": "Std dev", f"{variable}_count": "Observations"})
             fig_prof.update_yaxes(autorange="reversed")
-            st.plotly_chart(fig_prof, use_container_width=True)
-        else:
+            with perf.stage("chart.profile.render"):
+                st.plotly_chart(fig_prof, use_container_width=True)
+            st.caption(f"Exact mean ± std over all {int(exact[f'{variable}_count'].sum()):,} matching observations")
+        elif exact is not None:
             st.info("Not enough profile data for the selected depth range.")
+        else:
+            # create depth bins
+            bins = list(range(int(max(0, depth_min)), int(depth_max)+1, max(1, int((depth_max-depth_min)//20))))
+            df['depth_bin'] = pd.cut(df[COL_DEPTH], bins=bins, labels=[f"{int(b)}" for b in bins[:-1]])
+            profile = df.groupby('depth_bin')[[COL_TEMP, COL_SAL]].mean().reset_index()
+            profile = profile.dropna()
+            if not profile.empty:
+                # invert y-axis for depth
+                fig_prof = px.line(profile, x=COL_TEMP if variable=="temperature" else COL_SAL, y="depth_bin",
+                                   orientation='h', markers=True,
+                                   labels={'depth_bin':'Depth (m)', COL_TEMP:'Temp (°C)', COL_SAL:'Salinity'})
+                fig_prof.update_yaxes(autorange="reversed")
+                st.plotly_chart(fig_prof, use_container_width=True)
+            else:
+                st.info("Not enough profile data for the selected depth range.")
     except Exception as e:
         st.error(f"Profile error: {e}")
 
 # ---------- TABLE + DOWNLOAD ----------
 st.subheader("Data table")
-if not df.empty:
-    st.dataframe(df, height=300)
 
-    if download_button:
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(label="⬇️ Download CSV", data=csv, file_name="argo_query_result.csv", mime="text/csv")
-else:
+def table_page(delta: int) -> None:
+    st.session_state["table_page"] = max(0, st.session_state["table_page"] + delta)
+
+def table_count() -> None:
+    with get_pool(DB_PATH).connection() as conn:
+        st.session_state["table_pager"].count(conn)
+
+if BACKEND == "sqlite":
+    # poori filtered query keyset pages me (pager.py) -- sirf dikhne wala page memory me, max_points sample nahi
+    pager_key = (TABLE_NAME, lat_range, lon_range, tuple(time_range) if time_range else None, (depth_min, depth_max))
+    if st.session_state.get("table_pager_key") != pager_key:
+        with get_pool(DB_PATH).connection() as conn:
+            st.session_state["table_pager"] = filter_pager(conn, lat_range, lon_range, (depth_min, depth_max),
+                                                           time_range, table=TABLE_NAME)
+        st.session_state["table_pager_key"] = pager_key
+        st.session_state["table_page"] = 0
+    pager = st.session_state["table_pager"]
+    page_no = st.session_state["table_page"]
+    with get_pool(DB_PATH).connection() as conn, perf.stage("table_page") as s:
+        page_df = pager.page(conn, page_no)
+        s.measure(page_df)
+    st.caption(pager.describe(page_no, len(page_df)))
+    if not page_df.empty:
+        st.dataframe(page_df, height=300)
+    t1, t2, t3 = st.columns(3)
+    t1.button("◀ Previous page", disabled=page_no == 0, on_click=table_page, args=(-1,))
+    t2.button("Next page ▶", disabled=not pager.has_next(page_no), on_click=table_page, args=(1,))
+    t3.button("Count all rows", disabled=pager.total is not None, on_click=table_count)
+
+if not df.empty:
+    if BACKEND != "sqlite":
+        st.dataframe(df, height=300)
+elif BACKEND != "sqlite":
     st.write("No data to show in table.")
 
+if debug_box is not None:
+    show_timings(debug_box, perf)
+
+EXPORT_MIME = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+def start_export(fmt: str, compression) -> ExportJob:
+    """Poori filtered query (max_points sample nahi) -> temp file, background thread me (export.py)."""
+    depth_rng = (depth_min, depth_max)
+    if BACKEND == "parquet":
+        from parquet_store import count_parquet, iter_parquet
+        chunks = lambda cancel: iter_parquet(PARQUET_PATH, lat_range, lon_range, time_range, depth_rng, cancel=cancel)
+        count = lambda: count_parquet(PARQUET_PATH, lat_range, lon_range, time_range, depth_rng)
+    elif BACKEND == "cube":
+        from cube_store import count_cube, iter_cube
+        chunks = lambda cancel: iter_cube(CUBE_PATH, lat_range, lon_range, time_range, depth_rng, cancel=cancel)
+        count = lambda: count_cube(CUBE_PATH, lat_range, lon_range, time_range, depth_rng)
+    else:
+        with get_pool(DB_PATH).connection() as conn:
+            use_rtree = use_rtree_for(conn, TABLE_NAME, time_range)
+            codes = compact_codes(conn, lat_range, lon_range, depth_rng, time_range, TABLE_NAME)
+        query, params = build_select(lat_range, lon_range, depth_rng, time_range, table=TABLE_NAME,
+                                     use_rtree=use_rtree, codes=codes)
+        chunks = lambda cancel: sql_chunks(DB_PATH, query, params, cancel=cancel)
+        count = lambda: sql_count(DB_PATH, query, params)
+    return ExportJob(chunks, fmt, compression, count=count, name="argo_query_result").start()
+
+# download_button poori file Streamlit ke in-memory media store me rakhta hai -- isse bade export
+# browser ko nahi bhejte, server pe file ka path dikhate hai
+MAX_INLINE_DOWNLOAD_BYTES = 200 * 1024 ** 2
+
+
+@st.cache_resource
+def sweep_old_exports() -> int:
+    """Server start pe ek baar: purane sessions / restarts ke bache export files hatao."""
+    return sweep_exports()
+
+
+def finish_export() -> None:
+    job = st.session_state.pop("export_job", None)
+    if job is not None:
+        job.cancel()
+        job.cleanup()
+
+
+@st.fragment(run_every=0.5)
+def export_progress(job: ExportJob) -> None:
+    """Sirf ye fragment har 0.5s rerun hota hai (script block nahi hoti); export khatam => poora app rerun."""
+    p = job.progress()
+    total = f"{p['total']:,}" if p["total"] is not None else "counting…"
+    st.progress(p["fraction"] or 0.0,
+                text=f"{p['rows']:,} / {total} rows · {p['bytes'] / 1e6:.1f} MB · {p['rows_per_sec']:,.0f} rows/s")
+    if job.done:
+        st.rerun()
+
+
+sweep_old_exports()
+if download_button:
+    ex1, ex2, ex3 = st.columns([1, 1, 2])
+    export_fmt = ex1.selectbox("Export format", list(EXPORT_FORMATS), index=0)
+    export_comp = ex2.selectbox("Compression", EXPORT_FORMATS[export_fmt][1], format_func=lambda c: c or "none")
+    job = st.session_state.get("export_job")
+    if ex3.button("⬇️ Export full filtered query"):
+        finish_export()
+        job = st.session_state["export_job"] = start_export(export_fmt, export_comp)
+    if job is not None and not job.done:
+        if st.button("Cancel export"):
+            job.cancel()
+        export_progress(job)
+    elif job is not None:
+        size = job.progress()["bytes"]
+        if job.error is not None:
+            st.error(f"Export failed: {job.error}")
+            st.session_state.pop("export_job", None)
+        elif job.cancelled:
+            st.info("Export cancelled.")
+            st.session_state.pop("export_job", None)
+        elif size > MAX_INLINE_DOWNLOAD_BYTES:
+            st.info(f"{job.rows:,} rows · {size / 1e6:,.0f} MB is too big to send through the app "
+                    f"(limit {MAX_INLINE_DOWNLOAD_BYTES / 1e6:,.0f} MB). The file is on the server at "
+                    f"`{job.path}`.")
+            st.button("Done -- delete the export file", on_click=finish_export)
+        else:
+            # click ke baad file disk se hata do (download button ke paas apni copy hai)
+            with open(job.path, "rb") as f:
+                st.download_button(label=f"⬇️ Download {job.file_name} ({size / 1e6:,.1f} MB)", data=f,
+                                   file_name=job.file_name, on_click=finish_export,
+                                   mime="application/gzip" if job.compression == "gzip" and job.fmt == "csv"
+                                   else EXPORT_MIME[job.fmt])
+
 # ---------- FOOTER ----------
 st.markdown("---")
 st.markdown("<small>Built with ❤️ · Streamlit · Ollama · SQLite · Plotly</small>", unsafe_allow_html=True)
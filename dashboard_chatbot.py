@@ -1,9 +1,23 @@
-import sqlite3
+import time
+
 import pandas as pd
 import streamlit as st
-import pydeck as pdk
-import altair as alt
-import ollama
+
+from dataset_cache import load_frame
+from db_pool import ConnectionPool
+from globe import binary_globe, payload_bytes, point_arrays, row_details
+from grid_agg import DEFAULT_TARGET_CELLS, aggregate_frame, cell_size
+from meta import data_version
+from nl_cache import CACHE_PATH, NLSQLCache
+from nl_sql import (DEFAULT_TIMEOUT, MODEL, SCHEMA, GenerationCancelled, GenerationTimeout, SQLStream,
+                    schema_hash)
+from nl_templates import parse_question, render_sql
+from pager import pager_for_sql
+from perf import StageTimer, show_timings
+from queries import build_filter, use_rtree_for
+from sql_guard import DEFAULT_TIME_BUDGET, QueryRejected, QueryTimeout, run_guarded
+
+DATASET_PATH = "argo_df_india.pkl"
 
 # -------------- Page Config --------------
 st.set_page_config(
@@ -12,6 +26,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# har rerun ke stages (pickle load, globe/chart build+render, ollama, SQL) -- perf.py, perf_log.jsonl
+perf = StageTimer("chatbot")
+
 # -------------- Header --------------
 st.markdown(
     """
@@ -45,39 +62,57 @@ regions = st.sidebar.multiselect(
 )
 float_id = st.sidebar.text_input("Float ID (leave blank for all)")
 limit = st.sidebar.number_input("Max records to display", 100, 20000, 5000, step=500)
+globe_mode = st.sidebar.radio("Globe mode", ["Aggregated grid", "Raw points"], index=0)
+globe_cells = st.sidebar.number_input("Globe grid cells", 100, 20000, DEFAULT_TARGET_CELLS, step=100)
+sql_budget = st.sidebar.number_input("Chatbot query time budget (s)", 1.0, 120.0, DEFAULT_TIME_BUDGET, step=1.0)
+llm_timeout = st.sidebar.number_input("LLM timeout (s)", 5.0, 600.0, DEFAULT_TIMEOUT, step=5.0)
+show_debug = st.sidebar.checkbox("Show stage timings")
+
+# -------------- DB Connection Pool (shared by all sessions) --------------
+@st.cache_resource
+def get_pool(db_path: str) -> ConnectionPool:
+    return ConnectionPool(db_path)
+
+pool = get_pool("argo.db")
 
 # -------------- Build SQL Query --------------
-where_clauses = [
-    f"lat BETWEEN {lat_min} AND {lat_max}",
-    f"lon BETWEEN {lon_min} AND {lon_max}",
-    f"depth BETWEEN {depth_min} AND {depth_max}",
-]
-
-# if user selected date range
-if date_range:
-    if len(date_range) == 2:
-        start, end = date_range
-        where_clauses.append(f"time BETWEEN '{start}' AND '{end}'")
+# lat/lon/depth/date filters index-friendly banake (queries.py), R*Tree ho to use karo
+# (R*Tree hai ya nahi -- har rerun pe DB se puchne ki jagah cached)
+@st.cache_data(ttl=300)
+def rtree_usable(db_path: str, t_range) -> bool:
+    with get_pool(db_path).connection() as conn:
+        return use_rtree_for(conn, "argo_data", t_range)
+
+use_rtree = rtree_usable("argo.db", date_range)
+from_sql, where_sql, query_params = build_filter(
+    (lat_min, lat_max), (lon_min, lon_max), (depth_min, depth_max), date_range,
+    use_rtree=use_rtree,
+)
+where_clauses = [where_sql]
 
 # if float_id provided
 if float_id.strip():
-    where_clauses.append(f"float_id = '{float_id.strip()}'")
+    where_clauses.append("d.float_id = ?")
+    query_params.append(float_id.strip())
 
 # if region selected but not 'Global'
 if "Global" not in regions:
     # assume your DB has a 'region' or 'ocean' column
     # adjust column name accordingly
-    region_list = ",".join([f"'{r}'" for r in regions])
-    where_clauses.append(f"ocean IN ({region_list})")
+    where_clauses.append(f"d.ocean IN ({', '.join('?' for _ in regions)})")
+    query_params.extend(regions)
 
 where_sql = " AND ".join(where_clauses)
-query = f"SELECT * FROM argo_data WHERE {where_sql} LIMIT {limit};"
+query = f"SELECT d.* FROM {from_sql} WHERE {where_sql} LIMIT {int(limit)};"
 
 # -------------- Fetch Data --------------
-conn = sqlite3.connect("argo.db")     
-# df = pd.read_sql(query, conn)  ise abhi comment out kr rau kuki isi k karan africa ka data ata hai kuki ye direct db se ara hai 
-df = pd.read_pickle("argo_df_india.pkl")  # abhi ye use krunga kuki india k liye alg pkl bnaya hai taki india ka data show ho
-conn.close()
+# with pool.connection() as conn: df = pd.read_sql(query, conn, params=query_params)  ise abhi comment out kr rau kuki isi k karan africa ka data ata hai kuki ye direct db se ara hai 
+# abhi ye use krunga kuki india k liye alg pkl bnaya hai taki india ka data show ho
+# pickle ek baar Arrow me convert hota hai aur mmap se khulta hai -- saare sessions ek hi (read-only) copy share
+# karte hai, rerun pe unpickle nahi (dataset_cache.py). Isliye df ko yaha in-place mat badlo.
+with perf.stage("load_dataset") as s:
+    df = load_frame(DATASET_PATH)
+    s.measure(df)
 
 # -------------- Summary Cards --------------
 col1, col2, col3, col4 = st.columns(4)
@@ -96,44 +131,82 @@ st.write("---")
 # -------------- 3-D Globe (PyDeck) --------------
 st.subheader("🌍 Interactive 3-D Globe")
 
-if not df.empty:
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=df,
-        get_position='[lon, lat]',
-        get_fill_color='[255, (1 - (temperature/30)) * 255, (temperature/30) * 255]',
-        get_radius=40000,
-        pickable=True,
-        auto_highlight=True,
-    )
-
-    view_state = pdk.ViewState(latitude=0, longitude=0, zoom=1, min_zoom=0, max_zoom=15, pitch=30, bearing=0)
-
-    r = pdk.Deck(
-        layers=[layer],
-        initial_view_state=view_state,
-        map_style=None,
-        tooltip={"text": "Float: {float_id}\nLat: {lat}\nLon: {lon}\nTemp: {temperature} °C\nDepth: {depth} m\nSalinity: {salinity}"}
-    )
-
-    st.pydeck_chart(r, use_container_width=True)
+if not df.empty and globe_mode == "Aggregated grid":
+    # pydeck sirf is mode me chahiye -- cold start pe import nahi hota
+    import pydeck as pdk
+
+    # saare rows ko lat/lon cells me summarise karo -- globe pe sirf cells jate hai
+    with perf.stage("chart.globe.build") as s:
+        data_lat = (float(df["lat"].min()), float(df["lat"].max()))
+        data_lon = (float(df["lon"].min()), float(df["lon"].max()))
+        cell = cell_size(data_lat, data_lon, int(globe_cells))
+        cells = aggregate_frame(df, data_lat, data_lon, cell)
+
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            data=cells,
+            get_position='[lon, lat]',
+            get_fill_color='[255, (1 - (temperature_mean/30)) * 255, (temperature_mean/30) * 255]',
+            get_radius=cell * 111_000 / 2,
+            pickable=True,
+            auto_highlight=True,
+        )
+
+        view_state = pdk.ViewState(latitude=0, longitude=0, zoom=1, min_zoom=0, max_zoom=15, pitch=30, bearing=0)
+
+        r = pdk.Deck(
+            layers=[layer],
+            initial_view_state=view_state,
+            map_style=None,
+            tooltip={"text": "Lat: {lat}\nLon: {lon}\nObservations: {count}\n"
+                             "Temp: {temperature_mean} °C ({temperature_min}–{temperature_max})\n"
+                             "Salinity: {salinity_mean} ({salinity_min}–{salinity_max})"}
+        )
+        s.measure(cells)
+
+    st.caption(f"{len(cells):,} cells of {cell:.2f}° summarising {int(cells['count'].sum()):,} observations")
+    # render = Deck -> JSON (har row/cell ek JSON object) -> browser
+    with perf.stage("chart.globe.render"):
+        st.pydeck_chart(r, use_container_width=True)
+elif not df.empty:
+    # raw points: positions/colors NumPy pe ban ke binary attributes me jate hai (globe.py), per-row JSON nahi
+    with perf.stage("chart.globe.build") as s:
+        arrays = point_arrays(df)
+        s["rows"], s["bytes"] = len(df), payload_bytes(arrays)
+
+    st.caption(f"{len(df):,} points · {payload_bytes(arrays) / 1e6:.1f} MB binary attributes · "
+               "click a point for its full record")
+    with perf.stage("chart.globe.render"):
+        point_no = binary_globe(arrays, height=600)
+    # tooltip me sirf lat/lon/temp; click pe component index bhejta hai, poori row yahi server pe nikalti hai
+    if point_no is not None:
+        found, picked = row_details(df, point_no)
+        if found:
+            st.dataframe(picked, use_container_width=True, hide_index=True)
 else:
     st.warning("⚠️ No records found for selected filters.")
 
 # -------------- Clean Charts --------------
 if not df.empty:
+    import altair as alt
+
     st.subheader("📊 Temperature & Salinity Trends")
     # time series chart
-    df['time'] = pd.to_datetime(df['time'])
-    temp_chart = alt.Chart(df).mark_line().encode(
-        x='time:T', y='temperature:Q', color='float_id:N'
-    ).properties(title="Temperature over Time")
-    sal_chart = alt.Chart(df).mark_line().encode(
-        x='time:T', y='salinity:Q', color='float_id:N'
-    ).properties(title="Salinity over Time")
-
-    st.altair_chart(temp_chart, use_container_width=True)
-    st.altair_chart(sal_chart, use_container_width=True)
+    with perf.stage("chart.trends.build") as s:
+        # shared (read-only) df ko badle bina; pickle/Arrow me time pehle se datetime hota hai
+        trend_df = df if pd.api.types.is_datetime64_any_dtype(df['time']) \
+            else df.assign(time=pd.to_datetime(df['time']))
+        temp_chart = alt.Chart(trend_df).mark_line().encode(
+            x='time:T', y='temperature:Q', color='float_id:N'
+        ).properties(title="Temperature over Time")
+        sal_chart = alt.Chart(trend_df).mark_line().encode(
+            x='time:T', y='salinity:Q', color='float_id:N'
+        ).properties(title="Salinity over Time")
+        s.measure(df)
+
+    with perf.stage("chart.trends.render"):
+        st.altair_chart(temp_chart, use_container_width=True)
+        st.altair_chart(sal_chart, use_container_width=True)
 
 # -------------- Data Table --------------
 with st.expander("📄 Show Raw Data Table"):
@@ -141,44 +214,165 @@ with st.expander("📄 Show Raw Data Table"):
 
 st.write("---")
 
+with st.sidebar.expander("DB pool stats"):
+    st.json(pool.stats())
+
 # -------------- Chatbot Panel --------------
 st.subheader("🤖 Ask Questions (SQL via Ollama)")
 
+@st.cache_resource
+def get_nl_cache() -> NLSQLCache:
+    return NLSQLCache(CACHE_PATH)
+
+nl_cache = get_nl_cache()
+
 with st.form(key="chatbot_form"):
     user_question = st.text_input("Type your question:")
+    reuse_result = st.checkbox("Reuse cached result rows (skip the DB too)", value=False)
     run_query = st.form_submit_button("Generate & Run")
 
 if run_query and user_question:
-    schema = """
-The SQLite database has one table: argo_data
-Columns: time (datetime), depth (float), lat (float), lon (float),
-temperature (float), salinity (float), float_id (text), ocean (text)
-Return ONLY a SQL query valid for SQLite.
-"""
-    prompt = f"""{schema}
+    # 1) template fast path -- aam sawaal seedhe parameterized SQL me, na LLM na cache
+    # 2) cache -- same / milta julta sawaal pehle pucha gaya ho to model ko call hi nahi
+    # 3) tabhi ollama
+    schema_key = schema_hash(SCHEMA)
+    template = parse_question(user_question)
+    cached = None
+    sql_params = []
+    if template:
+        sql_query, sql_params = template["sql"], template["params"]
+        st.caption("⚡ Answered by the template parser (no LLM call)")
+    else:
+        # data version -- ingest ke baad cached result rows purane ho jate hai (SQL phir bhi reuse hota hai)
+        with pool.connection() as conn:
+            data_key = data_version(conn)
+        cached = nl_cache.get(user_question, MODEL, schema_key, with_result=reuse_result, data_version=data_key)
+        if cached:
+            sql_query = cached["sql"]
+            st.caption(f"⚡ From cache (used {cached['hits']} times, {cached['age'] / 60:.0f} min old)")
+        else:
+            # naya sawaal => pichla in-flight generation band (slow model session ko atka nahi sakta)
+            previous = st.session_state.get("sql_stream")
+            if previous is not None and not previous.done:
+                previous.cancel()
+            # poora generation (streaming ollama.generate) ek stage; timeout / cancel bhi record hota hai
+            with perf.stage("ollama.generate", model=MODEL) as llm:
+                stream = SQLStream(user_question, model=MODEL, timeout=float(llm_timeout)).start()
+                st.session_state["sql_stream"] = stream
+                # tokens aate hi dikhao; har st call pe Streamlit naye submit pe ye run rok sakta hai
+                live = st.empty()
+                while not stream.done:
+                    live.code(stream.text or "…", language="sql")
+                    time.sleep(0.1)
+                live.empty()
+                try:
+                    sql_query = stream.result()
+                except (GenerationTimeout, GenerationCancelled) as e:
+                    st.error(str(e))
+                    st.stop()
+                except Exception as e:
+                    st.error(f"Error talking to Ollama: {e}")
+                    st.stop()
+                llm.measure(sql_query)
+                llm["tokens"] = stream.tokens
+            if stream.stopped_early:
+                st.caption(f"Stopped generation after {stream.tokens} tokens -- SQL statement was complete")
+
+    st.code(render_sql(sql_query, sql_params) if sql_params else sql_query, language="sql")
+
+    # result session_state me -- page badalne wale reruns pe form submit nahi hota
+    chat = {"pager": None, "df": None, "page": 0, "cache": None}
+    if cached and cached["result"] is not None:
+        chat["df"] = cached["result"]
+    else:
+        # simple "rows dikhao" SELECT => keyset pages (memory me ek hi page); baaki guarded, capped result
+        with pool.connection() as conn:
+            chat["pager"] = pager_for_sql(sql_query, sql_params, conn=conn)
+        # sirf chalne wala LLM SQL hi cache hota hai (template wala to waise bhi turant banta hai)
+        if not template and (not cached or reuse_result):
+            chat["cache"] = (user_question, schema_key, sql_query, data_key)
+    chat["sql"], chat["params"] = sql_query, sql_params
+    st.session_state["chat_result"] = chat
+
+
+def show_run_report(report) -> None:
+    st.caption(
+        f"⏱️ {report['elapsed_ms']:.0f} ms · "
+        + (f"~{report['est_rows_scanned']:,} rows scanned ({', '.join(report['full_scans'])})"
+           if report["full_scans"] else "no full table scan (index lookups only)")
+        + f" · {report['vm_steps']:,} VM steps"
+    )
 
-Translate this natural language query to a valid SQL query:
 
-{user_question}
-"""
+def chat_page(delta: int) -> None:
+    st.session_state["chat_result"]["page"] = max(0, st.session_state["chat_result"]["page"] + delta)
 
-    response = ollama.generate(model="gemma3:latest", prompt=prompt)
-    sql_query = response["response"].strip()
 
-    if sql_query.startswith("```"):
-        sql_query = sql_query.strip("`")
-        if "sql" in sql_query:
-            sql_query = sql_query.replace("sql", "", 1)
-    sql_query = sql_query.strip()
+def chat_count() -> None:
+    pager = st.session_state["chat_result"]["pager"]
+    try:
+        with pool.connection() as conn:
+            total, _ = run_guarded(conn, *pager.count_query(), max_rows=1, time_budget=float(sql_budget))
+        pager.set_total(int(total.iloc[0, 0]))
+    except (QueryRejected, QueryTimeout) as e:
+        st.session_state["chat_count_error"] = str(e)
 
-    st.code(sql_query, language="sql")
 
+chat = st.session_state.get("chat_result")
+if chat:
     try:
-        conn = sqlite3.connect("argo.db")
-        result_df = pd.read_sql(sql_query, conn)
-        conn.close()
+        pager = chat["pager"]
+        if pager is not None:
+            sql, params, want = pager.page_query(chat["page"])
+            # har page bhi EXPLAIN check + time budget se guzarta hai (sql_guard.py)
+            with pool.connection() as conn, perf.stage("chat_sql", paged=True) as s:
+                frame, run_report = run_guarded(conn, sql, params, max_rows=want + 1, time_budget=float(sql_budget))
+                s.measure(frame)
+            result_df = pager.record(chat["page"], frame, want)
+            show_run_report(run_report)
+            st.success(pager.describe(chat["page"], len(result_df)))
+        elif chat["df"] is not None:
+            result_df = chat["df"]
+            st.success(f"Returned {len(result_df)} rows")
+        else:
+            # pool ke connections read-only hai -- model ka SQL DB me kuch likh nahi sakta
+            # upar se EXPLAIN QUERY PLAN check, LIMIT aur time budget (sql_guard.py)
+            with pool.connection() as conn, perf.stage("chat_sql", paged=False) as s:
+                result_df, run_report = run_guarded(conn, chat["sql"], chat["params"], max_rows=int(limit),
+                                                    time_budget=float(sql_budget))
+                s.measure(result_df)
+            show_run_report(run_report)
+            if run_report["limit_added"]:
+                st.caption(f"LIMIT {int(limit)} added automatically"
+                           + (" -- result is truncated" if run_report["truncated"] else ""))
+            st.success(f"Returned {len(result_df)} rows")
+            chat["df"] = result_df
+
+        if chat["cache"]:
+            question, schema_key, sql, data_key = chat["cache"]
+            chat["cache"] = None
+            # paged result ke rows cache nahi hote, sirf SQL
+            nl_cache.put(question, MODEL, schema_key, sql, result_df if pager is None else None, data_version=data_key)
 
-        st.success(f"Returned {len(result_df)} rows")
         st.dataframe(result_df, use_container_width=True, height=300)
+        if pager is not None:
+            c1, c2, c3 = st.columns(3)
+            c1.button("◀ Previous page", disabled=chat["page"] == 0, on_click=chat_page, args=(-1,))
+            c2.button("Next page ▶", disabled=not pager.has_next(chat["page"]), on_click=chat_page, args=(1,))
+            c3.button("Count all rows", disabled=pager.total is not None, on_click=chat_count)
+            if st.session_state.get("chat_count_error"):
+                st.caption(f"Count failed: {st.session_state.pop('chat_count_error')}")
+    except QueryRejected as e:
+        st.error(f"Query rejected: {e}")
+    except QueryTimeout as e:
+        st.error(f"Query took too long: {e}")
     except Exception as e:
         st.error(f"Error executing SQL: {e}")
+
+with st.sidebar.expander("NL→SQL cache stats"):
+    st.json(nl_cache.stats())
+    if st.button("Clear NL→SQL cache"):
+        nl_cache.clear()
+
+if show_debug:
+    show_timings(st.sidebar.expander("Debug: stage timings", expanded=True), perf)
@@ -0,0 +1,211 @@
+# shared dataset cache -- pickle / Parquet / SQLite extract ek baar Arrow IPC (Feather v2, uncompressed) file
+# me convert hota hai aur phir memory-map se khulta hai. Numeric + time columns ke pandas arrays seedhe
+# mmap pages pe hote hai (zero-copy), isliye N sessions = ek hi copy (OS page cache), aur rerun pe load ~0 ms.
+# Source badla (size/mtime) to sha256 se check hota hai; content same ho (touch / copy) to purani file hi chalti hai.
+#
+# usage:  python dataset_cache.py argo_df_india.pkl          (convert / refresh, size + load time report)
+#         python dataset_cache.py argo_india.db --table argo_data
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from hashlib import sha1
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from manifest import file_sha256
+
+CACHE_DIR = ".arrow_cache"
+SQL_BATCH_ROWS = 500_000
+
+_convert_lock = threading.Lock()
+
+
+def cache_paths(src: str, cache_dir: str = CACHE_DIR):
+    """(arrow file, sidecar json) for a source; keyed by its absolute path so same-named files don't clash."""
+    stem = os.path.splitext(os.path.basename(os.path.normpath(src)))[0]
+    key = sha1(os.path.abspath(src).encode()).hexdigest()[:8]
+    base = os.path.join(cache_dir, f"{stem}-{key}")
+    return base + ".arrow", base + ".json"
+
+
+def source_stamp(src: str) -> Dict[str, int]:
+    """size + mtime_ns; a Parquet directory uses its newest file."""
+    if os.path.isdir(src):
+        size, mtime = 0, 0
+        for root, _, files in os.walk(src):
+            for name in files:
+                st = os.stat(os.path.join(root, name))
+                size, mtime = size + st.st_size, max(mtime, st.st_mtime_ns)
+        return {"size": size, "mtime_ns": mtime}
+    st = os.stat(src)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def source_hash(src: str) -> str:
+    if not os.path.isdir(src):
+        return file_sha256(src)
+    h = sha1()
+    for root, _, files in sorted(os.walk(src)):
+        for name in sorted(files):
+            h.update(name.encode())
+            h.update(file_sha256(os.path.join(root, name)).encode())
+    return h.hexdigest()
+
+
+def frame_to_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame -> Arrow without turning float NaN into nulls.
+
+    pa.Table.from_pandas maps NaN to null, and a null bitmap forces
+    to_pandas() to copy the column again; plain float arrays with NaN
+    values stay zero-copy.
+    """
+    arrays, names = [], []
+    for name in df.columns:
+        col = df[name]
+        if col.dtype.kind in "fiub":
+            arrays.append(pa.array(col.to_numpy(), from_pandas=False))
+        else:
+            arrays.append(pa.Array.from_pandas(col))
+        names.append(str(name))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _iter_tables(src: str, table: str):
+    ext = os.path.splitext(src)[1].lower()
+    if ext in (".pkl", ".pickle"):
+        yield frame_to_table(pd.read_pickle(src).reset_index(drop=True))
+    elif ext in (".db", ".sqlite", ".sqlite3"):
+        # SQLite batches me -- poora DB ek saath RAM me nahi aata
+        conn = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+        try:
+            for chunk in pd.read_sql(f"SELECT * FROM {table}", conn, chunksize=SQL_BATCH_ROWS):
+                if "time" in chunk:
+                    chunk["time"] = pd.to_datetime(chunk["time"])
+                yield frame_to_table(chunk)
+        finally:
+            conn.close()
+    elif ext in (".arrow", ".feather", ".ipc"):
+        with pa.memory_map(src) as source:
+            yield pa.ipc.open_file(source).read_all()
+    else:
+        import pyarrow.parquet as pq
+        yield pq.read_table(src)
+
+
+def convert(src: str, dst: str, table: str = "argo_data") -> int:
+    """Write ``src`` as one uncompressed Arrow IPC file (tmp + rename, so open mmaps stay valid). Returns rows."""
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    rows = 0
+    writer = None
+    try:
+        for t in _iter_tables(src, table):
+            if writer is None:
+                writer = pa.ipc.new_file(tmp, t.schema)
+            elif t.schema != writer.schema:
+                t = t.cast(writer.schema)
+            writer.write_table(t)
+            rows += t.num_rows
+        if writer is None:
+            raise ValueError(f"{src} has no rows")
+        writer.close()
+        writer = None
+        os.replace(tmp, dst)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return rows
+
+
+def _read_sidecar(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ensure_arrow(src: str, cache_dir: str = CACHE_DIR, table: str = "argo_data") -> str:
+    """Path of an up-to-date Arrow copy of ``src``, converting only when its content changed."""
+    arrow_path, side_path = cache_paths(src, cache_dir)
+    stamp = source_stamp(src)
+    side = _read_sidecar(side_path)
+    if side and os.path.exists(arrow_path) and {k: side.get(k) for k in stamp} == stamp:
+        return arrow_path
+    with _convert_lock:
+        side = _read_sidecar(side_path)
+        if side and os.path.exists(arrow_path) and {k: side.get(k) for k in stamp} == stamp:
+            return arrow_path
+        digest = source_hash(src)
+        if side and os.path.exists(arrow_path) and side.get("sha256") == digest:
+            # sirf touch / copy hua -- content same, Arrow file wahi rehti hai
+            rows, converted = side.get("rows"), side.get("converted")
+        else:
+            rows, converted = convert(src, arrow_path, table), time.time()
+        side = {"source": os.path.abspath(src), **stamp, "sha256": digest, "rows": rows, "converted": converted}
+        with open(side_path + ".tmp", "w") as f:
+            json.dump(side, f)
+        os.replace(side_path + ".tmp", side_path)
+    return arrow_path
+
+
+@lru_cache(maxsize=8)
+def _open_arrow(path: str, stamp: int) -> pd.DataFrame:
+    # split_blocks: har column apna block -- numeric / time columns mmap buffer pe hi rehte hai (read-only)
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def load_frame(src: str, cache_dir: str = CACHE_DIR, table: str = "argo_data") -> pd.DataFrame:
+    """Shared, memory-mapped DataFrame for ``src`` (pickle / Parquet / SQLite / Arrow).
+
+    Every caller in the process gets the same object, so treat it as
+    read-only (``df.assign(...)`` / ``df.copy()`` before changing columns).
+    """
+    path = ensure_arrow(src, cache_dir, table)
+    return _open_arrow(path, os.stat(path).st_mtime_ns)
+
+
+def shared_bytes(df: pd.DataFrame) -> int:
+    """Bytes of the frame's columns that live on the mmap (not in private memory)."""
+    total = 0
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if isinstance(values, np.ndarray) and not values.flags.writeable:
+            total += values.nbytes
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a dataset to a memory-mapped Arrow IPC cache")
+    parser.add_argument("src", help=".pkl, Parquet file/dir, .db or .arrow")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--table", default="argo_data", help="(SQLite) table or view to read")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = ensure_arrow(args.src, args.cache_dir, args.table)
+    ready = time.perf_counter() - start
+    start = time.perf_counter()
+    df = load_frame(args.src, args.cache_dir, args.table)
+    opened = time.perf_counter() - start
+    print(f"{args.src} -> {path} ({os.path.getsize(path) / 1e6:.1f} MB, {len(df):,} rows) in {ready:.2f}s")
+    print(f"memory-mapped open: {opened * 1000:.1f} ms · {shared_bytes(df) / 1e6:.1f} MB of "
+          f"{df.memory_usage(deep=True).sum() / 1e6:.1f} MB shared via the page cache")
+    if args.src.endswith((".pkl", ".pickle")):
+        start = time.perf_counter()
+        pd.read_pickle(args.src)
+        print(f"(pd.read_pickle for comparison: {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
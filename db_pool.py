@@ -0,0 +1,135 @@
+# chhota sa SQLite connection pool -- dono dashboards ise st.cache_resource ke through share karte hai
+# har query pe naya sqlite3.connect (aur page cache warmup) nahi, pehle se khule read-only connections reuse hote hai
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024  # 256 MB -- pages OS ke page cache se seedhe padhe jate hai
+DEFAULT_CACHED_STATEMENTS = 256        # per-connection prepared statement (LRU) cache
+
+
+class PoolTimeout(RuntimeError):
+    """No connection became free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only SQLite connections.
+
+    A connection is used by one thread at a time (checkout gives exclusive
+    use), so ``check_same_thread`` is off and connections can move between
+    Streamlit's script threads. Every connection is opened with
+    ``mode=ro``, ``query_only`` and ``mmap_size``, and keeps sqlite3's
+    prepared-statement cache, which parameterized queries from queries.py
+    hit on every rerun.
+    """
+
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE, mmap_size: int = DEFAULT_MMAP_SIZE,
+                 cached_statements: int = DEFAULT_CACHED_STATEMENTS, timeout: float = 30.0):
+        self.db_path = db_path
+        self.size = size
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self._stats = {"checkouts": 0, "hits": 0, "misses": 0, "waits": 0, "timeouts": 0,
+                       "wait_seconds": 0.0, "checkout_seconds": 0.0, "max_checkout_seconds": 0.0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        conn = None
+        hit = waited = False
+        try:
+            conn = self._idle.get_nowait()
+            hit = True
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                waited = True
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"no free connection to {self.db_path} after {self.timeout:.0f}s")
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            s = self._stats
+            s["checkouts"] += 1
+            s["hits" if hit else "misses"] += 1
+            if waited:
+                s["waits"] += 1
+                s["wait_seconds"] += elapsed
+            s["checkout_seconds"] += elapsed
+            s["max_checkout_seconds"] = max(s["max_checkout_seconds"], elapsed)
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """``with pool.connection() as conn:`` -- connection goes back to the pool afterwards."""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            # error ho tab bhi wapas pool me (khuli transaction rollback ho jati hai)
+            self._checkin(conn)
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of pool metrics (hits/misses/waits and checkout latency in ms)."""
+        with self._lock:
+            s = dict(self._stats)
+            created = self._created
+        n = s["checkouts"] or 1
+        return {
+            "size": self.size,
+            "open": created,
+            "idle": self._idle.qsize(),
+            "checkouts": s["checkouts"],
+            "hits": s["hits"],
+            "misses": s["misses"],
+            "hit_rate": s["hits"] / n if s["checkouts"] else 0.0,
+            "waits": s["waits"],
+            "timeouts": s["timeouts"],
+            "avg_wait_ms": 1000 * s["wait_seconds"] / s["waits"] if s["waits"] else 0.0,
+            "avg_checkout_ms": 1000 * s["checkout_seconds"] / n,
+            "max_checkout_ms": 1000 * s["max_checkout_seconds"],
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,209 @@
+# poori filtered query ka CSV / Parquet export -- chunks me DB se padh ke seedha temp file me likhta hai
+# (na poora DataFrame memory me, na uska bytes blob). Background thread me chalta hai, progress ke saath.
+import gzip
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 100_000
+# saare export temp files isi folder me -- startup sweep sirf yahi saaf karta hai
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "floatchat_exports")
+EXPORT_MAX_AGE_S = 24 * 3600
+
+# format -> (file suffix, allowed compressions; pehla default)
+EXPORT_FORMATS = {
+    "csv": (".csv", [None, "gzip"]),
+    "parquet": (".parquet", ["zstd", "snappy", "gzip", None]),
+}
+
+
+def sql_chunks(db_path: str, sql: str, params: Sequence = (), chunk_rows: int = DEFAULT_CHUNK_ROWS,
+               cancel: Optional[threading.Event] = None) -> Iterator[pd.DataFrame]:
+    """Run ``sql`` on its own read-only connection and yield DataFrames of ``chunk_rows`` rows.
+
+    Apna connection, pool ka nahi -- lamba export baaki sessions ke connections nahi rokta.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        cur = conn.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        while not (cancel and cancel.is_set()):
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        conn.close()
+
+
+def sql_count(db_path: str, sql: str, params: Sequence = ()) -> int:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _parquet_schema(chunk: pd.DataFrame):
+    """argo_data columns => parquet_store.SCHEMA (time as timestamp), anything else inferred."""
+    import pyarrow as pa
+
+    from parquet_store import SCHEMA
+
+    if list(chunk.columns) == SCHEMA.names:
+        return SCHEMA
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    # pehle chunk me poora NULL column => null type; baad ke chunks fit ho isliye string
+    return pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in schema])
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame], path: str, fmt: str = "csv", compression: Optional[str] = None,
+                 on_chunk: Optional[Callable[[int], None]] = None) -> int:
+    """Append DataFrame chunks to ``path`` as CSV or Parquet. Returns rows written."""
+    rows = 0
+    if fmt == "csv":
+        opener = (lambda: gzip.open(path, "wt", encoding="utf-8", newline="")) if compression == "gzip" \
+            else (lambda: open(path, "w", encoding="utf-8", newline=""))
+        with opener() as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, header=i == 0, index=False)
+                rows += len(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+        return rows
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    schema = _parquet_schema(chunk)
+                    writer = pq.ParquetWriter(path, schema, compression=compression or "none")
+                if "time" in chunk and pa.types.is_timestamp(schema.field("time").type):
+                    chunk = chunk.assign(time=pd.to_datetime(chunk["time"]))
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows += len(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+    raise ValueError(f"unknown export format {fmt!r} (use one of {sorted(EXPORT_FORMATS)})")
+
+
+class ExportJob:
+    """Background export of a chunk source into a temp file.
+
+    ``chunks`` is called inside the worker thread with a cancel Event and
+    must return an iterator of DataFrames; ``count`` (optional) gives the
+    total row count for the progress bar. The file stays on disk (in
+    EXPORT_DIR by default) until cleanup() or sweep_exports().
+    """
+
+    def __init__(self, chunks: Callable[[threading.Event], Iterable[pd.DataFrame]], fmt: str = "csv",
+                 compression: Optional[str] = None, count: Optional[Callable[[], int]] = None,
+                 name: str = "argo_export", out_dir: Optional[str] = None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format {fmt!r} (use one of {sorted(EXPORT_FORMATS)})")
+        suffix, allowed = EXPORT_FORMATS[fmt]
+        if compression not in allowed:
+            raise ValueError(f"{fmt} export supports compression {allowed}, not {compression!r}")
+        if fmt == "csv" and compression == "gzip":
+            suffix += ".gz"
+        self.fmt = fmt
+        self.compression = compression
+        self.file_name = name + suffix
+        out_dir = out_dir or EXPORT_DIR
+        os.makedirs(out_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=f"{name}_", suffix=suffix, dir=out_dir)
+        os.close(fd)
+        self.rows = 0
+        self.total: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.started = self.finished = None
+        self._chunks = chunks
+        self._count = count
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "ExportJob":
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _add(self, n: int) -> None:
+        self.rows += n
+
+    def _run(self) -> None:
+        try:
+            if self._count is not None:
+                self.total = self._count()
+            write_chunks(self._chunks(self._cancel), self.path, self.fmt, self.compression, on_chunk=self._add)
+            if self._cancel.is_set():
+                self.cleanup()
+        except Exception as e:
+            self.error = e
+            self.cleanup()
+        finally:
+            self.finished = time.perf_counter()
+            self._done.set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def progress(self) -> Dict[str, object]:
+        """rows, total, fraction (None until the total is known), bytes, elapsed_s, rows_per_sec."""
+        end = self.finished or time.perf_counter()
+        elapsed = end - self.started if self.started else 0.0
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        fraction = None
+        if self.done and self.error is None and not self.cancelled:
+            fraction = 1.0
+        elif self.total:
+            fraction = min(self.rows / self.total, 1.0)
+        return {"rows": self.rows, "total": self.total, "fraction": fraction, "bytes": size,
+                "elapsed_s": elapsed, "rows_per_sec": self.rows / elapsed if elapsed else 0.0}
+
+    def cleanup(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def sweep_exports(out_dir: str = EXPORT_DIR, max_age_s: float = EXPORT_MAX_AGE_S) -> int:
+    """Delete export files older than ``max_age_s`` (left behind by closed sessions / restarts). Returns count."""
+    removed = 0
+    cutoff = time.time() - max_age_s
+    try:
+        entries = list(os.scandir(out_dir))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,103 @@
+# local stand-in for the Ollama HTTP API -- bina model/GPU ke chatbot ka streaming, timeout aur cancel test karo
+#
+#   python fake_ollama.py --port 11435 --latency 2 --token-delay 0.05
+#   OLLAMA_HOST=http://localhost:11435 streamlit run dashboard_chatbot.py
+#
+# /api/generate (stream true/false) aur /api/tags. Jawab fenced SQL + baad me lamba explanation hai,
+# taki dikhe ki client SQL milte hi ruk jata hai.
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+DEFAULT_SQL = "SELECT AVG(temperature) AS avg_temperature FROM argo_data WHERE depth <= 100;"
+EXPLANATION = ("\n\nThis query computes the mean temperature of all observations in the upper 100 metres. "
+               "It filters on depth and aggregates over the whole table. " * 5)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split like a model would stream: words and whitespace/punctuation pieces."""
+    return re.findall(r"\s+|\w+|[^\w\s]", text)
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    latency = 0.5      # seconds before the first token
+    token_delay = 0.02  # seconds between tokens
+    sql = DEFAULT_SQL
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._json(200, {"models": [{"name": "gemma3:latest"}]})
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self._json(404, {"error": "not found"})
+            return
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = req.get("model", "gemma3:latest")
+        text = f"```sql\n{self.sql}\n```{EXPLANATION}"
+        time.sleep(self.latency)
+        if not req.get("stream", True):
+            self._json(200, {"model": model, "response": text, "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        try:
+            for tok in tokenize(text):
+                self._chunk({"model": model, "response": tok, "done": False})
+                sent += 1
+                time.sleep(self.token_delay)
+            self._chunk({"model": model, "response": "", "done": True, "eval_count": sent})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # client ko SQL mil gaya ya cancel hua -- asli Ollama bhi yahi generation rok deta hai
+            print(f"client disconnected after {sent} tokens")
+
+    def _chunk(self, payload: dict) -> None:
+        data = (json.dumps(payload) + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def serve(port: int = 11435, latency: float = 0.5, token_delay: float = 0.02, sql: str = DEFAULT_SQL,
+          host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the fake server (call .serve_forever() or run it in a thread)."""
+    handler = type("Handler", (FakeOllamaHandler,), {"latency": latency, "token_delay": token_delay, "sql": sql})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Fake Ollama server with configurable latency")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11435)
+    p.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    p.add_argument("--token-delay", type=float, default=0.02, help="seconds between tokens")
+    p.add_argument("--sql", default=DEFAULT_SQL, help="SQL the fake model answers with")
+    args = p.parse_args()
+    server = serve(args.port, args.latency, args.token_delay, args.sql, args.host)
+    print(f"fake ollama on http://{args.host}:{args.port} (latency {args.latency}s, {args.token_delay}s/token)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
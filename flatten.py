@@ -0,0 +1,146 @@
+# ye code NetCDF grid (TAXIS x ZAX x YAXIS x XAXIS) ko table (rows) mai badalta hai
+# bina 4 nested for loops ke -- numpy broadcasting se seedha columns ban jate hai
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# NetCDF variable names (change if your file differs)
+VAR_TIME = "TAXIS"
+VAR_DEPTH = "ZAX"
+VAR_LAT = "YAXIS"
+VAR_LON = "XAXIS"
+VAR_TEMP = "TEMP"
+VAR_SAL = "SAL"
+
+COLUMNS = ["time", "depth", "lat", "lon", "temperature", "salinity"]
+
+
+def to_datetime64(time_vals) -> np.ndarray:
+    """Same rule as the old loop: numeric time -> datetime64[s], otherwise keep as is."""
+    time_vals = np.asarray(time_vals)
+    if np.issubdtype(time_vals.dtype, np.number):
+        return time_vals.astype("datetime64[s]")
+    return time_vals
+
+
+def flatten_grid(time, depth, lat, lon, temp, sal, skip_nan: bool = False) -> Dict[str, np.ndarray]:
+    """Flatten a (time, depth, lat, lon) block into 1-D columns.
+
+    Row order is the same as the old ``for t / for d / for y / for x`` loop
+    (C order), so results match the previous pickles row for row.
+    """
+    time = to_datetime64(time)
+    depth = np.asarray(depth, dtype="float64")
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    temp = np.asarray(temp)
+    sal = np.asarray(sal)
+
+    shape = (len(time), len(depth), len(lat), len(lon))
+    if temp.shape != shape or sal.shape != shape:
+        raise ValueError(f"TEMP/SAL shape {temp.shape}/{sal.shape} does not match coords {shape}")
+
+    # broadcast_to sirf view banata hai, copy ravel() pe hi hoti hai
+    cols = {
+        "time": np.broadcast_to(time[:, None, None, None], shape).ravel(),
+        "depth": np.broadcast_to(depth[None, :, None, None], shape).ravel(),
+        "lat": np.broadcast_to(lat[None, None, :, None], shape).ravel(),
+        "lon": np.broadcast_to(lon[None, None, None, :], shape).ravel(),
+        "temperature": temp.astype("float64", copy=False).ravel(),
+        "salinity": sal.astype("float64", copy=False).ravel(),
+    }
+    if skip_nan:
+        # land / missing cells (both variables NaN) hata do
+        keep = ~(np.isnan(cols["temperature"]) & np.isnan(cols["salinity"]))
+        if not keep.all():
+            cols = {k: v[keep] for k, v in cols.items()}
+    return cols
+
+
+def _as_slice(idx: np.ndarray):
+    """Contiguous ascending index array -> equivalent slice, otherwise the array itself."""
+    if len(idx) and (len(idx) == 1 or (np.diff(idx) == 1).all()):
+        return slice(int(idx[0]), int(idx[-1]) + 1)
+    return idx
+
+
+def iter_flat_chunks(ds, time_idx=None, depth_idx=None, lat_idx=None, lon_idx=None,
+                     time_chunk: int = 1, depth_chunk: Optional[int] = None,
+                     skip_nan: bool = False) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield flattened columns one (time, depth) slab at a time.
+
+    ``ds`` is an xarray Dataset (open it lazily with ``xr.open_dataset``);
+    only one slab of TEMP/SAL is read into memory at a time, so peak memory
+    depends on the slab size, not on the full grid. The ``*_idx`` arguments
+    are optional integer index arrays / slices / boolean masks per axis.
+    """
+    def _axis(idx, n):
+        if idx is None:
+            return np.arange(n)
+        return np.asarray(np.arange(n)[idx])
+
+    t_all = _axis(time_idx, ds.sizes[VAR_TIME])
+    d_all = _axis(depth_idx, ds.sizes[VAR_DEPTH])
+    y_sel = _axis(lat_idx, ds.sizes[VAR_LAT])
+    x_sel = _axis(lon_idx, ds.sizes[VAR_LON])
+    if depth_chunk is None:
+        depth_chunk = len(d_all) or 1
+
+    # lagatar indexes => slice: NetCDF se ek hyperslab read, fancy (point by point) indexing nahi
+    y_read, x_read = _as_slice(y_sel), _as_slice(x_sel)
+    lat = ds[VAR_LAT].values[y_sel]
+    lon = ds[VAR_LON].values[x_sel]
+    depth_vals = ds[VAR_DEPTH].values
+    time_vals = ds[VAR_TIME].values
+
+    for t0 in range(0, len(t_all), time_chunk):
+        t_sel = t_all[t0:t0 + time_chunk]
+        for d0 in range(0, len(d_all), depth_chunk):
+            d_sel = d_all[d0:d0 + depth_chunk]
+            sel = {VAR_TIME: _as_slice(t_sel), VAR_DEPTH: _as_slice(d_sel), VAR_LAT: y_read, VAR_LON: x_read}
+            temp = ds[VAR_TEMP].isel(sel).values
+            sal = ds[VAR_SAL].isel(sel).values
+            yield flatten_grid(time_vals[t_sel], depth_vals[d_sel], lat, lon, temp, sal, skip_nan=skip_nan)
+
+
+def flatten_dataset(ds, skip_nan: bool = False, **kwargs) -> pd.DataFrame:
+    """Flatten a whole (or index-selected) dataset into one DataFrame.
+
+    Without ``skip_nan`` the row count is known up front, so the output
+    columns are allocated once and filled slab by slab (no list of parts,
+    no concatenate copy).
+    """
+    chunks = iter_flat_chunks(ds, skip_nan=skip_nan, **kwargs)
+    if skip_nan:
+        parts = list(chunks)
+        if not parts:
+            return pd.DataFrame(columns=COLUMNS)
+        return to_frame({c: np.concatenate([p[c] for p in parts]) for c in COLUMNS})
+
+    out = None
+    pos = 0
+    for part in chunks:
+        if out is None:
+            n_total = _count_rows(ds, **kwargs)
+            out = {c: np.empty(n_total, dtype=part[c].dtype) for c in COLUMNS}
+        n = len(part["depth"])
+        for c in COLUMNS:
+            out[c][pos:pos + n] = part[c]
+        pos += n
+    if out is None:
+        return pd.DataFrame(columns=COLUMNS)
+    return to_frame(out)
+
+
+def _count_rows(ds, time_idx=None, depth_idx=None, lat_idx=None, lon_idx=None, **_) -> int:
+    n = 1
+    for idx, dim in ((time_idx, VAR_TIME), (depth_idx, VAR_DEPTH), (lat_idx, VAR_LAT), (lon_idx, VAR_LON)):
+        size = ds.sizes[dim]
+        n *= size if idx is None else len(np.arange(size)[idx])
+    return n
+
+
+def to_frame(cols: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Columns dict -> DataFrame with the usual argo_data column order."""
+    return pd.DataFrame(cols, columns=COLUMNS, copy=False)
@@ -0,0 +1,78 @@
+# chatbot globe ke raw points ke liye binary render path -- pdk.Layer(data=df) har row ko JSON object banata hai
+# aur color expression browser me row-by-row chalti hai. Yaha positions (float32) aur colors (uint8 RGBA)
+# server pe hi NumPy se ban jate hai aur deck.gl ko typed arrays (binary attributes) ki tarah jate hai:
+# 100k points = ~1.6 MB bytes vs ~13 MB JSON records. Poori row (float_id, depth, salinity, time) tooltip me
+# nahi jati -- click pe component index wapas bhejta hai aur row server wale DataFrame se nikalti hai (row_details).
+import os
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "globe_component")
+TEMP_SCALE_MAX = 30.0                       # purane get_fill_color expression jaisa: temperature / 30
+NAN_COLOR = (160, 160, 160, 180)            # temperature missing => grey
+
+
+def point_arrays(df: pd.DataFrame, value_col: str = "temperature", vmax: float = TEMP_SCALE_MAX
+                 ) -> Dict[str, np.ndarray]:
+    """Typed arrays for a ScatterplotLayer: positions (n, 2) float32 [lon, lat],
+    colors (n, 4) uint8 RGBA and the coloring values (n,) float32.
+
+    Same ramp as the old ``[255, (1 - t/30) * 255, (t/30) * 255]`` string
+    expression, but evaluated once, vectorized, with the ratio clipped to 0–1.
+    """
+    n = len(df)
+    positions = np.empty((n, 2), dtype=np.float32)
+    positions[:, 0] = df["lon"].to_numpy(dtype=np.float32)
+    positions[:, 1] = df["lat"].to_numpy(dtype=np.float32)
+    values = df[value_col].to_numpy(dtype=np.float32)
+    missing = np.isnan(values)
+    ratio = np.clip(np.where(missing, 0.0, values) / vmax, 0.0, 1.0)
+    colors = np.empty((n, 4), dtype=np.uint8)
+    colors[:, 0] = 255
+    colors[:, 1] = ((1.0 - ratio) * 255).astype(np.uint8)
+    colors[:, 2] = (ratio * 255).astype(np.uint8)
+    colors[:, 3] = 255
+    colors[missing] = NAN_COLOR
+    return {"positions": positions, "colors": colors, "values": values}
+
+
+def payload_bytes(arrays: Dict[str, np.ndarray]) -> int:
+    """Raw bytes of the binary attributes."""
+    return sum(a.nbytes for a in arrays.values())
+
+
+@lru_cache(maxsize=1)
+def _component():
+    import streamlit.components.v1 as components
+
+    return components.declare_component("binary_globe", path=COMPONENT_DIR)
+
+
+def binary_globe(arrays: Dict[str, np.ndarray], radius: float = 40000, height: int = 600,
+                 view: Optional[Dict[str, float]] = None, label: str = "Temp (°C)", key: Optional[str] = None
+                 ) -> Optional[int]:
+    """deck.gl globe with binary position/color attributes; returns the index of the clicked point.
+
+    pydeck's own binary transport only works in the Jupyter widget, not in
+    Streamlit's pydeck_chart (which always sends JSON), so the layer lives
+    in a small bidirectional component (globe_component/) that gets the
+    arrays as bytes args and sends the picked index back (None until a click).
+    The default key follows the data, so a new point set starts unpicked.
+    """
+    view = view or {"latitude": 0, "longitude": 0, "zoom": 1, "minZoom": 0, "maxZoom": 15, "pitch": 30, "bearing": 0}
+    raw = {name: np.ascontiguousarray(a).tobytes() for name, a in arrays.items()}
+    # points badle ya nahi -- browser isi se decide karta hai ki attributes dobara upload kare
+    data_key = f"{len(arrays['values'])}-{zlib.crc32(raw['positions']):08x}-{zlib.crc32(raw['colors']):08x}"
+    return _component()(n=len(arrays["values"]), data_key=data_key, radius=float(radius), height=int(height),
+                        view=view, label=label, key=key or f"binary_globe-{data_key}", default=None, **raw)
+
+
+def row_details(df: pd.DataFrame, index: int) -> Tuple[bool, pd.DataFrame]:
+    """The full row behind a picked point index (lazy tooltip); (found, one-row frame)."""
+    if not 0 <= int(index) < len(df):
+        return False, df.iloc[0:0]
+    return True, df.iloc[[int(index)]]
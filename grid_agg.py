@@ -0,0 +1,65 @@
+# map ke liye lat/lon grid aggregation -- raw points ki jagah har cell ka count/mean/min/max
+# cell size current bounding box se nikalta hai, isliye map pe hamesha ~target_cells hi jate hai
+# chahe filter me 500 rows ho ya 2 crore
+import math
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+VARS = ("temperature", "salinity")
+STATS = ("mean", "min", "max")
+
+# map payload ka size -- itne cells se zyada kabhi nahi bhejte
+DEFAULT_TARGET_CELLS = 2500
+
+
+def cell_size(lat_rng, lon_rng, target_cells: int = DEFAULT_TARGET_CELLS, min_deg: float = 0.05) -> float:
+    """Square cell size (degrees) so that the bbox splits into about ``target_cells`` cells."""
+    span_lat = max(float(lat_rng[1]) - float(lat_rng[0]), min_deg)
+    span_lon = max(float(lon_rng[1]) - float(lon_rng[0]), min_deg)
+    size = math.sqrt(span_lat * span_lon / max(int(target_cells), 1))
+    return max(size, min_deg)
+
+
+def grid_shape(lat_rng, lon_rng, cell: float) -> Tuple[int, int]:
+    ny = int(math.floor((lat_rng[1] - lat_rng[0]) / cell)) + 1
+    nx = int(math.floor((lon_rng[1] - lon_rng[0]) / cell)) + 1
+    return ny, nx
+
+
+def add_cell_centers(cells: pd.DataFrame, lat_rng, lon_rng, cell: float) -> pd.DataFrame:
+    """iy/ix cell indexes -> lat/lon cell centres (clipped to the bbox)."""
+    cells = cells.copy()
+    cells["lat"] = np.minimum(lat_rng[0] + (cells["iy"] + 0.5) * cell, lat_rng[1])
+    cells["lon"] = np.minimum(lon_rng[0] + (cells["ix"] + 0.5) * cell, lon_rng[1])
+    cells["cell_deg"] = cell
+    return cells
+
+
+def aggregate_frame(df: pd.DataFrame, lat_rng, lon_rng, cell: float) -> pd.DataFrame:
+    """NumPy/pandas version of queries.build_grid_select for already-loaded rows
+    (pickle data, Parquet backend)."""
+    cols = ["iy", "ix", "count"] + [f"{v}_{s}" for v in VARS for s in STATS]
+    if df.empty:
+        return add_cell_centers(pd.DataFrame(columns=cols), lat_rng, lon_rng, cell)
+    iy = ((df["lat"].to_numpy() - lat_rng[0]) // cell).astype("int64")
+    ix = ((df["lon"].to_numpy() - lon_rng[0]) // cell).astype("int64")
+    temp = df["temperature"].to_numpy(dtype="float64")
+    sal = df["salinity"].to_numpy(dtype="float64")
+    keyed = pd.DataFrame({"iy": iy, "ix": ix, "temperature": temp, "salinity": sal,
+                          "has_obs": ~(np.isnan(temp) & np.isnan(sal))})
+    grouped = keyed.groupby(["iy", "ix"], sort=False)
+    cells = grouped[list(VARS)].agg(list(STATS))
+    cells.columns = [f"{v}_{s}" for v, s in cells.columns]
+    cells["count"] = grouped["has_obs"].sum()
+    cells = cells.reset_index()
+    # sirf land (sab NaN) wale cells mat bhejo
+    cells = cells[cells["count"] > 0]
+    return add_cell_centers(cells[cols], lat_rng, lon_rng, cell)
+
+
+def map_zoom(lat_rng, lon_rng) -> float:
+    """Rough web-mercator zoom level that fits the bbox (for plotly / pydeck view state)."""
+    span = max(float(lat_rng[1]) - float(lat_rng[0]), float(lon_rng[1]) - float(lon_rng[0]), 0.1)
+    return float(max(0.0, min(12.0, math.log2(360.0 / span))))
@@ -0,0 +1,429 @@
+# ye code NetCDF file ko seedha argo.db mai dalta hai (pickle wala step nahi chahiye)
+# TEMP/SAL ko (time, depth) slabs mai padhta hai, har slab executemany se insert hota hai
+# isliye RAM utni hi lagti hai jitna ek slab -- grid kitna bhi bada ho
+#
+# incremental: argo_manifest (manifest.py) me har file ka size/mtime/hash aur har time step ki rowid range
+# rehti hai. Dubara chalao to unchanged files skip, naye time steps append, badle hue slices replace;
+# profile aggregate, argo_meta aur R*Tree usi hisaab se update hote hai (rebuild nahi).
+#
+# usage:  python ingest.py data/argo_sample.nc --db argo.db            (fresh DB)
+#         python ingest.py data/new_day.nc --db argo.db --incremental  (existing DB me add / update)
+import argparse
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from flatten import COLUMNS, iter_flat_chunks
+from manifest import (MANIFEST_TABLE, SLICES_TABLE, create_manifest_tables, delete_slice_entry, file_sha256,
+                      file_stat, get_file, get_slices, loaded_time_steps, put_file, put_slice, slice_hashes,
+                      total_rows)
+from meta import MetaCollector, build_meta, read_meta, write_meta
+from profile_agg import PROFILE_TABLE, create_profile_table, tile_sums, upsert_sums
+from queries import build_indexes, format_time, has_table, rtree_name
+
+DB_PATH = "argo.db"
+TABLE_NAME = "argo_data"
+NC_PATH = "data/argo_sample.nc"
+
+# sirf ingest ke time ke liye -- crash hua to dubara ingest kar lo, isliye durability off
+INGEST_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "cache_size": -262144,  # KiB me (negative) => ~256 MB page cache
+    "temp_store": "MEMORY",
+}
+# existing DB me add karte waqt journal on rehta hai -- crash pe sirf adhuri file rollback hoti hai
+INCREMENTAL_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "cache_size": -262144,
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Dict[str, object]) -> None:
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def create_table(conn: sqlite3.Connection, table: str = TABLE_NAME, replace: bool = True) -> None:
+    """Same schema that ``df.to_sql`` used to create in to_sqlite.py."""
+    if replace:
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS "{table}" ('
+        '"time" TIMESTAMP, "depth" REAL, "lat" REAL, "lon" REAL, '
+        '"temperature" REAL, "salinity" REAL)'
+    )
+
+
+def iter_rows(cols: Dict[str, np.ndarray]) -> Iterator[Tuple]:
+    """Column arrays -> row tuples for executemany (NaN becomes NULL in SQLite)."""
+    # ek slab mai time ke sirf kuch unique values hote hai, unko ek baar hi format karo
+    uniq, inv = np.unique(cols["time"], return_inverse=True)
+    time_txt = format_time(uniq)[inv].tolist()
+    return zip(time_txt, *(cols[c].tolist() for c in COLUMNS[1:]))
+
+
+def tap(chunks: Iterable[Dict[str, np.ndarray]], fn: Callable[[Dict[str, np.ndarray]], None]
+        ) -> Iterator[Dict[str, np.ndarray]]:
+    """Pass chunks through unchanged, calling ``fn`` on each (profile sums, meta stats...)."""
+    for cols in chunks:
+        fn(cols)
+        yield cols
+
+
+def max_rowid(conn: sqlite3.Connection, table: str = TABLE_NAME) -> int:
+    return conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{table}"').fetchone()[0]
+
+
+def insert_slice(conn: sqlite3.Connection, chunks: Iterable[Dict[str, np.ndarray]], table: str,
+                 collector: MetaCollector, profile: bool, rtree: bool,
+                 sums: Optional[Iterable[pd.DataFrame]] = None) -> Tuple[int, Optional[int], Optional[int]]:
+    """Insert the chunks of one time step; returns (rows, first_rowid, last_rowid).
+
+    Rows of one step go in back to back, so they get one contiguous rowid
+    range (new rowid = MAX(rowid) + 1) -- that range is what the manifest
+    keeps to delete / replace the slice later. ``sums`` are tile sums
+    already computed elsewhere (parallel_ingest workers); otherwise they
+    are computed here from the chunks.
+    """
+    sql = f'INSERT INTO "{table}" ({", ".join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)'
+    first = max_rowid(conn, table) + 1
+    if profile and sums is None:
+        chunks = tap(chunks, lambda cols: upsert_sums(conn, tile_sums(cols)))
+    elif profile:
+        for part in sums:
+            upsert_sums(conn, part)
+    n = 0
+    for cols in tap(chunks, collector.update):
+        if len(cols["depth"]):
+            conn.executemany(sql, iter_rows(cols))
+            n += len(cols["depth"])
+    if n == 0:
+        return 0, None, None
+    last = first + n - 1
+    if rtree:
+        conn.execute(
+            f'INSERT INTO "{rtree_name(table)}" SELECT rowid, lat, lat, lon, lon, depth, depth '
+            f'FROM "{table}" WHERE rowid BETWEEN ? AND ?', (first, last)
+        )
+    return n, first, last
+
+
+def delete_rows(conn: sqlite3.Connection, first: Optional[int], last: Optional[int], table: str,
+                collector: MetaCollector, profile: bool, rtree: bool, chunk_rows: int = 500_000) -> int:
+    """Delete one slice's rowid range, subtracting it from the aggregates first."""
+    if first is None:
+        return 0
+    query = f'SELECT {", ".join(COLUMNS)} FROM "{table}" WHERE rowid BETWEEN ? AND ?'
+    for chunk in pd.read_sql(query, conn, params=(first, last), chunksize=chunk_rows):
+        cols = {c: chunk[c].to_numpy(dtype="float64") for c in COLUMNS[1:]}
+        cols["time"] = pd.to_datetime(chunk["time"]).to_numpy()
+        if profile:
+            upsert_sums(conn, tile_sums(cols), sign=-1)
+        collector.remove(cols)
+    if rtree:
+        conn.execute(f'DELETE FROM "{rtree_name(table)}" WHERE id IN '
+                     f'(SELECT rowid FROM "{table}" WHERE rowid BETWEEN ? AND ?)', (first, last))
+    return conn.execute(f'DELETE FROM "{table}" WHERE rowid BETWEEN ? AND ?', (first, last)).rowcount
+
+
+def new_stats() -> Dict[str, int]:
+    return {"skipped": 0, "unchanged": 0, "appended": 0, "replaced": 0, "removed": 0,
+            "rows_inserted": 0, "rows_deleted": 0}
+
+
+def stat_changed(conn: sqlite3.Connection, nc_path: str) -> bool:
+    """False when the manifest already has this file with the same size and mtime."""
+    path, size, mtime = file_stat(nc_path)
+    entry = get_file(conn, path)
+    return not (entry and entry["size"] == size and entry["mtime"] == mtime)
+
+
+def scan_file(nc_path: str, known_sha: Optional[str] = None) -> Dict[str, object]:
+    """Stat + sha256 + per-time-step hashes of one file (no DB access -- runs in workers too).
+
+    ``hashes`` is None when the content still matches ``known_sha``.
+    """
+    path, size, mtime = file_stat(nc_path)
+    sha = file_sha256(nc_path)
+    hashes = None
+    if sha != known_sha:
+        with xr.open_dataset(nc_path) as ds:
+            hashes = slice_hashes(ds)
+    return {"path": path, "size": size, "mtime": mtime, "sha256": sha, "hashes": hashes}
+
+
+def plan_slices(conn: sqlite3.Connection, scan: Dict[str, object]) -> Tuple[List[str], List[Tuple[int, str, str]]]:
+    """(time steps that vanished from the file, [(step index, time, hash)] to (re)load, in load order)."""
+    if scan["hashes"] is None:
+        return [], []
+    old = get_slices(conn, scan["path"])
+    removed = [t for t in old if t not in scan["hashes"]]
+    load = [(i, t, h) for i, (t, h) in enumerate(scan["hashes"].items())
+            if t not in old or old[t]["sha256"] != h]
+    return removed, load
+
+
+def sync_file(conn: sqlite3.Connection, scan: Dict[str, object],
+              load_step: Callable[[int], Tuple[Iterable[Dict[str, np.ndarray]], Optional[Iterable[pd.DataFrame]]]],
+              table: str, collector: MetaCollector, profile: bool, rtree: bool) -> Dict[str, int]:
+    """Apply one scanned file to the DB in a single transaction.
+
+    ``load_step(i)`` returns (chunks, tile sums or None) for step ``i`` and
+    is called in plan_slices() order.
+    """
+    stats = new_stats()
+    path = scan["path"]
+    # poori file ek transaction -- beech me crash hua to agli baar ye file phir se shuru se
+    conn.execute("BEGIN")
+    try:
+        if scan["hashes"] is None:
+            # sirf touch hua (copy / mtime badla) -- content wahi
+            stats["skipped"] = 1
+        else:
+            old = get_slices(conn, path)
+            removed, load = plan_slices(conn, scan)
+            for t in removed:
+                stats["rows_deleted"] += delete_rows(conn, old[t]["first_rowid"], old[t]["last_rowid"], table,
+                                                     collector, profile, rtree)
+                delete_slice_entry(conn, path, t)
+                stats["removed"] += 1
+            stats["unchanged"] = len(scan["hashes"]) - len(load)
+            for i, t, h in load:
+                prev = old.get(t)
+                if prev:
+                    stats["rows_deleted"] += delete_rows(conn, prev["first_rowid"], prev["last_rowid"], table,
+                                                         collector, profile, rtree)
+                    stats["replaced"] += 1
+                else:
+                    stats["appended"] += 1
+                chunks, sums = load_step(i)
+                rows, first, last = insert_slice(conn, chunks, table, collector, profile, rtree, sums=sums)
+                put_slice(conn, path, t, h, rows, first, last)
+                stats["rows_inserted"] += rows
+        put_file(conn, path, scan["size"], scan["mtime"], scan["sha256"])
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return stats
+
+
+def report_file(nc_path: str, stats: Dict[str, int]) -> None:
+    print(f"  {nc_path}: +{stats['appended']} new / {stats['replaced']} replaced / "
+          f"-{stats['removed']} removed / {stats['unchanged']} unchanged time steps "
+          f"({stats['rows_inserted']:,} rows in, {stats['rows_deleted']:,} out)")
+
+
+def ingest_file(conn: sqlite3.Connection, nc_path: str, table: str, depth_chunk: int, skip_nan: bool,
+                collector: MetaCollector, profile: bool, rtree: bool, verbose: bool = True) -> Dict[str, int]:
+    """Bring one NetCDF file in sync with the DB."""
+    if not stat_changed(conn, nc_path):
+        return dict(new_stats(), skipped=1)
+    entry = get_file(conn, file_stat(nc_path)[0])
+    scan = scan_file(nc_path, entry["sha256"] if entry else None)
+    if scan["hashes"] is None:
+        return sync_file(conn, scan, None, table, collector, profile, rtree)
+    with xr.open_dataset(nc_path) as ds:  # lazy -- values slab by slab hi load honge
+        stats = sync_file(conn, scan,
+                          lambda i: (iter_flat_chunks(ds, time_idx=[i], depth_chunk=depth_chunk,
+                                                      skip_nan=skip_nan), None),
+                          table, collector, profile, rtree)
+    if verbose:
+        report_file(nc_path, stats)
+    return stats
+
+
+def finish_bulk(conn: sqlite3.Connection, table: str, index: bool, verbose: bool) -> Dict[str, float]:
+    """After a bulk load: build indexes (if asked) and put durable pragmas back."""
+    out = {}
+    if index:
+        # indexes bulk insert ke baad banao -- row by row update karne se kaafi fast
+        t0 = time.perf_counter()
+        conn.execute("BEGIN")
+        build_indexes(conn, table, verbose=verbose)
+        conn.execute("COMMIT")
+        out["index_seconds"] = time.perf_counter() - t0
+    # normal (durable) settings wapas
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA synchronous=FULL")
+    return out
+
+
+def load_chunks(chunks: Iterable[Dict[str, np.ndarray]], db_path: str, table: str = TABLE_NAME,
+                index: bool = True, profile: bool = True, commit_rows: int = 2_000_000,
+                verbose: bool = True) -> Dict[str, float]:
+    """Bulk load a stream of flattened chunks into a fresh DB (regional extracts, subset.py).
+
+    No manifest is written: such a DB is a derived copy, so it is rebuilt
+    rather than updated incrementally.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    start = time.perf_counter()
+    sql = f'INSERT INTO "{table}" ({", ".join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)'
+    rows = pending = 0
+    try:
+        apply_pragmas(conn, INGEST_PRAGMAS)
+        create_table(conn, table, replace=True)
+        # purane run ka manifest bacha ho to hatao -- warna --incremental isse apna DB samjhega
+        conn.execute(f'DROP TABLE IF EXISTS "{SLICES_TABLE}"')
+        conn.execute(f'DROP TABLE IF EXISTS "{MANIFEST_TABLE}"')
+        if profile:
+            create_profile_table(conn, replace=True)
+            chunks = tap(chunks, lambda cols: upsert_sums(conn, tile_sums(cols)))
+        collector = MetaCollector()
+        conn.execute("BEGIN")
+        for cols in tap(chunks, collector.update):
+            if len(cols["depth"]):
+                conn.executemany(sql, iter_rows(cols))
+                rows += len(cols["depth"])
+                pending += len(cols["depth"])
+            if pending >= commit_rows:
+                # journal chhota rakho -- ek transaction me crore rows nahi
+                conn.execute("COMMIT")
+                conn.execute("BEGIN")
+                pending = 0
+                if verbose:
+                    print(f"  {rows:,} rows")
+        # argo_meta: bounds / depth levels / time steps / histograms for the dashboard sidebar
+        write_meta(conn, collector.result())
+        conn.execute("COMMIT")
+        stats = finish_bulk(conn, table, index, verbose)
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    stats.update({"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else 0.0})
+    return stats
+
+
+def ingest_files(nc_paths: Sequence[str], db_path: str = DB_PATH, table: str = TABLE_NAME,
+                 depth_chunk: int = 5, skip_nan: bool = False, replace: bool = False,
+                 index: bool = True, profile: bool = True, verbose: bool = True,
+                 workers: int = 0) -> Dict[str, float]:
+    """Idempotent NetCDF -> SQLite ingest driven by the manifest.
+
+    On a fresh (or ``replace``d) DB everything is bulk inserted and the
+    indexes are built once at the end. On an existing DB each file is
+    diffed against the manifest per time step, and the profile aggregate,
+    argo_meta and R*Tree are patched for just the rows that changed.
+    With ``workers`` > 0 decoding runs in a process pool (parallel_ingest.py);
+    this process stays the only writer.
+    """
+    # isolation_level=None => BEGIN/COMMIT hum khud control karte hai
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    start = time.perf_counter()
+    try:
+        fresh = replace or not has_table(conn, table)
+        if fresh:
+            apply_pragmas(conn, INGEST_PRAGMAS)
+            create_table(conn, table, replace=True)
+            create_manifest_tables(conn, replace=True)
+            if profile:
+                create_profile_table(conn, replace=True)
+            meta = None
+        else:
+            apply_pragmas(conn, INCREMENTAL_PRAGMAS)
+            if max_rowid(conn, table) and not has_table(conn, MANIFEST_TABLE):
+                raise RuntimeError(f"{db_path}:{table} was built without a manifest (to_sqlite.py / old ingest); "
+                                   "re-create it once with a full ingest before adding files incrementally")
+            create_manifest_tables(conn)
+            profile = profile and has_table(conn, PROFILE_TABLE)
+            meta = read_meta(conn)
+        collector = MetaCollector.from_meta(meta) if meta else MetaCollector()
+        # fresh DB pe R*Tree aakhir me ek baar banta hai; existing DB pe row by row maintain hota hai
+        rtree = not fresh and has_table(conn, rtree_name(table))
+
+        totals: Dict[str, float] = {"files": len(nc_paths)}
+        if workers:
+            from parallel_ingest import sync_parallel  # pool sirf tab jab maanga ho
+
+            file_stats = sync_parallel(conn, nc_paths, workers, table, depth_chunk, skip_nan, collector, profile,
+                                       rtree, verbose=verbose)
+        else:
+            file_stats = (ingest_file(conn, nc_path, table, depth_chunk, skip_nan, collector, profile, rtree,
+                                      verbose=verbose) for nc_path in nc_paths)
+        for stats in file_stats:
+            for k, v in stats.items():
+                totals[k] = totals.get(k, 0) + v
+        changed = totals.get("rows_inserted", 0) or totals.get("rows_deleted", 0)
+
+        conn.execute("BEGIN")
+        if changed and profile:
+            # poore subtract hue cells ka koi matlab nahi
+            conn.execute(f'DELETE FROM "{PROFILE_TABLE}" WHERE n_temperature <= 0 AND n_salinity <= 0')
+        if changed or fresh:
+            if fresh or meta:
+                # time steps / rows manifest se -- slice hate to uske time step bhi hatne chahiye
+                collector.times = set(loaded_time_steps(conn))
+                collector.rows = total_rows(conn)
+                write_meta(conn, collector.result())
+            else:
+                build_meta(conn, table)
+        conn.execute("COMMIT")
+
+        if fresh:
+            totals.update(finish_bulk(conn, table, index, verbose))
+        elif changed:
+            # (time, depth) B-tree SQLite khud maintain karta hai; planner stats zaroorat ho to refresh
+            conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - start
+    rows = totals.get("rows_inserted", 0)
+    totals.update({"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else 0.0})
+    return totals
+
+
+def ingest_netcdf(nc_path: str = NC_PATH, db_path: str = DB_PATH, table: str = TABLE_NAME,
+                  depth_chunk: int = 5, skip_nan: bool = False, replace: bool = True,
+                  index: bool = True, profile: bool = True, verbose: bool = True) -> Dict[str, float]:
+    """NetCDF -> SQLite in (time, depth) slabs. Returns rows / seconds / rows_per_sec.
+
+    With ``profile`` the depth-profile aggregate table (profile_agg.py) is
+    filled from the same slabs, in the same transactions.
+    """
+    return ingest_files([nc_path], db_path, table, depth_chunk=depth_chunk, skip_nan=skip_nan, replace=replace,
+                        index=index, profile=profile, verbose=verbose)
+
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream NetCDF Argo grids into argo.db")
+    parser.add_argument("nc_paths", nargs="*", default=[NC_PATH])
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--table", default=TABLE_NAME)
+    parser.add_argument("--depth-chunk", type=int, default=5, help="depth levels per slab")
+    parser.add_argument("--incremental", action="store_true",
+                        help="add / update files in an existing DB using the manifest instead of rebuilding")
+    parser.add_argument("--skip-nan", action="store_true", help="drop land/missing cells")
+    parser.add_argument("--no-index", action="store_true", help="skip R*Tree / time index build")
+    parser.add_argument("--no-profile", action="store_true", help="skip the depth-profile aggregate table")
+    args = parser.parse_args()
+
+    mode = "updating" if args.incremental else "ingesting"
+    print(f"{mode.capitalize()} {', '.join(args.nc_paths)} -> {args.db}:{args.table}")
+    stats = ingest_files(args.nc_paths, args.db, args.table, depth_chunk=args.depth_chunk,
+                         skip_nan=args.skip_nan, replace=not args.incremental, index=not args.no_index,
+                         profile=not args.no_profile)
+    print(f"✅ {stats['rows']:,} rows in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
+    if args.incremental:
+        print(f"   files skipped (unchanged): {stats.get('skipped', 0):.0f} / {stats['files']:.0f}; "
+              f"time steps +{stats.get('appended', 0):.0f} new, {stats.get('replaced', 0):.0f} replaced, "
+              f"-{stats.get('removed', 0):.0f} removed")
+    if "index_seconds" in stats:
+        print(f"   indexes built in {stats['index_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# api.py ka load test -- N concurrent clients (har ek apna keep-alive HTTP connection), random bbox queries
+# DB ke asli lat/lon bounds ke andar (ek bina filter wale /grid call se nikalte hai). req/s, latency p50/p90/p99,
+# status codes aur bytes per endpoint.
+#
+#   python api.py --port 8765 &
+#   python load_test.py --port 8765 --clients 16 --duration 20
+#   python load_test.py --endpoints query profile nl --format arrow --out load.json
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import numpy as np
+
+ENDPOINTS = ("query", "grid", "profile", "nl")
+DEFAULT_ENDPOINTS = ("query", "grid", "profile")
+
+
+def corpus_questions(path: str = "nl_corpus.json") -> List[str]:
+    """Template-answerable questions (no LLM call) for the /nl endpoint.
+
+    Corpus entries with ``"sql": null`` are the ones the template parser
+    can't answer -- those would go to Ollama, so they are left out.
+    """
+    try:
+        with open(path) as f:
+            questions = [q["question"] for q in json.load(f) if q.get("sql")]
+    except (OSError, ValueError):
+        questions = []
+    return questions or ["average temperature in the arabian sea"]
+
+
+def random_box(bounds: Dict[str, Tuple[float, float]], rng: random.Random, max_frac: float = 0.3
+               ) -> Dict[str, str]:
+    """Random lat/lon/depth box inside ``bounds``, each side up to ``max_frac`` of the extent."""
+    params = {}
+    for name in ("lat", "lon", "depth"):
+        lo, hi = bounds[name]
+        span = (hi - lo) * rng.uniform(0.02, max_frac)
+        start = rng.uniform(lo, max(lo, hi - span))
+        params[name] = f"{start:.3f},{start + span:.3f}"
+    return params
+
+
+class Client:
+    """One keep-alive connection; ``get`` -> (status, bytes, seconds)."""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def get(self, path: str, params: Dict[str, str]) -> Tuple[int, int, float]:
+        url = f"{path}?{urlencode(params)}"
+        start = time.perf_counter()
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request("GET", url)
+                resp = self.conn.getresponse()
+                body = resp.read()
+                return resp.status, len(body), time.perf_counter() - start
+            except (http.client.HTTPException, OSError):
+                # server ne keep-alive connection band kiya -- ek baar naya connection
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    return 0, 0, time.perf_counter() - start
+        return 0, 0, time.perf_counter() - start
+
+
+def fetch_bounds(host: str, port: int) -> Dict[str, Tuple[float, float]]:
+    """lat/lon/depth extent of the served DB (one unfiltered /grid call)."""
+    conn = http.client.HTTPConnection(host, port, timeout=60.0)
+    try:
+        conn.request("GET", "/grid?cells=100")
+        resp = conn.getresponse()
+        grid = json.loads(resp.read())
+    finally:
+        conn.close()
+    if resp.status != 200 or not grid.get("data"):
+        return {"lat": (-90.0, 90.0), "lon": (0.0, 360.0), "depth": (0.0, 2000.0)}
+    cols = grid["columns"]
+    lat = [row[cols.index("lat")] for row in grid["data"]]
+    lon = [row[cols.index("lon")] for row in grid["data"]]
+    return {"lat": (min(lat), max(lat)), "lon": (min(lon), max(lon)), "depth": (0.0, 2000.0)}
+
+
+def run_load(host: str, port: int, clients: int, duration: float, endpoints=DEFAULT_ENDPOINTS,
+             fmt: str = "json", limit: int = 1000, seed: int = 0, timeout: float = 60.0) -> Dict[str, object]:
+    bounds = fetch_bounds(host, port)
+    questions = corpus_questions()
+    results: List[Tuple[str, int, int, float]] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(i: int) -> None:
+        rng = random.Random(seed + i)
+        client = Client(host, port, timeout)
+        local = []
+        while time.perf_counter() < deadline:
+            endpoint = rng.choice(endpoints)
+            params = {"format": fmt}
+            if endpoint == "nl":
+                params.update(q=rng.choice(questions), limit=str(limit))
+            else:
+                params.update(random_box(bounds, rng))
+                if endpoint == "query":
+                    params["limit"] = str(limit)
+            status, size, secs = client.get(f"/{endpoint}", params)
+            local.append((endpoint, status, size, secs))
+        with lock:
+            results.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(worker, range(clients)))
+    elapsed = time.perf_counter() - start
+    return summarize(results, elapsed, clients)
+
+
+def summarize(results: List[Tuple[str, int, int, float]], elapsed: float, clients: int) -> Dict[str, object]:
+    def stats(rows) -> Dict[str, object]:
+        lat = np.array([r[3] for r in rows]) * 1000 if rows else np.zeros(0)
+        codes: Dict[str, int] = {}
+        for r in rows:
+            codes[str(r[1])] = codes.get(str(r[1]), 0) + 1
+        return {"requests": len(rows), "req_per_sec": len(rows) / elapsed if elapsed else 0.0,
+                "p50_ms": float(np.percentile(lat, 50)) if len(lat) else None,
+                "p90_ms": float(np.percentile(lat, 90)) if len(lat) else None,
+                "p99_ms": float(np.percentile(lat, 99)) if len(lat) else None,
+                "max_ms": float(lat.max()) if len(lat) else None,
+                "errors": sum(1 for r in rows if r[1] != 200), "status": codes,
+                "mb": sum(r[2] for r in rows) / 1e6}
+
+    out = {"clients": clients, "seconds": elapsed, "total": stats(results), "endpoints": {}}
+    for endpoint in sorted({r[0] for r in results}):
+        out["endpoints"][endpoint] = stats([r for r in results if r[0] == endpoint])
+    return out
+
+
+def report(result: Dict[str, object]) -> None:
+    print(f"{result['clients']} clients, {result['seconds']:.1f}s")
+    rows = [("total", result["total"])] + list(result["endpoints"].items())
+    print(f"  {'endpoint':<10}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'errors':>8}{'MB':>8}")
+    for name, s in rows:
+        fmt = lambda v: "—" if v is None else f"{v:,.1f}"
+        print(f"  {name:<10}{s['requests']:>10,}{s['req_per_sec']:>10,.1f}{fmt(s['p50_ms']):>10}"
+              f"{fmt(s['p90_ms']):>10}{fmt(s['p99_ms']):>10}{s['errors']:>8}{s['mb']:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent load test for api.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(DEFAULT_ENDPOINTS),
+                        help="picked at random per request (nl uses template questions from nl_corpus.json)")
+    parser.add_argument("--format", choices=("json", "arrow"), default="json")
+    parser.add_argument("--limit", type=int, default=1000, help="rows per /query and /nl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    try:
+        result = run_load(args.host, args.port, args.clients, args.duration, args.endpoints, args.format,
+                          args.limit, args.seed)
+    except ConnectionRefusedError:
+        sys.exit(f"no API on {args.host}:{args.port} -- start it with: python api.py --port {args.port}")
+    report(result)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ results -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# ingest manifest -- kaunsi NetCDF file kab load hui, uska size/mtime/hash, aur har time step ka
+# argo_data me rowid range. Isse dubara ingest incremental hota hai: unchanged file skip, naye time
+# steps append, badla hua slice hi replace (poori table rebuild nahi).
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flatten import VAR_DEPTH, VAR_LAT, VAR_LON, VAR_SAL, VAR_TEMP, VAR_TIME
+from queries import format_time, has_table
+
+MANIFEST_TABLE = "argo_manifest"
+SLICES_TABLE = "argo_manifest_slices"
+HASH_BLOCK = 1024 * 1024
+
+
+def create_manifest_tables(conn: sqlite3.Connection, replace: bool = False) -> None:
+    if replace:
+        conn.execute(f'DROP TABLE IF EXISTS "{SLICES_TABLE}"')
+        conn.execute(f'DROP TABLE IF EXISTS "{MANIFEST_TABLE}"')
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS "{MANIFEST_TABLE}" ('
+        '"path" TEXT PRIMARY KEY, "size" INTEGER NOT NULL, "mtime" REAL NOT NULL, "sha256" TEXT NOT NULL, '
+        '"time_steps" TEXT NOT NULL, "rows" INTEGER NOT NULL, "loaded_at" REAL NOT NULL)'
+    )
+    # ek (file, time step) = argo_data me ek lagatar rowid range (ingest time step by time step karta hai)
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS "{SLICES_TABLE}" ('
+        '"path" TEXT NOT NULL, "time" TEXT NOT NULL, "sha256" TEXT NOT NULL, "rows" INTEGER NOT NULL, '
+        '"first_rowid" INTEGER, "last_rowid" INTEGER, PRIMARY KEY ("path", "time")) WITHOUT ROWID'
+    )
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_stat(path: str) -> Tuple[str, int, float]:
+    """(absolute path, size, mtime) -- manifest ki key absolute path hai."""
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime
+
+
+def slice_hashes(ds) -> Dict[str, str]:
+    """{'YYYY-MM-DD HH:MM:SS': sha256} per time step of a NetCDF grid.
+
+    Covers the step's TEMP/SAL values and the depth/lat/lon coordinates,
+    so a slice only counts as changed when the data it produces changes
+    (not when some other step or an unrelated attribute in the file does).
+    """
+    coords = hashlib.sha256()
+    for var in (VAR_DEPTH, VAR_LAT, VAR_LON):
+        coords.update(ds[var].values.astype("float64").tobytes())
+    times = format_time(ds[VAR_TIME].values).tolist()
+    out = {}
+    for i, t in enumerate(times):
+        h = coords.copy()
+        h.update(t.encode())
+        for var in (VAR_TEMP, VAR_SAL):
+            h.update(ds[var].isel({VAR_TIME: i}).values.astype("float64").tobytes())
+        out[t] = h.hexdigest()
+    return out
+
+
+def get_file(conn: sqlite3.Connection, path: str) -> Optional[Dict[str, object]]:
+    if not has_table(conn, MANIFEST_TABLE):
+        return None
+    row = conn.execute(
+        f'SELECT "size", "mtime", "sha256", "time_steps", "rows", "loaded_at" FROM "{MANIFEST_TABLE}" WHERE "path" = ?',
+        (path,),
+    ).fetchone()
+    if row is None:
+        return None
+    size, mtime, sha, steps, rows, loaded_at = row
+    return {"path": path, "size": size, "mtime": mtime, "sha256": sha, "time_steps": json.loads(steps),
+            "rows": rows, "loaded_at": loaded_at}
+
+
+def get_slices(conn: sqlite3.Connection, path: str) -> Dict[str, Dict[str, object]]:
+    """{time: {"sha256", "rows", "first_rowid", "last_rowid"}} for one file."""
+    out = {}
+    for t, sha, rows, first, last in conn.execute(
+        f'SELECT "time", "sha256", "rows", "first_rowid", "last_rowid" FROM "{SLICES_TABLE}" WHERE "path" = ?',
+        (path,),
+    ):
+        out[t] = {"sha256": sha, "rows": rows, "first_rowid": first, "last_rowid": last}
+    return out
+
+
+def put_slice(conn: sqlite3.Connection, path: str, t: str, sha: str, rows: int,
+              first_rowid: Optional[int], last_rowid: Optional[int]) -> None:
+    conn.execute(
+        f'INSERT OR REPLACE INTO "{SLICES_TABLE}" ("path", "time", "sha256", "rows", "first_rowid", "last_rowid") '
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (path, t, sha, rows, first_rowid, last_rowid),
+    )
+
+
+def delete_slice_entry(conn: sqlite3.Connection, path: str, t: str) -> None:
+    conn.execute(f'DELETE FROM "{SLICES_TABLE}" WHERE "path" = ? AND "time" = ?', (path, t))
+
+
+def put_file(conn: sqlite3.Connection, path: str, size: int, mtime: float, sha: str) -> None:
+    """Upsert the file row; time_steps / rows are summed from its slices."""
+    steps = [t for (t,) in conn.execute(
+        f'SELECT "time" FROM "{SLICES_TABLE}" WHERE "path" = ? ORDER BY "time"', (path,))]
+    rows = conn.execute(f'SELECT COALESCE(SUM("rows"), 0) FROM "{SLICES_TABLE}" WHERE "path" = ?',
+                        (path,)).fetchone()[0]
+    conn.execute(
+        f'INSERT OR REPLACE INTO "{MANIFEST_TABLE}" ("path", "size", "mtime", "sha256", "time_steps", "rows", '
+        '"loaded_at") VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (path, size, mtime, sha, json.dumps(steps), rows, time.time()),
+    )
+
+
+def loaded_time_steps(conn: sqlite3.Connection) -> List[str]:
+    """Every time step that still has rows in argo_data, over all files."""
+    return [t for (t,) in conn.execute(
+        f'SELECT DISTINCT "time" FROM "{SLICES_TABLE}" WHERE "rows" > 0 ORDER BY "time"')]
+
+
+def total_rows(conn: sqlite3.Connection) -> int:
+    return conn.execute(f'SELECT COALESCE(SUM("rows"), 0) FROM "{SLICES_TABLE}"').fetchone()[0]
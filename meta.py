@@ -0,0 +1,154 @@
+# argo_meta table -- global bounds, row count, depth levels, time steps aur temperature/salinity histograms
+# ingest ke time ek baar likha jata hai; dashboard sidebar isko O(1) me padhta hai
+# (har 5 minute poori table pe MIN/MAX scan karne ki zaroorat nahi)
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from manifest import MANIFEST_TABLE
+from queries import TABLE_NAME, format_time, has_table
+
+META_TABLE = "argo_meta"
+
+# fixed histogram bins, taki alag alag slabs ke counts seedhe jod sake
+HIST_BINS = {
+    "temperature": np.arange(-5.0, 40.0 + 0.5, 0.5),
+    "salinity": np.arange(0.0, 45.0 + 0.25, 0.25),
+}
+
+
+class MetaCollector:
+    """Accumulates argo_meta statistics slab by slab during ingest."""
+
+    def __init__(self):
+        self.rows = 0
+        self.bounds: Dict[str, list] = {}
+        self.depths = set()
+        self.times = set()
+        self.hist = {var: np.zeros(len(edges) - 1, dtype="int64") for var, edges in HIST_BINS.items()}
+        self.valid = {var: 0 for var in HIST_BINS}
+
+    def update(self, cols: Dict[str, np.ndarray]) -> None:
+        n = len(cols["depth"])
+        if n == 0:
+            return
+        self.rows += n
+        for col in ("lat", "lon", "depth"):
+            lo, hi = float(np.min(cols[col])), float(np.max(cols[col]))
+            cur = self.bounds.get(col)
+            self.bounds[col] = [lo, hi] if cur is None else [min(cur[0], lo), max(cur[1], hi)]
+        self.depths.update(np.unique(cols["depth"]).tolist())
+        self.times.update(format_time(np.unique(cols["time"])).tolist())
+        for var, edges in HIST_BINS.items():
+            vals = np.asarray(cols[var], dtype="float64")
+            vals = vals[~np.isnan(vals)]
+            self.valid[var] += len(vals)
+            # range ke bahar wale values pehle/aakhri bin me
+            self.hist[var] += np.histogram(np.clip(vals, edges[0], edges[-1]), bins=edges)[0]
+
+    @classmethod
+    def from_meta(cls, meta: Dict[str, object]) -> "MetaCollector":
+        """Resume from a stored argo_meta dict (incremental ingest adds / removes slices on top)."""
+        c = cls()
+        c.rows = int(meta.get("rows") or 0)
+        c.bounds = {col: list(meta[col]) for col in ("lat", "lon", "depth") if meta.get(col)}
+        c.depths = set(meta.get("depth_levels") or [])
+        c.times = set(meta.get("time_steps") or [])
+        for var, edges in HIST_BINS.items():
+            hist = (meta.get("hist") or {}).get(var)
+            if hist and len(hist["counts"]) == len(edges) - 1:
+                c.hist[var] = np.asarray(hist["counts"], dtype="int64")
+            c.valid[var] = int((meta.get("valid") or {}).get(var, 0))
+        return c
+
+    def remove(self, cols: Dict[str, np.ndarray]) -> None:
+        """Undo update() for rows deleted from argo_data.
+
+        Counts and histograms go down exactly; bounds and depth levels
+        can't shrink without a rescan, so they stay as they were. The
+        caller resets ``times`` from the manifest.
+        """
+        n = len(cols["depth"])
+        if n == 0:
+            return
+        self.rows -= n
+        for var, edges in HIST_BINS.items():
+            vals = np.asarray(cols[var], dtype="float64")
+            vals = vals[~np.isnan(vals)]
+            self.valid[var] -= len(vals)
+            self.hist[var] -= np.histogram(np.clip(vals, edges[0], edges[-1]), bins=edges)[0]
+
+    def result(self) -> Dict[str, object]:
+        times = sorted(self.times)
+        return {
+            "rows": self.rows,
+            "lat": self.bounds.get("lat"),
+            "lon": self.bounds.get("lon"),
+            "depth": self.bounds.get("depth"),
+            "time": [times[0], times[-1]] if times else None,
+            "depth_levels": sorted(self.depths),
+            "time_steps": times,
+            "valid": self.valid,
+            "hist": {var: {"edges": HIST_BINS[var].tolist(), "counts": self.hist[var].tolist()}
+                     for var in HIST_BINS},
+        }
+
+
+def write_meta(conn: sqlite3.Connection, meta: Dict[str, object], table: str = META_TABLE) -> None:
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ("key" TEXT PRIMARY KEY, "value" TEXT NOT NULL)')
+    conn.execute(f'DELETE FROM "{table}"')
+    conn.executemany(f'INSERT INTO "{table}" ("key", "value") VALUES (?, ?)',
+                     [(k, json.dumps(v)) for k, v in meta.items()])
+
+
+def read_meta(conn: sqlite3.Connection, table: str = META_TABLE) -> Optional[Dict[str, object]]:
+    """argo_meta as a dict, or None on DBs built before it existed."""
+    if not has_table(conn, table):
+        return None
+    meta = {k: json.loads(v) for k, v in conn.execute(f'SELECT "key", "value" FROM "{table}"')}
+    return meta or None
+
+
+def build_meta(conn: sqlite3.Connection, table: str = TABLE_NAME, chunk_rows: int = 1_000_000) -> Dict[str, object]:
+    """Compute argo_meta from rows already in ``table`` (to_sqlite.py, old DBs). One full pass."""
+    collector = MetaCollector()
+    query = f'SELECT time, depth, lat, lon, temperature, salinity FROM "{table}"'
+    for chunk in pd.read_sql(query, conn, chunksize=chunk_rows):
+        cols = {c: chunk[c].to_numpy(dtype="float64") for c in ("depth", "lat", "lon", "temperature", "salinity")}
+        cols["time"] = pd.to_datetime(chunk["time"]).to_numpy()
+        collector.update(cols)
+    meta = collector.result()
+    write_meta(conn, meta)
+    return meta
+
+
+def data_version(conn: sqlite3.Connection, table: str = TABLE_NAME) -> str:
+    """Short fingerprint of the rows in ``table``; changes whenever an ingest commits.
+
+    argo_meta (row count, bounds, histograms) + the manifest's latest
+    loaded_at; DBs without argo_meta fall back to COUNT / MAX(rowid).
+    """
+    parts = [json.dumps(read_meta(conn), sort_keys=True)]
+    if has_table(conn, MANIFEST_TABLE):
+        parts.append(str(conn.execute(f'SELECT MAX("loaded_at") FROM "{MANIFEST_TABLE}"').fetchone()[0]))
+    if parts[0] == "null" and has_table(conn, table):
+        parts.append(str(conn.execute(f'SELECT COUNT(*), MAX(rowid) FROM "{table}"').fetchone()))
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def hist_quantile(meta: Dict[str, object], var: str, q: float) -> Optional[float]:
+    """Approximate quantile of ``var`` from the stored histogram.
+
+    Rounded outwards to the bin edge (lower edge below the median, upper
+    edge above), so a [q, 1-q] range never cuts into the data.
+    """
+    hist = (meta.get("hist") or {}).get(var)
+    if not hist or not sum(hist["counts"]):
+        return None
+    cum = np.cumsum(hist["counts"])
+    idx = int(np.searchsorted(cum, q * cum[-1]))
+    return float(hist["edges"][idx if q <= 0.5 else idx + 1])
@@ -0,0 +1,188 @@
+# chatbot ke liye persistent NL -> SQL cache (alag SQLite file me, argo.db read-only rehta hai)
+# key = normalized question + model + schema hash; LRU + TTL eviction, size limits ke saath
+# cached result rows ke saath data version (meta.data_version) bhi rakhte hai -- ingest ke baad purane rows
+# nahi milte, sirf SQL reuse hota hai (schema same hai to SQL sahi hi rehta hai)
+# same (ya thoda alag likha hua) sawaal dubara aaye to model ko call hi nahi karna padta
+import hashlib
+import io
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+import pandas as pd
+
+CACHE_PATH = "nl_cache.db"
+CACHE_TABLE = "nl_sql_cache"
+
+DEFAULT_TTL = 7 * 24 * 3600            # 1 hafta
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024   # result sets ka total size
+DEFAULT_MAX_RESULT_BYTES = 2 * 1024 * 1024  # isse bada result set cache nahi hota (sirf SQL)
+
+# aise words jo matlab nahi badalte -- "please show me ..." == "show ..."
+FILLER_WORDS = {"please", "kindly", "pls", "plz", "me", "the", "a", "an", "can", "you", "could", "would",
+                "give", "show", "tell", "what", "is", "are", "of", "for", "list", "find", "get"}
+
+
+# comparison operators matlab badalte hai ("> 20" != "< 20") -- alag tokens rakho, "<>" / "==" ek hi form me
+_OPERATOR_RE = re.compile(r"<=|>=|!=|<>|==|=|<|>")
+_OPERATOR_TOKENS = {"<>": "!=", "==": "="}
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation/filler words, collapse spaces; numbers and comparison operators are kept."""
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = re.sub(r"(?<!\d)[.,](?!\d)", " ", text)        # 1.5 / 1,000 jaise numbers ko mat todo
+    text = _OPERATOR_RE.sub(lambda m: f" {_OPERATOR_TOKENS.get(m.group(), m.group())} ", text)
+    text = re.sub(r"[^\w\s.\-,°<>=!]|!(?!=)", " ", text)
+    words = [w for w in text.split() if w not in FILLER_WORDS]
+    return " ".join(words)
+
+
+def cache_key(question: str, model: str, schema_hash: str) -> str:
+    raw = "\x1f".join([normalize_question(question), model, schema_hash])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class NLSQLCache:
+    """On-disk NL -> SQL (+ optional result set) cache with LRU/TTL eviction."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, max_result_bytes: int = DEFAULT_MAX_RESULT_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_result_bytes = max_result_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{CACHE_TABLE}" ('
+            '"key" TEXT PRIMARY KEY, "question" TEXT NOT NULL, "model" TEXT NOT NULL, '
+            '"schema_hash" TEXT NOT NULL, "sql" TEXT NOT NULL, "result" BLOB, '
+            '"result_bytes" INTEGER NOT NULL DEFAULT 0, "created_at" REAL NOT NULL, '
+            '"last_access" REAL NOT NULL, "hits" INTEGER NOT NULL DEFAULT 0, "data_version" TEXT)'
+        )
+        # purani cache file (data_version column se pehle ki) -- column jod do, uske results kabhi match nahi honge
+        columns = {r[1] for r in self._conn.execute(f'PRAGMA table_info("{CACHE_TABLE}")')}
+        if "data_version" not in columns:
+            self._conn.execute(f'ALTER TABLE "{CACHE_TABLE}" ADD COLUMN "data_version" TEXT')
+        self._conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{CACHE_TABLE}_lru" ON "{CACHE_TABLE}" ("last_access")')
+        self._stats = {"hits": 0, "misses": 0, "result_hits": 0, "stale_results": 0, "expired": 0, "evicted": 0,
+                       "puts": 0}
+
+    # ---------- lookups ----------
+    def get(self, question: str, model: str, schema_hash: str, with_result: bool = False,
+            data_version: Optional[str] = None) -> Optional[Dict]:
+        """Cached entry as {"sql", "result" (DataFrame or None), "hits", "age"} or None.
+
+        The result set is only returned when it was stored for the same
+        ``data_version``; otherwise it is dropped and just the SQL is reused.
+        """
+        key = cache_key(question, model, schema_hash)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT "sql", "result", "created_at", "hits", "data_version" FROM "{CACHE_TABLE}" WHERE "key" = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            sql, blob, created_at, hits, stored_version = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute(f'DELETE FROM "{CACHE_TABLE}" WHERE "key" = ?', (key,))
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute(
+                f'UPDATE "{CACHE_TABLE}" SET "last_access" = ?, "hits" = "hits" + 1 WHERE "key" = ?', (now, key)
+            )
+            self._stats["hits"] += 1
+            if blob is not None and (data_version is None or stored_version != data_version):
+                # ingest ke baad ke purane rows -- hata do, agla put naye version ke saath rakhega
+                self._conn.execute(f'UPDATE "{CACHE_TABLE}" SET "result" = NULL, "result_bytes" = 0 WHERE "key" = ?',
+                                   (key,))
+                self._stats["stale_results"] += 1
+                blob = None
+            result = None
+            if with_result and blob is not None:
+                result = pd.read_pickle(io.BytesIO(blob))
+                self._stats["result_hits"] += 1
+        return {"sql": sql, "result": result, "hits": hits + 1, "age": now - created_at}
+
+    def put(self, question: str, model: str, schema_hash: str, sql: str,
+            result: Optional[pd.DataFrame] = None, data_version: Optional[str] = None) -> None:
+        """Store SQL (and the result set if it is under max_result_bytes and ``data_version``
+        is known), then evict."""
+        blob = None
+        if result is not None and data_version is not None:
+            buf = io.BytesIO()
+            result.to_pickle(buf)
+            if buf.tell() <= self.max_result_bytes:
+                blob = buf.getvalue()
+        now = time.time()
+        with self._lock:
+            # already cached => sirf SQL/result refresh, created_at aur hits wahi rehte hai
+            self._conn.execute(
+                f'INSERT INTO "{CACHE_TABLE}" ("key", "question", "model", "schema_hash", "sql", '
+                '"result", "result_bytes", "created_at", "last_access", "hits", "data_version") '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?) '
+                'ON CONFLICT("key") DO UPDATE SET "sql" = excluded."sql", "result" = excluded."result", '
+                '"result_bytes" = excluded."result_bytes", "last_access" = excluded."last_access", '
+                '"data_version" = excluded."data_version"',
+                (cache_key(question, model, schema_hash), question, model, schema_hash, sql,
+                 blob, len(blob) if blob else 0, now, now, data_version if blob else None),
+            )
+            self._stats["puts"] += 1
+            self._evict(now)
+
+    # ---------- eviction ----------
+    def _evict(self, now: float) -> None:
+        conn = self._conn
+        if self.ttl:
+            cur = conn.execute(f'DELETE FROM "{CACHE_TABLE}" WHERE "created_at" < ?', (now - self.ttl,))
+            self._stats["expired"] += max(cur.rowcount, 0)
+        # LRU: sabse purane (last_access) entries pehle niklenge
+        count, total = conn.execute(
+            f'SELECT COUNT(*), COALESCE(SUM("result_bytes"), 0) FROM "{CACHE_TABLE}"'
+        ).fetchone()
+        if count > self.max_entries:
+            cur = conn.execute(
+                f'DELETE FROM "{CACHE_TABLE}" WHERE "key" IN (SELECT "key" FROM "{CACHE_TABLE}" '
+                'ORDER BY "last_access" LIMIT ?)', (count - self.max_entries,)
+            )
+            self._stats["evicted"] += max(cur.rowcount, 0)
+        if total > self.max_bytes:
+            # pehle bade result sets chhodo (SQL rehne do), LRU order me
+            for key, size in conn.execute(
+                f'SELECT "key", "result_bytes" FROM "{CACHE_TABLE}" WHERE "result_bytes" > 0 '
+                'ORDER BY "last_access"'
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute(f'UPDATE "{CACHE_TABLE}" SET "result" = NULL, "result_bytes" = 0 WHERE "key" = ?',
+                             (key,))
+                total -= size
+                self._stats["evicted"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f'DELETE FROM "{CACHE_TABLE}"')
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries, total, with_result = self._conn.execute(
+                f'SELECT COUNT(*), COALESCE(SUM("result_bytes"), 0), COALESCE(SUM("result" IS NOT NULL), 0) '
+                f'FROM "{CACHE_TABLE}"'
+            ).fetchone()
+            s = dict(self._stats)
+        lookups = s["hits"] + s["misses"]
+        s.update({"entries": entries, "entries_with_result": with_result, "result_bytes": total,
+                  "hit_rate": s["hits"] / lookups if lookups else 0.0})
+        return s
@@ -0,0 +1,205 @@
+# natural language -> SQL (Ollama) -- prompt, schema aur model ke jawab ki safai ek jagah
+# SQLStream: Ollama HTTP API se tokens stream karta hai, poora SQL statement milte hi ruk jata hai,
+# timeout aur cancel (naya sawaal => purana band) ke saath. Local test: python fake_ollama.py
+import hashlib
+import http.client
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+MODEL = "gemma3:latest"
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+DEFAULT_TIMEOUT = 60.0  # seconds, poori generation ke liye
+
+SCHEMA = """
+The SQLite database has one table: argo_data
+Columns: time (datetime), depth (float), lat (float), lon (float),
+temperature (float), salinity (float), float_id (text), ocean (text)
+Return ONLY a SQL query valid for SQLite.
+"""
+
+
+def schema_hash(schema: str = SCHEMA) -> str:
+    """Short hash of the schema text -- schema badla to purane cached SQL use nahi honge."""
+    return hashlib.sha256(schema.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def build_prompt(question: str, schema: str = SCHEMA) -> str:
+    return f"""{schema}
+
+Translate this natural language query to a valid SQL query:
+
+{question}
+"""
+
+
+def clean_sql(text: str) -> str:
+    """Strip the ```sql ... ``` fences models like to wrap answers in."""
+    sql_query = text.strip()
+    if sql_query.startswith("```"):
+        sql_query = sql_query.strip("`")
+        if "sql" in sql_query:
+            sql_query = sql_query.replace("sql", "", 1)
+    return sql_query.strip()
+
+
+def generate_sql(question: str, model: str = MODEL, schema: str = SCHEMA) -> str:
+    """One blocking ollama.generate call -> cleaned SQL."""
+    import ollama
+
+    response = ollama.generate(model=model, prompt=build_prompt(question, schema))
+    return clean_sql(response["response"])
+
+
+class GenerationCancelled(RuntimeError):
+    """A newer question (or the user) cancelled this generation."""
+
+
+class GenerationTimeout(TimeoutError):
+    """The model did not produce a complete SQL statement in time."""
+
+
+def complete_sql(text: str) -> Optional[str]:
+    """The first complete SQL statement in a partial model response, else None.
+
+    Complete means a closing ``` fence or a ``;`` that ends a full statement
+    (sqlite3.complete_statement, so ``;`` inside string literals doesn't
+    count). Any chatter before the SELECT/WITH is skipped.
+    """
+    body = text
+    fence = text.find("```")
+    if fence != -1:
+        newline = text.find("\n", fence)
+        if newline == -1:
+            return None
+        body = text[newline + 1:]
+        close = body.find("```")
+        if close != -1:
+            return body[:close].strip() or None
+    m = re.search(r"\b(select|with)\b", body, re.IGNORECASE)
+    if not m:
+        return None
+    body = body[m.start():]
+    for i, ch in enumerate(body):
+        if ch == ";" and sqlite3.complete_statement(body[:i + 1]):
+            return body[:i + 1].strip()
+    return None
+
+
+class SQLStream:
+    """One streaming /api/generate call in a background thread.
+
+    ``text`` grows as tokens arrive; the HTTP connection is dropped as soon
+    as complete_sql() finds a statement (Ollama stops generating when the
+    client goes away). ``cancel()`` and the timeout both shut the socket
+    down, which unblocks the reader thread immediately.
+    """
+
+    def __init__(self, question: str, model: str = MODEL, schema: str = SCHEMA, host: str = OLLAMA_HOST,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.question = question
+        self.model = model
+        self.schema = schema
+        self.timeout = timeout
+        url = urlsplit(host if "://" in host else f"http://{host}")
+        self._host, self._port = url.hostname or "localhost", url.port or 11434
+        self.text = ""
+        self.sql: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.tokens = 0
+        self.stopped_early = False
+        self._abort_reason: Optional[str] = None
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "SQLStream":
+        self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _run(self) -> None:
+        timer = threading.Timer(self.timeout, self._abort, args=("timeout",))
+        timer.daemon = True
+        timer.start()
+        try:
+            with self._lock:
+                if self._abort_reason:
+                    raise OSError("aborted before start")
+                self._conn = http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+            body = json.dumps({"model": self.model, "prompt": build_prompt(self.question, self.schema),
+                               "stream": True})
+            self._conn.request("POST", "/api/generate", body=body, headers={"Content-Type": "application/json"})
+            resp = self._conn.getresponse()
+            if resp.status != 200:
+                raise RuntimeError(f"ollama returned HTTP {resp.status}: {resp.read(500)!r}")
+            for line in resp:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(f"ollama error: {chunk['error']}")
+                self.text += chunk.get("response", "")
+                self.tokens += 1
+                sql = complete_sql(self.text)
+                if sql:
+                    self.sql = sql
+                    self.stopped_early = not chunk.get("done", False)
+                    break
+                if chunk.get("done"):
+                    break
+            if self._abort_reason:
+                # shutdown ke baad read seedha EOF deta hai, exception nahi
+                raise OSError("stream aborted")
+            if self.sql is None:
+                self.sql = clean_sql(self.text)
+        except Exception as e:
+            if self._abort_reason == "timeout":
+                self.error = GenerationTimeout(f"no complete SQL from {self.model} after {self.timeout:g}s")
+            elif self._abort_reason == "cancelled":
+                self.error = GenerationCancelled("generation cancelled")
+            else:
+                self.error = e
+        finally:
+            timer.cancel()
+            if self._conn is not None:
+                self._conn.close()
+            self._done.set()
+
+    def _abort(self, reason: str) -> None:
+        with self._lock:
+            if self._done.is_set() or self._abort_reason:
+                return
+            self._abort_reason = reason
+            sock = self._conn.sock if self._conn is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def cancel(self) -> None:
+        self._abort("cancelled")
+
+    def result(self, wait: Optional[float] = None) -> str:
+        """Block until done (or ``wait`` seconds); returns the SQL or raises the stream's error."""
+        if not self._done.wait(wait):
+            raise GenerationTimeout("still generating")
+        if self.error is not None:
+            raise self.error
+        return self.sql
+
+
+def stream_sql(question: str, model: str = MODEL, schema: str = SCHEMA, host: str = OLLAMA_HOST,
+               timeout: float = DEFAULT_TIMEOUT) -> str:
+    """Blocking convenience wrapper around SQLStream."""
+    return SQLStream(question, model, schema, host, timeout).start().result()
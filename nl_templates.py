@@ -0,0 +1,280 @@
+# chatbot ka fast path -- aam sawaal ("average temperature between 0 and 200 m near India in 2020")
+# ko bina LLM ke seedha parameterized SQL me badalta hai. Jo sawaal samajh nahi aata uske liye None,
+# tab hi ollama.generate chalta hai.
+#
+# report:  python nl_templates.py            (nl_corpus.json pe coverage / accuracy)
+import calendar
+import datetime
+import json
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from queries import TABLE_NAME, time_bounds
+
+# named regions -> (lat_min, lat_max, lon_min, lon_max); lon 0-360 style like argo_data
+REGIONS: Dict[str, Tuple[float, float, float, float]] = {
+    "bay of bengal": (5.0, 22.0, 80.0, 95.0),
+    "arabian sea": (5.0, 25.0, 50.0, 77.0),
+    "indian ocean": (-40.0, 25.0, 20.0, 120.0),
+    "india": (6.0, 37.0, 68.0, 97.0),
+}
+
+VARIABLE_WORDS = {
+    "temperature": ("temperature", "temperatures", "temp", "temps", "sst"),
+    "salinity": ("salinity", "salinities", "salt", "saltiness", "psu"),
+}
+
+AGGREGATE_WORDS = {
+    "AVG": ("average", "avg", "mean"),
+    "MAX": ("maximum", "max", "highest", "warmest", "saltiest"),
+    "MIN": ("minimum", "min", "lowest", "coldest", "freshest"),
+    "COUNT": ("how many", "count", "number of"),
+}
+
+GROUP_WORDS = {
+    "depth": ("by depth", "per depth", "each depth", "at each depth", "depth profile", "profile"),
+    "month": ("by month", "per month", "each month", "monthly"),
+    "year": ("by year", "per year", "each year", "yearly", "annual", "annually"),
+}
+GROUP_SQL = {
+    "depth": ("depth", "depth"),
+    "month": ("strftime('%Y-%m', time)", "month"),
+    "year": ("strftime('%Y', time)", "year"),
+}
+
+# words that carry no meaning for the query -- anything else left over => fallback to the LLM
+NOISE_WORDS = set("""
+what whats is was were are be the of in at near around for show me give list find get please kindly all
+data value values observation observations record records row rows reading readings measurement measurements
+ocean sea water seawater region area and between from to during over across with a an on off coast
+m meter meters metre metres depth depths deep level levels how much tell can you display compute
+calculate which s within inside there here recorded measured observed
+""".split())
+
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+
+# "at 500 m" -- grid levels (5, 10, 20, ... m) pe exact float match aksar khaali aata, to +-10% (kam se kam 2.5 m)
+AT_DEPTH_TOLERANCE = 0.1
+AT_DEPTH_MIN_TOLERANCE = 2.5
+
+NUM = r"(-?\d+(?:\.\d+)?)"
+UNIT = r"\s*(?:m|meters?|metres?)\b"
+RAW_LIMIT = 1000
+
+
+def _consume(text: str, pattern: str) -> Tuple[Optional[re.Match], str]:
+    """Search ``pattern``; if found, blank the match out of ``text`` so later rules don't re-read it."""
+    m = re.search(pattern, text)
+    if not m:
+        return None, text
+    return m, text[:m.start()] + " " + text[m.end():]
+
+
+def _parse_depth(text: str) -> Tuple[Optional[Tuple[Optional[float], Optional[float]]], str]:
+    rules = [
+        (rf"\bdepths?\s+(?:of\s+)?(?:between|from)?\s*{NUM}(?:{UNIT})?\s*(?:and|to|-)\s*{NUM}(?:{UNIT})?", "range"),
+        (rf"\b(?:between|from)\s+{NUM}(?:{UNIT})?\s*(?:and|to|-)\s*{NUM}{UNIT}", "range"),
+        (rf"\b{NUM}\s*(?:-|to)\s*{NUM}{UNIT}", "range"),
+        (rf"\b(?:below|deeper than|under|beneath|greater than)\s+{NUM}{UNIT}", "min"),
+        (rf"\b(?:above|shallower than|less than|upper|top|first)\s+{NUM}{UNIT}", "max"),
+        (rf"\b(?:at|in|of)\s+{NUM}{UNIT}(?:\s+depth)?", "at"),
+        (r"\b(?:surface|sea surface)\b", "surface"),
+    ]
+    for pattern, kind in rules:
+        m, rest = _consume(text, pattern)
+        if not m:
+            continue
+        if kind == "range":
+            lo, hi = sorted((float(m.group(1)), float(m.group(2))))
+            return (lo, hi), rest
+        if kind == "min":
+            return (float(m.group(1)), None), rest
+        if kind == "max":
+            return (None, float(m.group(1))), rest
+        if kind == "at":
+            depth = float(m.group(1))
+            tol = max(abs(depth) * AT_DEPTH_TOLERANCE, AT_DEPTH_MIN_TOLERANCE)
+            return (depth - tol, depth + tol), rest
+        return (None, 10.0), rest
+    return None, text
+
+
+def _valid_dates(*dates: str) -> bool:
+    try:
+        for d in dates:
+            datetime.date.fromisoformat(d)
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_time(text: str) -> Tuple[Optional[Tuple[str, str]], str]:
+    """Date range as inclusive ('YYYY-MM-DD', 'YYYY-MM-DD').
+
+    A malformed date ("2020-02-30") returns (None, text) untouched, so its
+    digits stay as leftover words and the question goes to the LLM.
+    """
+    m, rest = _consume(text, r"\b(\d{4}-\d{2}-\d{2})\s*(?:and|to|-|until|till)\s*(\d{4}-\d{2}-\d{2})\b")
+    if m:
+        return ((m.group(1), m.group(2)), rest) if _valid_dates(m.group(1), m.group(2)) else (None, text)
+    m, rest = _consume(text, r"\b(\d{4}-\d{2}-\d{2})\b")
+    if m:
+        return ((m.group(1), m.group(1)), rest) if _valid_dates(m.group(1)) else (None, text)
+    month_names = "|".join(sorted(MONTHS, key=len, reverse=True))
+    m, rest = _consume(text, rf"\b({month_names})\.?\s+((?:19|20)\d{{2}})\b")
+    if m:
+        year, month = int(m.group(2)), MONTHS[m.group(1)]
+        last = calendar.monthrange(year, month)[1]
+        return (f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{last:02d}"), rest
+    m, rest = _consume(text, r"\b((?:19|20)\d{2})\s*(?:and|to|-|until|till|through)\s*((?:19|20)\d{2})\b(?!\s*(?:m|meters?|metres?)\b)")
+    if m:
+        y0, y1 = sorted((int(m.group(1)), int(m.group(2))))
+        return (f"{y0:04d}-01-01", f"{y1:04d}-12-31"), rest
+    m, rest = _consume(text, r"\b((?:19|20)\d{2})\b(?!\s*(?:m|meters?|metres?)\b)")
+    if m:
+        year = int(m.group(1))
+        return (f"{year:04d}-01-01", f"{year:04d}-12-31"), rest
+    return None, text
+
+
+def _parse_box(text: str) -> Tuple[Dict[str, Tuple[float, float]], str]:
+    box: Dict[str, Tuple[float, float]] = {}
+    for axis, words in (("lat", r"lat(?:itude)?s?"), ("lon", r"lon(?:gitude)?s?|long")):
+        m, text = _consume(text, rf"\b(?:{words})\s*(?:between|from)?\s*{NUM}\s*(?:and|to|-)\s*{NUM}")
+        if m:
+            box[axis] = tuple(sorted((float(m.group(1)), float(m.group(2)))))
+    for name in sorted(REGIONS, key=len, reverse=True):
+        m, text = _consume(text, rf"\b(?:the\s+)?{name}\b")
+        if m:
+            lat0, lat1, lon0, lon1 = REGIONS[name]
+            box.setdefault("lat", (lat0, lat1))
+            box.setdefault("lon", (lon0, lon1))
+            box["region"] = name
+            break
+    return box, text
+
+
+def _find_words(text: str, table: Dict[str, Tuple[str, ...]]) -> Tuple[List[str], str]:
+    found = []
+    for key, words in table.items():
+        for word in sorted(words, key=len, reverse=True):
+            m, text = _consume(text, rf"\b{re.escape(word)}\b")
+            if m:
+                if key not in found:
+                    found.append(key)
+                # ek hi word ke saare occurrences hatao
+                while m:
+                    m, text = _consume(text, rf"\b{re.escape(word)}\b")
+    return found, text
+
+
+def parse_question(question: str, table: str = TABLE_NAME) -> Optional[Dict[str, object]]:
+    """Question -> {"sql", "params", "intent"} or None if the fast path can't handle it."""
+    text = " " + question.lower().replace("°", " ").replace("?", " ").replace(",", " ") + " "
+    text = re.sub(r"\s+", " ", text)
+
+    # "by depth" pehle, warna "depth between 2019 and 2020" depth range ban jata
+    groups, text = _find_words(text, GROUP_WORDS)
+    depth, text = _parse_depth(text)
+    dates, text = _parse_time(text)
+    box, text = _parse_box(text)
+    aggs, text = _find_words(text, AGGREGATE_WORDS)
+    variables, text = _find_words(text, VARIABLE_WORDS)
+
+    leftover = [w for w in re.findall(r"[a-z_]+|\d+(?:\.\d+)?", text) if w not in NOISE_WORDS]
+    if leftover or len(aggs) > 1 or len(groups) > 1:
+        return None
+    agg = aggs[0] if aggs else None
+    group = groups[0] if groups else None
+    if not variables and agg != "COUNT":
+        return None
+    if group and not agg:
+        # "temperature by depth" => average profile
+        agg = "AVG"
+
+    where: List[str] = []
+    params: List = []
+    if "lat" in box:
+        where.append("lat BETWEEN ? AND ?")
+        params += list(box["lat"])
+    if "lon" in box:
+        where.append("lon BETWEEN ? AND ?")
+        params += list(box["lon"])
+    if depth:
+        lo, hi = depth
+        if lo is not None and hi is not None:
+            where.append("depth BETWEEN ? AND ?")
+            params += [lo, hi]
+        elif lo is not None:
+            where.append("depth >= ?")
+            params.append(lo)
+        else:
+            where.append("depth <= ?")
+            params.append(hi)
+    if dates:
+        where.append("time >= ? AND time < ?")
+        params += list(time_bounds(dates))
+
+    select: List[str] = []
+    tail = ""
+    if group:
+        expr, alias = GROUP_SQL[group]
+        select.append(expr if expr == alias else f"{expr} AS {alias}")
+        tail = f" GROUP BY {alias} ORDER BY {alias}"
+    if agg == "COUNT":
+        select += [f"COUNT({v}) AS count_{v}" for v in variables] or ["COUNT(*) AS observations"]
+    elif agg:
+        select += [f"{agg}({v}) AS {agg.lower()}_{v}" for v in variables]
+    else:
+        select = ["time", "depth", "lat", "lon"] + variables
+        tail = f" LIMIT {RAW_LIMIT}"
+
+    sql = f"SELECT {', '.join(select)} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += tail
+    intent = {"aggregate": agg, "variables": variables, "group_by": group, "region": box.get("region"),
+              "lat": box.get("lat"), "lon": box.get("lon"), "depth": depth, "dates": dates}
+    return {"sql": sql, "params": params, "intent": intent}
+
+
+def render_sql(sql: str, params: List) -> str:
+    """SQL with the parameters inlined -- only for showing to the user, never for execution."""
+    parts = sql.split("?")
+    out = [parts[0]]
+    for value, part in zip(params, parts[1:]):
+        out.append(f"'{value}'" if isinstance(value, str) else f"{value:g}")
+        out.append(part)
+    return "".join(out)
+
+
+def corpus_report(path: str = "nl_corpus.json") -> Dict[str, float]:
+    """Run the fast path over a corpus of {"question", "sql", "params"} ("sql": null = expect fallback)."""
+    with open(path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    covered = correct = 0
+    failures = []
+    for case in corpus:
+        got = parse_question(case["question"])
+        if got:
+            covered += 1
+        expected_sql = case.get("sql")
+        if expected_sql is None:
+            ok = got is None
+        else:
+            ok = got is not None and got["sql"] == expected_sql and got["params"] == case.get("params", [])
+        correct += ok
+        if not ok:
+            failures.append((case["question"], expected_sql, got and got["sql"], got and got["params"]))
+    return {"questions": len(corpus), "fast_path": covered, "coverage": covered / len(corpus) if corpus else 0.0,
+            "matches_expected": correct, "failures": failures}
+
+
+if __name__ == "__main__":
+    report = corpus_report(sys.argv[1] if len(sys.argv) > 1 else "nl_corpus.json")
+    for question, expected, got, params in report["failures"]:
+        print(f"✗ {question}\n    expected: {expected}\n    got:      {got} {params}")
+    print(f"fast path answered {report['fast_path']}/{report['questions']} questions "
+          f"({report['coverage']:.0%}); {report['matches_expected']}/{report['questions']} match the expected SQL")
@@ -0,0 +1,257 @@
+# keyset pagination for the table views -- poora result pd.read_sql se memory me nahi, sirf dikhne wala page
+# har page: WHERE ... AND (key cols) > (last key of previous page) ORDER BY key cols LIMIT page_size
+# key = indexed columns (rowid, ya (time, depth, rowid) jab time index hai), isliye page N bhi utna hi sasta
+# jitna page 1 -- OFFSET ki tarah pichli rows dubara nahi padhni padti
+# R*Tree wala bbox filter: matching rowids ek hi baar nikal ke (sorted array) page = rowid IN (...) --
+# har page pe poora bbox match + sort dobara nahi
+import re
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from queries import (COL_DEPTH, COL_TIME, DATA_COLUMNS, TABLE_NAME, build_filter, coded_view_name, compact_codes,
+                     has_table, time_bounds, time_index_name, use_rtree_for)
+
+PAGE_SIZE = 500
+MATERIALIZE_MAX_ROWS = 200_000          # isse zyada bbox matches => rowids yaad rakhne ki jagah index order me chalo
+
+_SIMPLE_SELECT_RE = re.compile(
+    r"^select\s+(?P<cols>.+?)\s+from\s+\"?(?P<table>\w+)\"?"
+    r"(?:\s+(?:as\s+)?(?!where\b|limit\b)(?P<alias>\w+))?"
+    r"(?:\s+where\s+(?P<where>.+?))?"
+    r"(?:\s+limit\s+(?P<limit>\d+))?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_NOT_SIMPLE_RE = re.compile(
+    r"\b(join|group\s+by|order\s+by|union|intersect|except|having|select|distinct|over|limit|offset)\b"
+    r"|\b(count|sum|avg|total|group_concat|min|max)\s*\(",
+    re.IGNORECASE,
+)
+
+
+class KeysetPager:
+    """Forward/backward pager over ``SELECT columns FROM from_sql WHERE where_sql``.
+
+    Only the boundary key of every visited page is kept (one small tuple per
+    page), so memory stays flat however many rows match. The exact total
+    is a separate COUNT(*) run only when someone asks for it.
+    """
+
+    def __init__(self, from_sql: str, where_sql: str, params: Sequence, key: Sequence[str] = ("rowid",),
+                 columns: Sequence[str] = ("*",), alias: Optional[str] = "d", page_size: int = PAGE_SIZE,
+                 max_rows: Optional[int] = None, start: Optional[tuple] = None):
+        qual = f"{alias}." if alias else ""
+        self.from_sql = from_sql
+        self.where_sql = where_sql or "1"
+        self.params = list(params)
+        self.key = [k if "." in k else f"{qual}{k}" for k in key]
+        self.columns = [f"{qual}*" if c == "*" else c for c in columns]
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self._starts: List[Optional[tuple]] = [start]  # _starts[i] = last key before page i
+        self.total: Optional[int] = None
+
+    @property
+    def pages_known(self) -> int:
+        return len(self._starts)
+
+    def has_next(self, index: int) -> bool:
+        return index + 1 < len(self._starts)
+
+    def page_query(self, index: int) -> Tuple[str, List, int]:
+        """(sql, params, rows_wanted) for page ``index`` -- earlier pages must have been fetched."""
+        if index >= len(self._starts):
+            raise IndexError(f"page {index} not reached yet (fetch pages in order)")
+        want = self.page_size
+        if self.max_rows is not None:
+            want = max(0, min(want, self.max_rows - index * self.page_size))
+        keys = ", ".join(self.key)
+        sql_cols = ", ".join(f"{k} AS _k{i}" for i, k in enumerate(self.key)) + ", " + ", ".join(self.columns)
+        where = f"({self.where_sql})"
+        params = list(self.params)
+        start = self._starts[index]
+        if start is not None:
+            where += f" AND ({keys}) > ({', '.join('?' * len(start))})"
+            params += list(start)
+        # ek row extra => pata chale ki agla page hai ya nahi
+        sql = f"SELECT {sql_cols} FROM {self.from_sql} WHERE {where} ORDER BY {keys} LIMIT {want + 1}"
+        return sql, params, want
+
+    def record(self, index: int, frame: pd.DataFrame, want: int) -> pd.DataFrame:
+        """Remember where page ``index`` ended; returns the page without the key columns.
+
+        ``frame`` is the result of page_query() (key columns first).
+        """
+        nkey = len(self.key)
+        more = len(frame) > want
+        if self.max_rows is not None and (index + 1) * self.page_size >= self.max_rows:
+            more = False   # query ka apna LIMIT pura ho gaya
+        frame = frame.iloc[:want]
+        if more and len(frame) and index + 1 == len(self._starts):
+            # numpy scalars sqlite me bind nahi hote => plain Python values
+            last = frame.iloc[-1, :nkey]
+            self._starts.append(tuple(v.item() if isinstance(v, np.generic) else v for v in last))
+        return frame.iloc[:, nkey:].reset_index(drop=True)
+
+    def page(self, conn: sqlite3.Connection, index: int) -> pd.DataFrame:
+        """Fetch page ``index`` with fetchmany -- at most page_size + 1 rows leave SQLite."""
+        sql, params, want = self.page_query(index)
+        cur = conn.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        rows = cur.fetchmany(want + 1)
+        cur.close()
+        return self.record(index, pd.DataFrame.from_records(rows, columns=columns), want)
+
+    def count_query(self) -> Tuple[str, List]:
+        where, params = f"({self.where_sql})", list(self.params)
+        first = self._starts[0]
+        if first is not None:
+            # pehle page ki start key bhi filter ka hissa hai (date range ka lower bound)
+            where += f" AND ({', '.join(self.key)}) > ({', '.join('?' * len(first))})"
+            params += list(first)
+        return f"SELECT COUNT(*) FROM {self.from_sql} WHERE {where}", params
+
+    def set_total(self, n: int) -> int:
+        self.total = min(n, self.max_rows) if self.max_rows is not None else n
+        return self.total
+
+    def count(self, conn: sqlite3.Connection) -> int:
+        """Exact number of matching rows (COUNT(*), run once and remembered)."""
+        if self.total is None:
+            sql, params = self.count_query()
+            self.set_total(conn.execute(sql, params).fetchone()[0])
+        return self.total
+
+    def describe(self, index: int, rows_on_page: int) -> str:
+        """'Rows 501–1,000 of 12,345' (or 'of many' until the count is known)."""
+        if rows_on_page == 0:
+            return "No rows"
+        first = index * self.page_size
+        if self.total is not None:
+            total = f"{self.total:,}"
+        elif self.has_next(index):
+            total = "many"
+        else:
+            total = f"{first + rows_on_page:,}"
+        return f"Rows {first + 1:,}–{first + rows_on_page:,} of {total}"
+
+
+class RowidListPager(KeysetPager):
+    """Pager over a sorted rowid array collected once per filter.
+
+    Page i is ``rowid IN (rowids[i*n:(i+1)*n])`` -- a handful of B-tree
+    lookups, whatever the page number; the total is known up front.
+    """
+
+    def __init__(self, table: str, rowids: np.ndarray, columns: Sequence[str] = ("*",), alias: str = "d",
+                 page_size: int = PAGE_SIZE):
+        super().__init__(f'"{table}" AS {alias}', "", (), key=("rowid",), columns=columns, alias=alias,
+                         page_size=page_size)
+        self.rowids = rowids
+        self.total = len(rowids)
+
+    @property
+    def pages_known(self) -> int:
+        return max(1, -(-len(self.rowids) // self.page_size))
+
+    def has_next(self, index: int) -> bool:
+        return (index + 1) * self.page_size < len(self.rowids)
+
+    def page_query(self, index: int) -> Tuple[str, List, int]:
+        ids = self.rowids[index * self.page_size:(index + 1) * self.page_size].tolist()
+        sql = (f"SELECT {self.key[0]} AS _k0, {', '.join(self.columns)} FROM {self.from_sql} "
+               f"WHERE {self.key[0]} IN ({', '.join('?' * len(ids))}) ORDER BY {self.key[0]}")
+        return sql, ids, len(ids)
+
+    def count(self, conn: sqlite3.Connection) -> int:
+        return self.total
+
+
+def filter_pager(conn: sqlite3.Connection, lat_rng, lon_rng, depth_rng, t_range=None, table: str = TABLE_NAME,
+                 page_size: int = PAGE_SIZE, max_rowids: int = MATERIALIZE_MAX_ROWS) -> KeysetPager:
+    """Pager over the dashboard filters, keyed on whatever index serves them best.
+
+    * date range + (time, depth) index: key (time, depth, rowid) -- the
+      index already holds rows in that order, so a page is an index range
+      read with no sort.
+    * otherwise R*Tree (if built) for the box: the matching rowids are
+      collected once (one R*Tree pass) into a RowidListPager, if there are
+      at most ``max_rowids`` of them.
+    * a bigger match set, or no R*Tree: the plain table is walked in index
+      order -- (time, depth, rowid) if that index exists, else rowid --
+      with the box checked per row; each page resumes where the last one
+      stopped, so no page repeats earlier work.
+    * compact DB: code ranges on the coded view, key (time_idx, depth_idx,
+      rowid) with a date range (its index order), else rowid.
+    """
+    codes = compact_codes(conn, lat_rng, lon_rng, depth_rng, t_range, table)
+    if codes is not None:
+        time_codes = codes.pop(COL_TIME, None)
+        from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, table=table, codes=codes)
+        return _index_walk(from_sql, where_sql, params, ("time_idx", "depth_idx", "rowid"),
+                           time_codes and (time_codes[0], time_codes[1] + 1), -1, page_size,
+                           columns=[f"d.{c}" for c in DATA_COLUMNS])
+    if use_rtree_for(conn, table, t_range):
+        from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, t_range, table=table,
+                                                   use_rtree=True)
+        cur = conn.execute(f"SELECT d.rowid FROM {from_sql} WHERE {where_sql} LIMIT {int(max_rowids) + 1}", params)
+        rowids = np.fromiter((r for (r,) in cur), dtype=np.int64)
+        if len(rowids) <= max_rowids:
+            rowids.sort()
+            return RowidListPager(table, rowids, page_size=page_size)
+    if has_table(conn, time_index_name(table)):
+        from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, table=table)
+        return _index_walk(from_sql, where_sql, params, (COL_TIME, COL_DEPTH, "rowid"), time_bounds(t_range),
+                           float("-inf"), page_size)
+    from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, t_range, table=table)
+    return KeysetPager(from_sql, where_sql, params, key=("rowid",), page_size=page_size)
+
+
+def _index_walk(from_sql: str, where_sql: str, params: List, key: Sequence[str], t_bounds, depth_floor,
+                page_size: int, columns: Sequence[str] = ("*",)) -> KeysetPager:
+    """Keyset pager that walks the (time, depth) index from the key onwards.
+
+    Date range: sirf upper bound WHERE me; lower bound pehle page ki start key banta hai, taki har page
+    ka index seek keyset se ho (warna planner ``time >= t0`` se range shuru karke pichle pages ki rows
+    phir padhta). Depth ``+`` se index se hata hai -- warna (time, depth) pe skip-scan (ANY(time) AND
+    depth range) chunta hai, wo bhi har baar shuru se.
+    """
+    where_sql = where_sql.replace(f"d.{key[1]} BETWEEN", f"+d.{key[1]} BETWEEN")
+    start = None
+    if t_bounds:
+        where_sql += f" AND d.{key[0]} < ?"
+        params = params + [t_bounds[1]]
+        start = (t_bounds[0], depth_floor, -(2 ** 63))
+    return KeysetPager(from_sql, where_sql, params, key=key, columns=columns, page_size=page_size, start=start)
+
+
+def pager_for_sql(sql: str, params: Sequence = (), table: str = TABLE_NAME,
+                  page_size: int = PAGE_SIZE, conn: Optional[sqlite3.Connection] = None) -> Optional[KeysetPager]:
+    """KeysetPager for a plain single-table ``SELECT cols FROM table [WHERE ...] [LIMIT n]``.
+
+    That is what most "show me rows" chatbot answers look like; anything
+    with joins, grouping, ordering, aggregates or subqueries returns None
+    and is shown the old way (guarded, capped result). Pass ``conn`` so a
+    compact DB (whose plain view has no rowid) is paged on its coded view.
+    """
+    sql = sql.strip().rstrip(";").strip()
+    m = _SIMPLE_SELECT_RE.match(sql)
+    if not m or m.group("table").lower() != table.lower():
+        return None
+    cols, where = m.group("cols"), m.group("where") or ""
+    if _NOT_SIMPLE_RE.search(cols) or _NOT_SIMPLE_RE.search(where) or "?" in cols:
+        return None
+    alias = m.group("alias") or None
+    source = table
+    if conn is not None and has_table(conn, coded_view_name(table)):
+        # compact DB: coded view me wahi columns + rowid; "*" sirf normal columns
+        source = coded_view_name(table)
+    qual = alias or f'"{source}"'
+    if source != table and cols.strip() == "*":
+        cols = ", ".join(f"{qual}.{c}" for c in DATA_COLUMNS)
+    from_sql = f'"{source}" AS {alias}' if alias else f'"{source}"'
+    limit = int(m.group("limit")) if m.group("limit") else None
+    return KeysetPager(from_sql, where, params, key=(f"{qual}.rowid",), columns=[cols], alias=None,
+                       page_size=page_size, max_rows=limit)
@@ -0,0 +1,214 @@
+# directory ingest -- asli Argo archive hazaaron per-float / per-month NetCDF files hota hai
+# decode + flatten + tile sums ProcessPoolExecutor ke workers me (ek per core), aur likhta sirf ek
+# writer hai (ye process) -- SQLite pe koi lock contention nahi, Parquet me ek hi dataset writer
+#
+# usage:  python parallel_ingest.py data/ --db argo.db                  (fresh DB, saari *.nc files)
+#         python parallel_ingest.py data/ --db argo.db --incremental    (sirf naye / badle files, manifest se)
+#         python parallel_ingest.py data/ --parquet argo_parquet --tile 10
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from flatten import VAR_TIME, iter_flat_chunks
+from ingest import (DB_PATH, TABLE_NAME, get_file, ingest_files, new_stats, plan_slices, report_file, scan_file,
+                    stat_changed, sync_file)
+from manifest import file_stat
+from meta import MetaCollector
+from parquet_store import PARQUET_PATH, write_parquet
+from profile_agg import tile_sums
+
+NC_PATTERN = "*.nc"
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects taskset / container CPU sets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def find_netcdf(paths: Sequence[str], pattern: str = NC_PATTERN) -> List[str]:
+    """Files as given, directories expanded recursively (sorted => same rowid order every run)."""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            out += sorted(str(f) for f in Path(p).rglob(pattern) if f.is_file())
+        else:
+            out.append(p)
+    return out
+
+
+def make_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn, fork nahi -- parent me khula HDF5/netCDF handle fork ke baad safe nahi hota
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _time_steps(nc_path: str) -> int:
+    with xr.open_dataset(nc_path) as ds:
+        return ds.sizes[VAR_TIME]
+
+
+def _load_step(nc_path: str, i: int, depth_chunk: int, skip_nan: bool, profile: bool
+               ) -> Tuple[List[Dict[str, np.ndarray]], Optional[List[pd.DataFrame]], float]:
+    """Worker: flattened NumPy chunks (+ tile sums) of time step ``i``, and the seconds it took."""
+    start = time.perf_counter()
+    # har task apna handle khole aur band kare -- cache kiya hua handle worker ke saath zinda rehta tha
+    with xr.open_dataset(nc_path) as ds:
+        chunks = [cols for cols in iter_flat_chunks(ds, time_idx=[i], depth_chunk=depth_chunk, skip_nan=skip_nan)
+                  if len(cols["depth"])]
+    sums = [tile_sums(cols) for cols in chunks] if profile else None
+    return chunks, sums, time.perf_counter() - start
+
+
+def ordered_map(pool: Executor, fn: Callable, tasks: Iterable[tuple], window: int,
+                timing: Optional[Dict[str, float]] = None) -> Iterator:
+    """Like pool.map (results in task order) but with at most ``window`` tasks in flight.
+
+    Submitting everything up front would let finished batches pile up in
+    memory whenever the writer is slower than the workers. ``timing["wait"]``
+    adds up the time the writer sat idle waiting on a worker.
+    """
+    pending = deque()
+
+    def next_result():
+        t0 = time.perf_counter()
+        result = pending.popleft().result()
+        if timing is not None:
+            timing["wait"] = timing.get("wait", 0.0) + time.perf_counter() - t0
+        return result
+
+    for args in tasks:
+        pending.append(pool.submit(fn, *args))
+        if len(pending) >= window:
+            yield next_result()
+    while pending:
+        yield next_result()
+
+
+def sync_parallel(conn: sqlite3.Connection, nc_paths: Sequence[str], workers: int, table: str = TABLE_NAME,
+                  depth_chunk: int = 5, skip_nan: bool = False, collector: Optional[MetaCollector] = None,
+                  profile: bool = True, rtree: bool = False, verbose: bool = True) -> Iterator[Dict[str, float]]:
+    """ingest.ingest_file() for many files, with hashing and decoding in a process pool.
+
+    Yields one stats dict per file. Only this process touches ``conn``;
+    workers just read NetCDF and return NumPy batches.
+    """
+    collector = collector or MetaCollector()
+    todo = []
+    for nc_path in nc_paths:
+        if stat_changed(conn, nc_path):
+            entry = get_file(conn, file_stat(nc_path)[0])
+            todo.append((nc_path, entry["sha256"] if entry else None))
+        else:
+            yield dict(new_stats(), skipped=1)
+    if not todo:
+        return
+
+    with make_pool(workers) as pool:
+        # 1) sha256 + slice hashes (poori file padhni padti hai) -- parallel
+        scans = list(pool.map(scan_file, *zip(*todo)))
+        # 2) har file ka plan abhi -- ek file ke writes dusri file ke slices nahi chhoote
+        plans = [plan_slices(conn, scan)[1] for scan in scans]
+        tasks = ((nc_path, i, depth_chunk, skip_nan, profile)
+                 for (nc_path, _), load in zip(todo, plans) for i, _, _ in load)
+        timing: Dict[str, float] = {}
+        results = ordered_map(pool, _load_step, tasks, window=2 * workers, timing=timing)
+        decode = [0.0]
+
+        def load_step(i):
+            chunks, sums, seconds = next(results)
+            decode[0] += seconds
+            return chunks, sums
+
+        # 3) ek writer, file order me -- rowids har run me same
+        for (nc_path, _), scan in zip(todo, scans):
+            decode[0], timing["wait"] = 0.0, 0.0
+            stats = sync_file(conn, scan, load_step, table, collector, profile, rtree)
+            if verbose and scan["hashes"] is not None:
+                report_file(nc_path, stats)
+            yield dict(stats, decode_seconds=decode[0], wait_seconds=timing["wait"])
+
+
+def export_parallel(nc_paths: Sequence[str], out_dir: str = PARQUET_PATH, workers: Optional[int] = None,
+                    tile_deg: Optional[float] = None, depth_chunk: int = 5,
+                    skip_nan: bool = False) -> Dict[str, float]:
+    """Many NetCDF files -> one partitioned Parquet dataset (full rewrite, like parquet_store.export_netcdf)."""
+    workers = workers or available_cores()
+    start = time.perf_counter()
+    timing: Dict[str, float] = {}
+    decode = [0.0]
+    with make_pool(workers) as pool:
+        steps = list(pool.map(_time_steps, nc_paths))
+        tasks = ((p, i, depth_chunk, skip_nan, False) for p, n in zip(nc_paths, steps) for i in range(n))
+
+        def chunks():
+            for batch, _, seconds in ordered_map(pool, _load_step, tasks, window=2 * workers, timing=timing):
+                decode[0] += seconds
+                yield from batch
+
+        rows = write_parquet(chunks(), out_dir, tile_deg=tile_deg)
+    elapsed = time.perf_counter() - start
+    return {"files": len(nc_paths), "rows": rows, "seconds": elapsed,
+            "rows_per_sec": rows / elapsed if elapsed else 0.0,
+            "decode_seconds": decode[0], "wait_seconds": timing.get("wait", 0.0)}
+
+
+def report(stats: Dict[str, float], workers: int) -> None:
+    print(f"✅ {stats['rows']:,} rows from {stats['files']:.0f} files in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec, {workers} workers)")
+    decode, wait = stats.get("decode_seconds", 0.0), stats.get("wait_seconds", 0.0)
+    if decode:
+        # writer kabhi wait nahi karta => writer (disk / SQLite) bottleneck hai, aur workers se fayda nahi
+        busy = stats["seconds"] - wait
+        print(f"   decode {decode:.1f} CPU-s across workers; writer busy {busy:.1f}s, idle {wait:.1f}s "
+              f"({'writer-bound' if wait < 0.1 * stats['seconds'] else 'decode-bound'})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest a directory of NetCDF Argo files with a process pool")
+    parser.add_argument("paths", nargs="+", help="NetCDF files and/or directories (searched recursively)")
+    parser.add_argument("--pattern", default=NC_PATTERN, help="file pattern inside directories")
+    parser.add_argument("--workers", type=int, default=available_cores(), help="decode processes")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--table", default=TABLE_NAME)
+    parser.add_argument("--incremental", action="store_true",
+                        help="add / update files in an existing DB using the manifest instead of rebuilding")
+    parser.add_argument("--parquet", metavar="OUT_DIR", help="write a partitioned Parquet dataset instead of SQLite")
+    parser.add_argument("--tile", type=float, default=None, help="(parquet) also partition by lat/lon tiles")
+    parser.add_argument("--depth-chunk", type=int, default=5, help="depth levels per slab")
+    parser.add_argument("--skip-nan", action="store_true", help="drop land/missing cells")
+    parser.add_argument("--no-index", action="store_true", help="skip R*Tree / time index build")
+    parser.add_argument("--no-profile", action="store_true", help="skip the depth-profile aggregate table")
+    args = parser.parse_args()
+
+    nc_paths = find_netcdf(args.paths, args.pattern)
+    if not nc_paths:
+        parser.error(f"no {args.pattern} files under {', '.join(args.paths)}")
+    workers = max(1, args.workers)
+    if args.parquet:
+        print(f"Exporting {len(nc_paths)} files -> {args.parquet} with {workers} workers")
+        stats = export_parallel(nc_paths, args.parquet, workers, tile_deg=args.tile, depth_chunk=args.depth_chunk,
+                                skip_nan=args.skip_nan)
+    else:
+        print(f"{'Updating' if args.incremental else 'Ingesting'} {len(nc_paths)} files -> {args.db}:{args.table} "
+              f"with {workers} workers")
+        stats = ingest_files(nc_paths, args.db, args.table, depth_chunk=args.depth_chunk, skip_nan=args.skip_nan,
+                             replace=not args.incremental, index=not args.no_index,
+                             profile=not args.no_profile, workers=workers)
+        print(f"   files skipped (unchanged): {stats.get('skipped', 0):.0f} / {stats['files']:.0f}")
+    report(stats, workers)
+
+
+if __name__ == "__main__":
+    main()
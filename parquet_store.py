@@ -0,0 +1,214 @@
+# Parquet backend -- flattened Argo data ko partitioned Parquet dataset mai likhta hai
+# aur dashboard ke fetch_data jaisa bbox/depth/date query pyarrow.dataset se chalata hai
+# (filter pushdown: sirf zaroori partitions / row groups hi padhe jate hai)
+#
+# usage:  python parquet_store.py data/argo_sample.nc --out argo_parquet --tile 10
+import argparse
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pds
+import xarray as xr
+
+from flatten import COLUMNS, iter_flat_chunks
+from queries import time_bounds
+
+PARQUET_PATH = "argo_parquet"
+NC_PATH = "data/argo_sample.nc"
+
+SCHEMA = pa.schema([
+    ("time", pa.timestamp("s")),
+    ("depth", pa.float64()),
+    ("lat", pa.float64()),
+    ("lon", pa.float64()),
+    ("temperature", pa.float64()),
+    ("salinity", pa.float64()),
+])
+
+# chhote row groups => min/max statistics se zyada row groups skip ho jate hai
+ROWS_PER_GROUP = 64 * 1024
+
+
+def partition_schema(tile_deg: Optional[float]) -> pa.Schema:
+    fields = [("month", pa.string())]
+    if tile_deg:
+        fields += [("tile_lat", pa.int16()), ("tile_lon", pa.int16())]
+    return pa.schema(fields)
+
+
+def to_batch(cols: Dict[str, np.ndarray], tile_deg: Optional[float] = None) -> pa.RecordBatch:
+    """Flattened columns -> RecordBatch with partition key columns added."""
+    arrays = [pa.array(cols["time"].astype("datetime64[s]"), type=pa.timestamp("s"))]
+    arrays += [pa.array(cols[c], type=pa.float64()) for c in COLUMNS[1:]]
+    names = list(COLUMNS)
+    month = np.datetime_as_string(cols["time"].astype("datetime64[M]"), unit="M")
+    arrays.append(pa.array(month, type=pa.string()))
+    names.append("month")
+    if tile_deg:
+        arrays.append(pa.array(np.floor(cols["lat"] / tile_deg).astype("int16")))
+        arrays.append(pa.array(np.floor(cols["lon"] / tile_deg).astype("int16")))
+        names += ["tile_lat", "tile_lon"]
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def write_parquet(chunks: Iterable[Dict[str, np.ndarray]], out_dir: str = PARQUET_PATH,
+                  tile_deg: Optional[float] = None, compression: str = "zstd") -> int:
+    """Write flattened chunks as a hive-partitioned Parquet dataset. Returns row count."""
+    part = partition_schema(tile_deg)
+    schema = pa.schema(list(SCHEMA) + list(part))
+    if tile_deg:
+        schema = schema.with_metadata({"tile_deg": str(tile_deg)})
+    total = 0
+
+    def batches() -> Iterator[pa.RecordBatch]:
+        nonlocal total
+        for cols in chunks:
+            if len(cols["depth"]):
+                total += len(cols["depth"])
+                # slab (depth, lat, lon) order mai aata hai; lat-major kar do taki har
+                # row group ek patli lat band ho aur uske min/max stats se skip ho sake
+                order = np.argsort(cols["lat"], kind="stable")
+                yield to_batch({c: v[order] for c, v in cols.items()}, tile_deg)
+
+    pds.write_dataset(
+        batches(), out_dir, schema=schema, format="parquet",
+        partitioning=pds.partitioning(part, flavor="hive"),
+        existing_data_behavior="delete_matching",
+        file_options=pds.ParquetFileFormat().make_write_options(compression=compression,
+                                                                write_statistics=True),
+        min_rows_per_group=ROWS_PER_GROUP, max_rows_per_group=ROWS_PER_GROUP,
+    )
+    return total
+
+
+def export_netcdf(nc_path: str = NC_PATH, out_dir: str = PARQUET_PATH, tile_deg: Optional[float] = None,
+                  skip_nan: bool = False) -> Dict[str, float]:
+    ds = xr.open_dataset(nc_path)
+    try:
+        start = time.perf_counter()
+        rows = write_parquet(iter_flat_chunks(ds, skip_nan=skip_nan), out_dir, tile_deg=tile_deg)
+        elapsed = time.perf_counter() - start
+    finally:
+        ds.close()
+    return {"rows": rows, "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else 0.0}
+
+
+def open_dataset(path: str = PARQUET_PATH) -> pds.Dataset:
+    return pds.dataset(path, format="parquet", partitioning="hive")
+
+
+def tile_size(dataset: pds.Dataset) -> Optional[float]:
+    """Tile size (degrees) stored in the schema metadata at export time, if any."""
+    meta = dataset.schema.metadata or {}
+    value = meta.get(b"tile_deg")
+    return float(value) if value else None
+
+
+def _tile_filter(dataset: pds.Dataset, lat_rng, lon_rng) -> Optional[pc.Expression]:
+    """Extra partition filter on tile_lat/tile_lon if the dataset was tiled."""
+    tile_deg = tile_size(dataset)
+    if not tile_deg:
+        return None
+    return ((pc.field("tile_lat") >= int(np.floor(lat_rng[0] / tile_deg)))
+            & (pc.field("tile_lat") <= int(np.floor(lat_rng[1] / tile_deg)))
+            & (pc.field("tile_lon") >= int(np.floor(lon_rng[0] / tile_deg)))
+            & (pc.field("tile_lon") <= int(np.floor(lon_rng[1] / tile_deg))))
+
+
+def build_expression(lat_rng, lon_rng, depth_rng, t_range=None,
+                     dataset: Optional[pds.Dataset] = None) -> pc.Expression:
+    """Same filter as queries.build_filter, as a pyarrow expression."""
+    expr = ((pc.field("lat") >= lat_rng[0]) & (pc.field("lat") <= lat_rng[1])
+            & (pc.field("lon") >= lon_rng[0]) & (pc.field("lon") <= lon_rng[1])
+            & (pc.field("depth") >= depth_rng[0]) & (pc.field("depth") <= depth_rng[1]))
+    bounds = time_bounds(t_range)
+    if bounds:
+        t0, t1 = (pd.Timestamp(b) for b in bounds)
+        # month partition pe filter => baaki directories khuli hi nahi jati
+        expr = expr & (pc.field("month") >= t0.strftime("%Y-%m")) & (pc.field("month") <= t1.strftime("%Y-%m"))
+        expr = (expr & (pc.field("time") >= pa.scalar(t0.to_pydatetime(), pa.timestamp("s")))
+                & (pc.field("time") < pa.scalar(t1.to_pydatetime(), pa.timestamp("s"))))
+    if dataset is not None:
+        tile = _tile_filter(dataset, lat_rng, lon_rng)
+        if tile is not None:
+            expr = expr & tile
+    return expr
+
+
+def fetch_parquet(path: str, lat_rng, lon_rng, t_range, depth_rng, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """Parquet version of dashboard.fetch_data -- same columns, same filters."""
+    dataset = open_dataset(path)
+    expr = build_expression(lat_rng, lon_rng, depth_rng, t_range, dataset=dataset)
+    scanner = dataset.scanner(columns=COLUMNS, filter=expr)
+    table = scanner.head(int(max_rows)) if max_rows is not None else scanner.to_table()
+    return table.to_pandas()
+
+
+def iter_parquet(path: str, lat_rng, lon_rng, t_range, depth_rng, batch_rows: int = 100_000,
+                 cancel=None) -> Iterator[pd.DataFrame]:
+    """Filtered rows as DataFrames of up to ``batch_rows`` rows (export.py ke liye)."""
+    dataset = open_dataset(path)
+    expr = build_expression(lat_rng, lon_rng, depth_rng, t_range, dataset=dataset)
+    for batch in dataset.scanner(columns=COLUMNS, filter=expr, batch_size=batch_rows).to_batches():
+        if cancel is not None and cancel.is_set():
+            break
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def count_parquet(path: str, lat_rng, lon_rng, t_range, depth_rng) -> int:
+    dataset = open_dataset(path)
+    return dataset.count_rows(filter=build_expression(lat_rng, lon_rng, depth_rng, t_range, dataset=dataset))
+
+
+def fetch_parquet_grid(path: str, lat_rng, lon_rng, t_range, depth_rng, cell: float) -> pd.DataFrame:
+    """Parquet version of the map grid aggregation (see grid_agg.py)."""
+    from grid_agg import aggregate_frame
+
+    dataset = open_dataset(path)
+    expr = build_expression(lat_rng, lon_rng, depth_rng, t_range, dataset=dataset)
+    table = dataset.to_table(columns=["lat", "lon", "temperature", "salinity"], filter=expr)
+    return aggregate_frame(table.to_pandas(), lat_rng, lon_rng, cell)
+
+
+def parquet_stats(path: str) -> Tuple[float, float, float, float, Optional[str], Optional[str]]:
+    """Global lat/lon/time bounds from row-group statistics (no data pages read)."""
+    dataset = open_dataset(path)
+    mins: Dict[str, object] = {}
+    maxs: Dict[str, object] = {}
+    for frag in dataset.get_fragments():
+        meta = frag.metadata
+        for rg in range(meta.num_row_groups):
+            group = meta.row_group(rg)
+            for i in range(group.num_columns):
+                col = group.column(i)
+                name = col.path_in_schema
+                stats = col.statistics
+                if name not in ("lat", "lon", "time") or stats is None or not stats.has_min_max:
+                    continue
+                mins[name] = stats.min if name not in mins else min(mins[name], stats.min)
+                maxs[name] = stats.max if name not in maxs else max(maxs[name], stats.max)
+    tmin = str(pd.Timestamp(mins["time"])) if "time" in mins else None
+    tmax = str(pd.Timestamp(maxs["time"])) if "time" in maxs else None
+    return mins.get("lat"), maxs.get("lat"), mins.get("lon"), maxs.get("lon"), tmin, tmax
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a NetCDF Argo grid to a partitioned Parquet dataset")
+    parser.add_argument("nc_path", nargs="?", default=NC_PATH)
+    parser.add_argument("--out", default=PARQUET_PATH)
+    parser.add_argument("--tile", type=float, default=None, help="also partition by lat/lon tiles of this many degrees")
+    parser.add_argument("--skip-nan", action="store_true", help="drop land/missing cells")
+    args = parser.parse_args()
+
+    stats = export_netcdf(args.nc_path, args.out, tile_deg=args.tile, skip_nan=args.skip_nan)
+    print(f"✅ {stats['rows']:,} rows -> {args.out} in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# halka timing layer -- har rerun me kaunsa stage (SQL, pickle load, chart build, pydeck/plotly render, ollama)
+# kitna time / kitne rows / kitne bytes le raha hai. Dashboards har rerun pe ek StageTimer banate hai,
+# stages sidebar ke debug panel me dikhte hai aur JSON lines me perf_log.jsonl me append hote hai.
+#
+# usage:  python perf.py                        (perf_log.jsonl ka p50/p95 per stage)
+#         python perf.py other_log.jsonl --app dashboard --last 500 --json
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# FLOATCHAT_PERF_LOG="" => file me kuch nahi likha jata (panel phir bhi chalta hai)
+PERF_LOG = os.environ.get("FLOATCHAT_PERF_LOG", "perf_log.jsonl")
+
+_write_lock = threading.Lock()
+
+
+def payload_size(obj) -> Dict[str, Optional[int]]:
+    """rows / bytes of a stage result: DataFrame (deep memory), str/bytes, or anything with len()."""
+    if isinstance(obj, pd.DataFrame):
+        return {"rows": len(obj), "bytes": int(obj.memory_usage(index=True, deep=True).sum())}
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {"rows": None, "bytes": len(obj)}
+    if isinstance(obj, str):
+        return {"rows": None, "bytes": len(obj.encode())}
+    if isinstance(obj, (list, tuple)):
+        return {"rows": len(obj), "bytes": None}
+    return {"rows": None, "bytes": None}
+
+
+class Stage(dict):
+    """One timed stage; ``measure(obj)`` fills rows/bytes from the stage's result."""
+
+    def measure(self, obj) -> None:
+        for key, value in payload_size(obj).items():
+            if value is not None:
+                self[key] = value
+
+
+class StageTimer:
+    """Stage records for one script run (one Streamlit rerun / one request).
+
+    ``with timer.stage("fetch_data") as s: df = ...; s.measure(df)`` times the
+    block with perf_counter; ``timer.wrap("name")`` does the same for a
+    function and measures its return value. Every finished stage is kept in
+    ``records`` and, if ``log_path`` is set, appended as one JSON line.
+    A stage that raises is recorded with ``error`` and the exception re-raised.
+    """
+
+    def __init__(self, app: str, log_path: Optional[str] = PERF_LOG, **fields):
+        self.app = app
+        self.log_path = log_path or None
+        self.run_id = uuid.uuid4().hex[:12]
+        self.fields = fields
+        self.records: List[Stage] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, **fields) -> Iterator[Stage]:
+        rec = Stage(stage=name, rows=None, bytes=None, **fields)
+        start = time.perf_counter()
+        try:
+            yield rec
+        except BaseException as e:
+            rec["error"] = type(e).__name__
+            raise
+        finally:
+            rec["ms"] = round((time.perf_counter() - start) * 1000, 3)
+            self.add(rec)
+
+    def wrap(self, name: str, **fields) -> Callable:
+        """Decorator form of stage(); the return value is measured."""
+        def decorate(fn: Callable) -> Callable:
+            @wraps(fn)
+            def inner(*args, **kwargs):
+                with self.stage(name, **fields) as rec:
+                    result = fn(*args, **kwargs)
+                    rec.measure(result)
+                    return result
+            return inner
+        return decorate
+
+    def add(self, rec: Stage) -> None:
+        self.records.append(rec)
+        if self.log_path:
+            line = {"ts": round(time.time(), 3), "app": self.app, "run": self.run_id, **self.fields, **rec}
+            with _write_lock, open(self.log_path, "a") as f:
+                f.write(json.dumps(line, default=str) + "\n")
+
+    def frame(self) -> pd.DataFrame:
+        """This run's stages, slowest first, plus a share-of-run column."""
+        if not self.records:
+            return pd.DataFrame(columns=["stage", "ms", "rows", "bytes"])
+        df = pd.DataFrame(self.records)
+        total = (time.perf_counter() - self._start) * 1000
+        df["share"] = (df["ms"] / total).round(3) if total else 0.0
+        return df.sort_values("ms", ascending=False).reset_index(drop=True)
+
+
+def show_timings(box, timer: StageTimer) -> None:
+    """Debug panel: this run's stages into a Streamlit container (sidebar expander)."""
+    df = timer.frame()
+    total = (time.perf_counter() - timer._start) * 1000
+    box.caption(f"run {timer.run_id} · {total:,.0f} ms so far · {df['ms'].sum():,.0f} ms in {len(df)} timed stages")
+    box.dataframe(df, use_container_width=True, hide_index=True)
+    if timer.log_path:
+        box.caption(f"logged to {timer.log_path} -- `python perf.py` for p50/p95")
+
+
+def read_log(path: str = PERF_LOG, app: Optional[str] = None, last: Optional[int] = None) -> pd.DataFrame:
+    """The JSON-lines log as a DataFrame (bad / half-written lines skipped)."""
+    rows = []
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    if app:
+        df = df[df["app"] == app]
+    return df.tail(last) if last else df
+
+
+def summarize(df: pd.DataFrame, by: Sequence[str] = ("app", "stage")) -> pd.DataFrame:
+    """count / p50 / p95 / max ms and median rows/bytes per stage."""
+    if df.empty:
+        return pd.DataFrame(columns=[*by, "count", "p50_ms", "p95_ms", "max_ms", "rows_p50", "bytes_p50"])
+    df = df.assign(rows=pd.to_numeric(df.get("rows"), errors="coerce"),
+                   bytes=pd.to_numeric(df.get("bytes"), errors="coerce"))
+    grouped = df.groupby(list(by), sort=False)
+    out = grouped["ms"].agg(count="count",
+                            p50_ms=lambda s: float(np.percentile(s, 50)),
+                            p95_ms=lambda s: float(np.percentile(s, 95)),
+                            max_ms="max")
+    out["rows_p50"] = grouped["rows"].median()
+    out["bytes_p50"] = grouped["bytes"].median()
+    return out.reset_index().sort_values("p95_ms", ascending=False).reset_index(drop=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="p50/p95 per stage from the dashboards' timing log")
+    parser.add_argument("log", nargs="?", default=PERF_LOG or "perf_log.jsonl")
+    parser.add_argument("--app", help="only this app (dashboard / chatbot)")
+    parser.add_argument("--last", type=int, help="only the last N records")
+    parser.add_argument("--json", action="store_true", help="print JSON records instead of a table")
+    args = parser.parse_args()
+
+    summary = summarize(read_log(args.log, args.app, args.last))
+    if args.json:
+        print(summary.to_json(orient="records", indent=2))
+    elif summary.empty:
+        print(f"no timings in {args.log}")
+    else:
+        with pd.option_context("display.width", 200, "display.max_rows", None, "display.float_format", "{:,.2f}".format):
+            print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
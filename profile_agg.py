@@ -0,0 +1,168 @@
+# depth profile ke liye pre-aggregated table -- har (time, depth, lat/lon tile) ka count, sum aur sum of squares
+# ingest ke time hi ban jati hai, phir kisi bhi bbox ka exact mean/std tiles ko jod ke milliseconds me
+#
+# bbox ke andar poori tiles aggregate table se aati hai, kinaron (edges) ki aadhi tiles raw argo_data se
+# -- isliye result exact hai, approximation nahi
+import math
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from queries import TABLE_NAME, build_filter, floor_sql, format_time, has_table, rtree_name, time_bounds
+
+PROFILE_TABLE = "argo_profile_agg"
+TILE_DEG = 5.0
+
+VARS = ("temperature", "salinity")
+SUM_COLS = [f"{p}_{v}" for v in VARS for p in ("n", "sum", "sumsq")]
+
+
+def create_profile_table(conn: sqlite3.Connection, table: str = PROFILE_TABLE, replace: bool = False) -> None:
+    if replace:
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS "{table}" ('
+        '"time" TIMESTAMP NOT NULL, "depth" REAL NOT NULL, "tile_lat" INTEGER NOT NULL, "tile_lon" INTEGER NOT NULL, '
+        + ", ".join(f'"{c}" {"INTEGER" if c.startswith("n_") else "REAL"} NOT NULL DEFAULT 0' for c in SUM_COLS)
+        # tile_lat pehle -- bbox query tile ranges pe hoti hai, time/depth pe nahi
+        + ', PRIMARY KEY ("tile_lat", "tile_lon", "depth", "time")) WITHOUT ROWID'
+    )
+
+
+def tile_sums(cols: Dict[str, np.ndarray], tile_deg: float = TILE_DEG) -> pd.DataFrame:
+    """Per-(time, depth, tile) n / sum / sumsq for one flattened slab (NaN = missing)."""
+    frame = {
+        "time": cols["time"],
+        "depth": cols["depth"],
+        "tile_lat": np.floor(cols["lat"] / tile_deg).astype("int64"),
+        "tile_lon": np.floor(cols["lon"] / tile_deg).astype("int64"),
+    }
+    for var in VARS:
+        vals = np.asarray(cols[var], dtype="float64")
+        ok = ~np.isnan(vals)
+        clean = np.where(ok, vals, 0.0)
+        frame[f"n_{var}"] = ok.astype("int64")
+        frame[f"sum_{var}"] = clean
+        frame[f"sumsq_{var}"] = clean * clean
+    keys = ["time", "depth", "tile_lat", "tile_lon"]
+    sums = pd.DataFrame(frame).groupby(keys, sort=False)[SUM_COLS].sum().reset_index()
+    return sums[sums["n_temperature"] + sums["n_salinity"] > 0]
+
+
+def upsert_sums(conn: sqlite3.Connection, sums: pd.DataFrame, table: str = PROFILE_TABLE,
+                sign: int = 1) -> None:
+    """Add (sign=1) or subtract (sign=-1) slab sums into the aggregate table."""
+    if sums.empty:
+        return
+    cols = ["time", "depth", "tile_lat", "tile_lon"] + SUM_COLS
+    update = ", ".join(f'"{c}" = "{c}" + excluded."{c}"' for c in SUM_COLS)
+    sql = (f'INSERT INTO "{table}" ({", ".join(cols)}) VALUES ({", ".join("?" for _ in cols)}) '
+           f'ON CONFLICT("tile_lat", "tile_lon", "depth", "time") DO UPDATE SET {update}')
+    times = sums["time"].to_numpy()
+    if np.issubdtype(times.dtype, np.datetime64):
+        times = format_time(times)
+    rows = zip(
+        times.tolist(), sums["depth"].tolist(), sums["tile_lat"].tolist(), sums["tile_lon"].tolist(),
+        *((sums[c] * sign).tolist() for c in SUM_COLS),
+    )
+    conn.executemany(sql, rows)
+
+
+def build_profile_table(conn: sqlite3.Connection, table: str = TABLE_NAME, agg_table: str = PROFILE_TABLE,
+                        tile_deg: float = TILE_DEG) -> None:
+    """(Re)build the aggregate table from rows already in ``table`` (old DBs, to_sqlite.py)."""
+    create_profile_table(conn, agg_table, replace=True)
+    parts = []
+    for var in VARS:
+        parts += [f"COUNT({var})", f"TOTAL({var})", f"TOTAL({var} * {var})"]
+    conn.execute(
+        f'INSERT INTO "{agg_table}" (time, depth, tile_lat, tile_lon, {", ".join(SUM_COLS)}) '
+        f"SELECT time, depth, {floor_sql(f'lat / {tile_deg}')} AS ty, "
+        f"{floor_sql(f'lon / {tile_deg}')} AS tx, {', '.join(parts)} "
+        f'FROM "{table}" GROUP BY time, depth, ty, tx '
+        "HAVING COUNT(temperature) + COUNT(salinity) > 0"
+    )
+
+
+def _inner_tiles(lo: float, hi: float, tile_deg: float) -> Tuple[int, int]:
+    """Tiles [t*tile, (t+1)*tile) lying completely inside [lo, hi]."""
+    return math.ceil(lo / tile_deg), math.floor(hi / tile_deg) - 1
+
+
+def _raw_sums(conn, table, lat_rng, lon_rng, depth_rng, t_range, extra: str = "",
+              extra_params: Optional[List] = None) -> pd.DataFrame:
+    """n / sum / sumsq per depth straight from argo_data (used for the bbox edges)."""
+    # edge strips patli hoti hai, isliye date range ho tab bhi R*Tree hi behtar hai
+    from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, t_range, table=table,
+                                               use_rtree=has_table(conn, rtree_name(table)))
+    parts = []
+    for var in VARS:
+        parts += [f"COUNT(d.{var}) AS n_{var}", f"TOTAL(d.{var}) AS sum_{var}",
+                  f"TOTAL(d.{var} * d.{var}) AS sumsq_{var}"]
+    sql = f"SELECT d.depth AS depth, {', '.join(parts)} FROM {from_sql} WHERE {where_sql}{extra} GROUP BY d.depth"
+    return pd.read_sql(sql, conn, params=params + (extra_params or []))
+
+
+def profile_sums(conn: sqlite3.Connection, lat_rng, lon_rng, depth_rng, t_range=None,
+                 table: str = TABLE_NAME, agg_table: str = PROFILE_TABLE,
+                 tile_deg: float = TILE_DEG) -> pd.DataFrame:
+    """Per-depth n / sum / sumsq for a bbox: interior tiles from the aggregate table + raw edges."""
+    ty0, ty1 = _inner_tiles(lat_rng[0], lat_rng[1], tile_deg)
+    tx0, tx1 = _inner_tiles(lon_rng[0], lon_rng[1], tile_deg)
+    if ty0 > ty1 or tx0 > tx1:
+        # bbox ek tile se bhi chhota -- seedha raw rows
+        return _raw_sums(conn, table, lat_rng, lon_rng, depth_rng, t_range)
+
+    where = ["tile_lat BETWEEN ? AND ?", "tile_lon BETWEEN ? AND ?", "depth BETWEEN ? AND ?"]
+    params: List = [ty0, ty1, tx0, tx1, depth_rng[0], depth_rng[1]]
+    bounds = time_bounds(t_range)
+    if bounds:
+        where.append("time >= ? AND time < ?")
+        params += list(bounds)
+    sums = ", ".join(f'SUM("{c}") AS {c}' for c in SUM_COLS)
+    parts = [pd.read_sql(f'SELECT depth, {sums} FROM "{agg_table}" WHERE {" AND ".join(where)} GROUP BY depth',
+                         conn, params=params)]
+
+    # inner tiles ka rectangle: lat [a, b), lon [c, e)
+    a, b = ty0 * tile_deg, (ty1 + 1) * tile_deg
+    c, e = tx0 * tile_deg, (tx1 + 1) * tile_deg
+    strips = [
+        ((lat_rng[0], a), lon_rng, " AND d.lat < ?", [a], lat_rng[0] < a),                  # south
+        ((b, lat_rng[1]), lon_rng, "", [], True),                                           # north
+        ((a, b), (lon_rng[0], c), " AND d.lat < ? AND d.lon < ?", [b, c], lon_rng[0] < c),  # west
+        ((a, b), (e, lon_rng[1]), " AND d.lat < ?", [b], True),                             # east
+    ]
+    for s_lat, s_lon, extra, extra_params, non_empty in strips:
+        if not non_empty:
+            continue
+        parts.append(_raw_sums(conn, table, s_lat, s_lon, depth_rng, t_range, extra, extra_params))
+    parts = [p.astype("float64") for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=["depth"] + SUM_COLS, dtype="float64")
+    return pd.concat(parts, ignore_index=True).groupby("depth", as_index=False)[SUM_COLS].sum()
+
+
+def finish_profile(sums: pd.DataFrame) -> pd.DataFrame:
+    """n / sum / sumsq -> count, mean and sample std per depth."""
+    sums = sums.fillna(0).astype("float64")
+    out = pd.DataFrame({"depth": sums["depth"]})
+    for var in VARS:
+        n = sums[f"n_{var}"].astype("float64")
+        mean = sums[f"sum_{var}"] / n.where(n > 0)
+        var_ = (sums[f"sumsq_{var}"] - n * mean * mean) / (n - 1).where(n > 1)
+        out[f"{var}_count"] = n.astype("int64")
+        out[f"{var}_mean"] = mean
+        out[f"{var}_std"] = np.sqrt(var_.clip(lower=0))
+    out = out[(out["temperature_count"] + out["salinity_count"]) > 0]
+    return out.sort_values("depth").reset_index(drop=True)
+
+
+def depth_profile(conn: sqlite3.Connection, lat_rng, lon_rng, depth_rng, t_range=None,
+                  table: str = TABLE_NAME, agg_table: str = PROFILE_TABLE,
+                  tile_deg: float = TILE_DEG) -> Optional[pd.DataFrame]:
+    """Exact per-depth mean/std for a bbox, or None if the aggregate table is missing."""
+    if not has_table(conn, agg_table):
+        return None
+    return finish_profile(profile_sums(conn, lat_rng, lon_rng, depth_rng, t_range, table, agg_table, tile_deg))
@@ -0,0 +1,216 @@
+# shared SQL builders for argo_data -- dashboard.py aur dashboard_chatbot.py dono yahi use karte hai
+# sab filters index-friendly (sargable) hai: R*Tree for lat/lon/depth, (time, depth) B-tree for time
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+TABLE_NAME = "argo_data"
+
+COL_TIME = "time"
+COL_LAT = "lat"
+COL_LON = "lon"
+COL_DEPTH = "depth"
+# normal argo_data ke columns, isi order me (compact DB ka plain view bhi yahi deta hai)
+DATA_COLUMNS = (COL_TIME, COL_DEPTH, COL_LAT, COL_LON, "temperature", "salinity")
+
+
+def rtree_name(table: str) -> str:
+    return f"{table}_rtree"
+
+
+def time_index_name(table: str) -> str:
+    return f"idx_{table}_time_depth"
+
+
+def lookup_table(col: str) -> str:
+    """compact.py lookup table: code ``idx`` -> value of ``col``, codes in sorted value order."""
+    return f"argo_lookup_{col}"
+
+
+def coded_view_name(table: str) -> str:
+    """compact.py view with the rowid and the *_idx codes next to the decoded columns."""
+    return f"{table}_coded"
+
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def format_time(times: np.ndarray) -> np.ndarray:
+    """datetime64 -> 'YYYY-MM-DD HH:MM:SS' text, same format pandas.to_sql wrote."""
+    return np.char.replace(np.datetime_as_string(times.astype("datetime64[s]"), unit="s"), "T", " ")
+
+
+def floor_sql(expr: str) -> str:
+    """floor() for SQLite builds without the math functions (CAST truncates toward zero)."""
+    return f"(CAST({expr} AS INTEGER) - (({expr}) < CAST({expr} AS INTEGER)))"
+
+
+def time_bounds(t_range) -> Optional[Tuple[str, str]]:
+    """Date range -> half-open ['t0 00:00:00', 't1+1day 00:00:00') text bounds.
+
+    ``time`` is stored as 'YYYY-MM-DD HH:MM:SS' text, so plain string
+    comparison is correct and can use the (time, depth) index, unlike
+    ``date(time) BETWEEN ...`` which has to evaluate date() on every row.
+    """
+    if not t_range or len(t_range) != 2:
+        return None
+    t0 = pd.to_datetime(t_range[0]).normalize()
+    t1 = pd.to_datetime(t_range[1]).normalize() + pd.Timedelta(days=1)
+    return t0.strftime("%Y-%m-%d %H:%M:%S"), t1.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def compact_codes(conn: sqlite3.Connection, lat_rng, lon_rng, depth_rng, t_range=None,
+                  table: str = TABLE_NAME) -> Optional[Dict[str, Tuple[int, int]]]:
+    """Value ranges -> {col: (first code, last code)} on a compact DB (compact.py), else None.
+
+    Lookup codes follow the sorted values, so ``lat BETWEEN a AND b`` is
+    exactly ``lat_idx BETWEEN code(a) AND code(b)``; a range with no
+    values gets the empty (0, -1). Only a few hundred lookup rows are read.
+    """
+    if not has_table(conn, coded_view_name(table)):
+        return None
+    conds = {COL_DEPTH: (f"{COL_DEPTH} BETWEEN ? AND ?", depth_rng),
+             COL_LAT: (f"{COL_LAT} BETWEEN ? AND ?", lat_rng),
+             COL_LON: (f"{COL_LON} BETWEEN ? AND ?", lon_rng)}
+    bounds = time_bounds(t_range)
+    if bounds:
+        conds = {COL_TIME: (f"{COL_TIME} >= ? AND {COL_TIME} < ?", bounds), **conds}
+    codes = {}
+    for col, (cond, rng) in conds.items():
+        lo, hi = conn.execute(f'SELECT MIN(idx), MAX(idx) FROM "{lookup_table(col)}" WHERE {cond}',
+                              [rng[0], rng[1]]).fetchone()
+        codes[col] = (0, -1) if lo is None else (lo, hi)
+    return codes
+
+
+def build_filter(lat_rng, lon_rng, depth_rng, t_range=None, table: str = TABLE_NAME,
+                 use_rtree: bool = False, alias: str = "d",
+                 codes: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[str, str, List]:
+    """Return (from_sql, where_sql, params) for a bbox / depth / date filter.
+
+    With ``use_rtree`` the lat/lon/depth box is answered by the R*Tree and
+    joined back to ``table`` by rowid. The exact BETWEEN checks stay on the
+    base table because the R*Tree stores 32-bit rounded coordinates.
+    With ``codes`` (compact_codes(), compact DB) the filter is on the
+    integer codes of the coded view instead -- time_idx / depth_idx go
+    through the compact table's (time_idx, depth_idx) index.
+    """
+    where: List[str] = []
+    params: List = []
+    if codes is not None:
+        for col, (lo, hi) in codes.items():
+            where.append(f"{alias}.{col}_idx BETWEEN ? AND ?")
+            params += [lo, hi]
+        return f'"{coded_view_name(table)}" AS {alias}', " AND ".join(where), params
+    if use_rtree:
+        rt = rtree_name(table)
+        from_sql = f'"{rt}" AS r CROSS JOIN "{table}" AS {alias} ON {alias}.rowid = r.id'
+        where.append("r.min_lat <= ? AND r.max_lat >= ?")
+        params += [lat_rng[1], lat_rng[0]]
+        where.append("r.min_lon <= ? AND r.max_lon >= ?")
+        params += [lon_rng[1], lon_rng[0]]
+        where.append("r.min_depth <= ? AND r.max_depth >= ?")
+        params += [depth_rng[1], depth_rng[0]]
+    else:
+        from_sql = f'"{table}" AS {alias}'
+
+    where.append(f"{alias}.{COL_LAT} BETWEEN ? AND ?")
+    params += [lat_rng[0], lat_rng[1]]
+    where.append(f"{alias}.{COL_LON} BETWEEN ? AND ?")
+    params += [lon_rng[0], lon_rng[1]]
+    where.append(f"{alias}.{COL_DEPTH} BETWEEN ? AND ?")
+    params += [depth_rng[0], depth_rng[1]]
+
+    bounds = time_bounds(t_range)
+    if bounds:
+        where.append(f"{alias}.{COL_TIME} >= ? AND {alias}.{COL_TIME} < ?")
+        params += list(bounds)
+    return from_sql, " AND ".join(where), params
+
+
+def build_select(lat_rng, lon_rng, depth_rng, t_range=None, table: str = TABLE_NAME,
+                 limit: Optional[int] = None, use_rtree: bool = False,
+                 columns: Sequence[str] = ("*",), alias: str = "d",
+                 codes: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[str, List]:
+    """SELECT for the dashboard filters. Returns (sql, params)."""
+    from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, t_range, table=table,
+                                               use_rtree=use_rtree, alias=alias, codes=codes)
+    if codes is not None and tuple(columns) == ("*",):
+        # coded view me rowid / *_idx bhi hai -- "*" = sirf normal DB wale columns
+        columns = DATA_COLUMNS
+    cols = ", ".join(c if "(" in c or c.startswith(f"{alias}.") else f"{alias}.{c}" for c in columns)
+    sql = f"SELECT {cols} FROM {from_sql} WHERE {where_sql}"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+def build_grid_select(lat_rng, lon_rng, depth_rng, t_range=None, table: str = TABLE_NAME,
+                      cell: float = 1.0, use_rtree: bool = False, alias: str = "d",
+                      codes: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[str, List]:
+    """GROUP BY lat/lon cell: count + mean/min/max of temperature and salinity per cell.
+
+    Cell indexes (iy, ix) are counted from the bbox's lower-left corner;
+    grid_agg.add_cell_centers turns them back into lat/lon.
+    """
+    from_sql, where_sql, params = build_filter(lat_rng, lon_rng, depth_rng, t_range, table=table,
+                                               use_rtree=use_rtree, alias=alias, codes=codes)
+    aggs = []
+    for var in ("temperature", "salinity"):
+        aggs += [f"AVG({alias}.{var}) AS {var}_mean", f"MIN({alias}.{var}) AS {var}_min",
+                 f"MAX({alias}.{var}) AS {var}_max"]
+    sql = (
+        f"SELECT CAST(({alias}.{COL_LAT} - ?) / ? AS INTEGER) AS iy, "
+        f"CAST(({alias}.{COL_LON} - ?) / ? AS INTEGER) AS ix, "
+        f"SUM({alias}.temperature IS NOT NULL OR {alias}.salinity IS NOT NULL) AS count, "
+        f"{', '.join(aggs)} FROM {from_sql} WHERE {where_sql} "
+        "GROUP BY iy, ix HAVING count > 0"
+    )
+    return sql, [lat_rng[0], cell, lon_rng[0], cell] + params
+
+
+def use_rtree_for(conn: sqlite3.Connection, table: str, t_range=None) -> bool:
+    """Pick the access path: R*Tree for bbox queries, time index when a date range is given.
+
+    A date range usually covers only a few of the grid's time steps, so the
+    (time, depth) index is the tighter filter then; without one the bbox is
+    the only selective predicate. Falls back to plain scans on old DBs
+    that were built before the indexes existed.
+    """
+    if t_range and time_bounds(t_range) and has_table(conn, time_index_name(table)):
+        return False
+    return has_table(conn, rtree_name(table))
+
+
+def read_rows(conn: sqlite3.Connection, lat_rng, lon_rng, depth_rng, t_range=None, table: str = TABLE_NAME,
+              limit: Optional[int] = None) -> pd.DataFrame:
+    """Filtered rows as a DataFrame -- dashboard fetch_data aur api.py dono yahi chalate hai."""
+    # R*Tree / (time, depth) index agar DB me bane hai to unhi se query hogi; compact DB pe code ranges
+    use_rtree = use_rtree_for(conn, table, t_range)
+    codes = compact_codes(conn, lat_rng, lon_rng, depth_rng, t_range, table)
+    query, params = build_select(lat_rng, lon_rng, depth_rng, t_range, table=table, limit=limit,
+                                 use_rtree=use_rtree, codes=codes)
+    return pd.read_sql(query, conn, params=params, parse_dates=[COL_TIME])
+
+
+def build_indexes(conn: sqlite3.Connection, table: str = TABLE_NAME, verbose: bool = False) -> None:
+    """(Re)build the R*Tree over lat/lon/depth and the (time, depth) index."""
+    rt = rtree_name(table)
+    conn.execute(f'DROP TABLE IF EXISTS "{rt}"')
+    conn.execute(
+        f'CREATE VIRTUAL TABLE "{rt}" USING rtree(id, min_lat, max_lat, min_lon, max_lon, min_depth, max_depth)'
+    )
+    conn.execute(
+        f'INSERT INTO "{rt}" SELECT rowid, {COL_LAT}, {COL_LAT}, {COL_LON}, {COL_LON}, {COL_DEPTH}, {COL_DEPTH} '
+        f'FROM "{table}"'
+    )
+    if verbose:
+        print(f"  built {rt}")
+    conn.execute(f'CREATE INDEX IF NOT EXISTS "{time_index_name(table)}" ON "{table}" ({COL_TIME}, {COL_DEPTH})')
+    if verbose:
+        print(f"  built {time_index_name(table)}")
+    conn.execute(f'ANALYZE "{table}"')
@@ -15,82 +15,23 @@ ds_info.close()
 # xarray se data use karne ke liye
 ds = xr.open_dataset(file_path)
 
-# ye vala code 1.9 crore data points k liye hai bht bada ram pe load jada padega or chalne mai time lega
-
-# import pandas as pd
-# import numpy as np
-# import xarray as xr
-
-# file_path = "data/argo_sample.nc"
-# ds = xr.open_dataset(file_path)
-
-# # Longitude, Latitude, Depth, Time arrays
-# lon = ds['XAXIS'].values
-# lat = ds['YAXIS'].values
-# depth = ds['ZAX'].values
-# time = ds['TAXIS'].values
-
-# # Temperature and Salinity arrays
-# temp = ds['TEMP'].values  # shape: (time, depth, lat, lon)
-# sal = ds['SAL'].values
-
-# rows = []
-# for t_idx, t_val in enumerate(time):
-#     for d_idx, d_val in enumerate(depth):
-#         for y_idx, y_val in enumerate(lat):
-#             for x_idx, x_val in enumerate(lon):
-#                 rows.append({
-#                     'time': np.datetime64(t_val, 's') if np.issubdtype(type(t_val), np.number) else t_val,
-#                     'depth': float(d_val),
-#                     'lat': float(y_val),
-#                     'lon': float(x_val),
-#                     'temperature': float(temp[t_idx, d_idx, y_idx, x_idx]),
-#                     'salinity': float(sal[t_idx, d_idx, y_idx, x_idx])
-#                 })
-
-# df = pd.DataFrame(rows)
+# poora 1.9 crore data points wala grid ab flatten.py se seconds mai ban jata hai
+# (slab by slab padhta hai, 4 nested loops nahi):
+#
+# from flatten import flatten_dataset
+# df = flatten_dataset(ds)
 # print(df.head())
 # print(df.shape)
 
 # ye vala data chota hai 500 data points ka fast chalega 
 
-# ====== SUBSET CHOOSE KARO ======
-# sirf pehla 1 time step, pehle 5 depth
-time = ds['TAXIS'][:1].values        # 1 time
-depth = ds['ZAX'][:5].values         # 5 depth
-
-# saare lat/lon arrays lo
-all_lat = ds['YAXIS'].values
-all_lon = ds['XAXIS'].values
-
-# India ke liye mask banao
-lat_mask = (all_lat >= 6) & (all_lat <= 37)
-lon_mask = (all_lon >= 68) & (all_lon <= 97)
-
-# mask apply karo aur sirf first 10 hi lo (zyada chahiye to :10 hata do ya bada do)
-lat = all_lat[lat_mask][:10]
-lon = all_lon[lon_mask][:10]
-
-# TEMP/SAL pe bhi wahi mask lagana hai
-temp = ds['TEMP'][:1, :5, lat_mask, :][:, :, :, lon_mask][:, :, :len(lat), :len(lon)].values
-sal = ds['SAL'][:1, :5, lat_mask, :][:, :, :, lon_mask][:, :, :len(lat), :len(lon)].values
-
-rows = []
-for t_idx, t_val in enumerate(time):
-    for d_idx, d_val in enumerate(depth):
-        for y_idx, y_val in enumerate(lat):
-            for x_idx, x_val in enumerate(lon):
-                rows.append({
-                    'time': np.datetime64(t_val, 's') if np.issubdtype(type(t_val), np.number) else t_val,
-                    'depth': float(d_val),
-                    'lat': float(y_val),
-                    'lon': float(x_val),
-                    'temperature': float(temp[t_idx, d_idx, y_idx, x_idx]),
-                    'salinity': float(sal[t_idx, d_idx, y_idx, x_idx])
-                })
+# ====== SUBSET ======
+# India mask + [:10] truncation ki jagah regions.json ka "india_df" extract (poora India box, 1 time, 5 depth)
+ds.close()
+from subset import run_config
 
-df = pd.DataFrame(rows)
+run_config("regions.json", only=["india_df"])
+df = pd.read_pickle("argo_df_india.pkl")
 print(df.head())
 print(df.shape)
-df.to_pickle("argo_df_india.pkl")
 print("India region DataFrame saved to argo_df_india.pkl")
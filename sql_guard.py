@@ -0,0 +1,235 @@
+# LLM ka SQL seedha pd.read_sql me nahi -- pehle check, phir limit aur time budget ke saath chalao
+# ek unbounded SELECT * ya cross join poore box ka CPU/memory kha sakta hai
+#   - sirf SELECT/WITH (authorizer writes, PRAGMA, ATTACH sab mana karta hai; connection bhi read-only)
+#   - EXPLAIN QUERY PLAN: bade table ka full scan + sort/aggregate => reject, baaki full scan => LIMIT laga ke chalao
+#   - LIMIT nahi hai (ya bahut bada hai) to khud lagao
+#   - set_progress_handler se wall-clock budget, time khatam => query interrupt
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from queries import rtree_name
+
+DEFAULT_MAX_ROWS = 5000
+DEFAULT_TIME_BUDGET = 10.0              # seconds
+DEFAULT_MAX_SCAN_ROWS = 20_000_000      # isse zyada rows scan + sort/aggregate => reject
+PROGRESS_STEPS = 1000                   # har itne VM instructions pe deadline check
+
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION,
+                    getattr(sqlite3, "SQLITE_RECURSIVE", 33)}
+_LIMIT_RE = re.compile(r"\blimit\s+(\d+)(?:\s*(,|offset)\s*(\d+))?\s*$", re.IGNORECASE)
+_AGG_RE = re.compile(r"\b(count|sum|avg|total|group_concat|min|max)\s*\(", re.IGNORECASE)
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)")
+# table_rows() ka cache: (db path, connection) -> ((data_version, total_changes), sizes)
+_TABLE_ROWS_CACHE_SIZE = 64
+_table_rows_cache: Dict[Tuple[str, int], Tuple[Tuple[int, int], Dict[str, int]]] = {}
+
+
+class QueryRejected(ValueError):
+    """The statement is not a read-only SELECT or its plan is too expensive."""
+
+
+class QueryTimeout(RuntimeError):
+    """The statement ran past its wall-clock budget and was interrupted."""
+
+
+def _authorizer(action, arg1, arg2, db_name, trigger):
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def statement_end(sql: str) -> int:
+    """Index just past the last real token: trailing whitespace, ``;`` and
+    ``-- ...`` / ``/* ... */`` comments don't count (quotes are respected)."""
+    end, i, n = 0, 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch in "'\"`[":
+            close = "]" if ch == "[" else ch
+            j = sql.find(close, i + 1)
+            # '' / "" escape -- string aage chalti hai
+            while j != -1 and close != "]" and sql.startswith(close * 2, j):
+                j = sql.find(close, j + 2)
+            i = n if j == -1 else j + 1
+            end = i
+        elif sql.startswith("--", i):
+            j = sql.find("\n", i)
+            i = n if j == -1 else j + 1
+        elif sql.startswith("/*", i):
+            j = sql.find("*/", i + 2)
+            i = n if j == -1 else j + 2
+        else:
+            if not ch.isspace() and ch != ";":
+                end = i + 1
+            i += 1
+    return end
+
+
+def strip_sql(sql: str) -> str:
+    """Trailing semicolons/whitespace/comments hatao; sirf SELECT / WITH chalega."""
+    sql = sql[:statement_end(sql)].strip()
+    if not sql:
+        raise QueryRejected("empty SQL")
+    if not re.match(r"^(select|with)\b", sql, re.IGNORECASE):
+        raise QueryRejected("only SELECT queries are allowed")
+    return sql
+
+
+def apply_limit(sql: str, max_rows: int) -> Tuple[str, bool]:
+    """SQL with at most ``max_rows`` rows; returns (sql, limit_added)."""
+    # "LIMIT 5;" / "LIMIT 5 -- top" -- pehle aakhri ; aur comments hatao, warna regex match nahi hota
+    # aur naya LIMIT ";" ke baad (doosra statement) ya comment ke andar chala jata
+    sql = sql[:statement_end(sql)]
+    m = _LIMIT_RE.search(sql)
+    if m:
+        count = int(m.group(3)) if m.group(2) == "," else int(m.group(1))
+        if count <= max_rows:
+            return sql, False
+        return f"SELECT * FROM (\n{sql}\n) LIMIT {int(max_rows)}", True
+    return f"{sql}\nLIMIT {int(max_rows)}", True
+
+
+def table_rows(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Approximate row count per table via MAX(rowid) -- one B-tree seek per table, cached per DB.
+
+    Virtual tables are skipped (MAX(rowid) on an R*Tree walks the whole
+    tree); an R*Tree gets its base table's count instead. The sizes are
+    reused until ``PRAGMA data_version`` / ``total_changes`` say the DB changed.
+    """
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    version = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+    key = (path, id(conn))
+    cached = _table_rows_cache.get(key)
+    if path and cached and cached[0] == version:
+        return cached[1]
+    rows = {}
+    virtual = set()
+    for name, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' "
+                                  "AND name NOT LIKE 'sqlite_%'"):
+        if (sql or "").upper().startswith("CREATE VIRTUAL TABLE"):
+            virtual.add(name)
+            continue
+        try:
+            rows[name] = conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{name}"').fetchone()[0]
+        except sqlite3.Error:
+            # WITHOUT ROWID tables -- unknown
+            continue
+    for name, count in list(rows.items()):
+        if rtree_name(name) in virtual:
+            rows[rtree_name(name)] = count
+    if path:
+        if len(_table_rows_cache) >= _TABLE_ROWS_CACHE_SIZE:
+            _table_rows_cache.clear()
+        _table_rows_cache[key] = (version, rows)
+    return rows
+
+
+def explain(conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> List[Tuple[int, int, str]]:
+    """EXPLAIN QUERY PLAN as (id, parent, detail) rows."""
+    return [(r[0], r[1], r[3]) for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def estimate_scan(plan: List[Tuple[int, int, str]], sizes: Dict[str, int]) -> Tuple[int, List[str]]:
+    """Estimated rows touched by full scans and the scanned names.
+
+    Scans under the same parent are nested loops of one join, so they
+    multiply; separate parents (subqueries, CTEs) add up. Aliases can't be
+    mapped back to tables from the plan text, so an unknown name counts
+    as the biggest table.
+    """
+    biggest = max(sizes.values(), default=0)
+    per_parent: Dict[int, int] = {}
+    scanned = []
+    for _, parent, detail in plan:
+        m = _SCAN_RE.match(detail)
+        if not m or "INDEX" in detail or "VIRTUAL TABLE" in detail or "CONSTANT ROW" in detail:
+            continue
+        name = m.group(1)
+        if name.startswith("("):
+            # materialized subquery / CTE -- uski cost andar wale scan me already gini hai
+            continue
+        scanned.append(name)
+        per_parent[parent] = per_parent.get(parent, 1) * sizes.get(name, biggest)
+    return sum(per_parent.values()), scanned
+
+
+def run_guarded(conn: sqlite3.Connection, sql: str, params: Sequence = (), max_rows: int = DEFAULT_MAX_ROWS,
+                time_budget: float = DEFAULT_TIME_BUDGET, max_scan_rows: Optional[int] = DEFAULT_MAX_SCAN_ROWS,
+                ) -> Tuple[pd.DataFrame, Dict[str, object]]:
+    """Check, limit and run one SELECT; returns (DataFrame, report).
+
+    report: sql (as executed), plan, full_scans, est_rows_scanned,
+    limit_added, truncated (hit the injected LIMIT), rows, vm_steps,
+    elapsed_ms. Raises
+    QueryRejected before executing anything, QueryTimeout when the budget
+    runs out.
+    """
+    start = time.perf_counter()
+    sql = strip_sql(sql)
+    limited, limit_added = apply_limit(sql, max_rows)
+
+    conn.set_authorizer(_authorizer)
+    steps = [0]
+    deadline = start + time_budget if time_budget else None
+
+    def on_progress():
+        steps[0] += 1
+        return 1 if deadline is not None and time.perf_counter() > deadline else 0
+
+    try:
+        try:
+            plan = explain(conn, limited, params)
+        except sqlite3.ProgrammingError as e:
+            # "SELECT 1; DROP TABLE x" -- ek hi statement chalega
+            raise QueryRejected(str(e)) from e
+        except sqlite3.DatabaseError as e:
+            if "not authorized" in str(e):
+                raise QueryRejected("only read-only SELECT queries are allowed") from e
+            raise
+        sizes = {}
+        if any(_SCAN_RE.match(d) for _, _, d in plan):
+            # table_rows ke apne PRAGMA -- ye hamara code hai, authorizer sirf user ke SQL ke liye
+            conn.set_authorizer(None)
+            try:
+                sizes = table_rows(conn)
+            finally:
+                conn.set_authorizer(_authorizer)
+        est_rows, scans = estimate_scan(plan, sizes)
+        # scan + sort / group / aggregate => poora scan hone tak ek bhi row nahi aati, LIMIT kuch nahi bachata
+        blocking = any("TEMP B-TREE" in d for _, _, d in plan) or bool(_AGG_RE.search(sql))
+        if max_scan_rows and blocking and est_rows > max_scan_rows:
+            raise QueryRejected(
+                f"query plan scans about {est_rows:,} rows ({', '.join(scans)}) before returning anything; "
+                f"add a lat/lon/time filter or a smaller range"
+            )
+
+        conn.set_progress_handler(on_progress, PROGRESS_STEPS)
+        try:
+            cur = conn.execute(limited, params)
+            columns = [d[0] for d in cur.description]
+            rows = cur.fetchmany(max_rows)
+            cur.close()
+        except sqlite3.OperationalError as e:
+            if "interrupted" in str(e):
+                raise QueryTimeout(f"query stopped after {time_budget:g}s time budget") from e
+            raise
+    finally:
+        conn.set_progress_handler(None, 0)
+        conn.set_authorizer(None)
+
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    report = {
+        "sql": limited,
+        "plan": [d for _, _, d in plan],
+        "full_scans": scans,
+        "est_rows_scanned": est_rows,
+        "limit_added": limit_added,
+        # limit humne lagaya aur poora bhar gaya => aur rows ho sakti thi
+        "truncated": limit_added and len(df) >= max_rows,
+        "rows": len(df),
+        "vm_steps": steps[0] * PROGRESS_STEPS,
+        "elapsed_ms": 1000 * (time.perf_counter() - start),
+    }
+    return df, report
@@ -0,0 +1,189 @@
+# dashboard cold start benchmark -- kaunse imports pehle paint se pehle chalte hai aur kitna time lete hai
+# 1) `python -X importtime`: har heavy module (streamlit, pandas, pyarrow, plotly, pydeck, altair, ollama ...)
+#    alag fresh process me, cumulative import time
+# 2) har dashboard ke top-level imports (pehli st.* call se pehle wale, AST se) ek saath -- ye first paint ko rokte hai
+# 3) streamlit ho to AppTest me script chala ke: pehla element kab enqueue hua (time-to-first-paint) aur
+#    poora run kitna -- cold (pehla run, imports ke saath) aur warm rerun
+#
+# usage:  python startup_bench.py --out startup.json
+#         python startup_bench.py --compare startup.json --tolerance 0.25
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DASHBOARDS = ("dashboard.py", "dashboard_chatbot.py")
+HEAVY_MODULES = ("streamlit", "pandas", "numpy", "pyarrow", "plotly.express", "pydeck", "altair", "ollama",
+                 "xarray")
+
+# child process: first DeltaGenerator._enqueue = browser ko pehla element gaya
+_PAINT_PROBE = r"""
+import json, sys, time
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.testing.v1 import AppTest
+
+first = []
+_enqueue = DeltaGenerator._enqueue
+def _probe(self, *args, **kwargs):
+    if not first:
+        first.append(time.perf_counter())
+    return _enqueue(self, *args, **kwargs)
+DeltaGenerator._enqueue = _probe
+
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2]))
+runs = []
+for _ in range(2):
+    first.clear()
+    start = time.perf_counter()
+    at.run()
+    end = time.perf_counter()
+    runs.append({"first_paint_ms": (first[0] - start) * 1000 if first else None, "total_ms": (end - start) * 1000,
+                 "exceptions": [str(e.message)[:200] for e in at.exception]})
+print(json.dumps({"cold": runs[0], "warm": runs[1]}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, object]]:
+    """`-X importtime` lines -> [{module, self_us, cumulative_us, depth}]."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # "| " ke baad har level = 2 spaces
+        out.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cum_us), "depth": depth})
+    return out
+
+
+def import_cost(modules: List[str], repeat: int = 3) -> Dict[str, object]:
+    """Import ``modules`` in fresh interpreters (median of ``repeat``); total ms with shared deps
+    counted once, the slowest of ``modules`` and the ones that aren't installed."""
+    code = "\n".join(f"try:\n    import {m}\nexcept ImportError:\n    print({m!r})" for m in modules)
+    runs = []
+    for _ in range(max(repeat, 1)):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                              capture_output=True, text=True)
+        # depth 0 (top-level) entries ka cumulative = poora import tree
+        top = [e for e in parse_importtime(proc.stderr) if e["depth"] == 0]
+        runs.append((sum(e["cumulative_us"] for e in top) / 1000, top, proc.stdout.split()))
+    ms, top, missing = sorted(runs, key=lambda r: r[0])[len(runs) // 2]
+    slowest = sorted((e for e in top if e["module"] in modules), key=lambda e: e["cumulative_us"], reverse=True)[:5]
+    return {"ms": ms, "missing": missing,
+            "slowest": [{"module": e["module"], "ms": e["cumulative_us"] / 1000} for e in slowest]}
+
+
+def pre_paint_imports(script: str) -> List[str]:
+    """Modules a script imports at top level before its first ``st.*`` call."""
+    with open(os.path.join(HERE, script)) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+        elif any(isinstance(n, ast.Attribute) and isinstance(n.value, ast.Name) and n.value.id == "st"
+                 for n in ast.walk(node)):
+            break
+    return modules
+
+
+def first_paint(script: str, timeout: float = 120.0) -> Optional[Dict[str, object]]:
+    """AppTest cold + warm run of ``script`` (None if streamlit isn't installed)."""
+    proc = subprocess.run([sys.executable, "-c", _PAINT_PROBE, script, str(timeout)], cwd=HERE,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        if "No module named 'streamlit'" in proc.stderr:
+            return None
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_startup(dashboards=DASHBOARDS, modules=HEAVY_MODULES, paint: bool = True) -> Dict[str, object]:
+    baseline = import_cost([])["ms"]
+    result = {"python": sys.version.split()[0], "modules": {}, "dashboards": {}}
+    for m in modules:
+        cost = import_cost([m])
+        result["modules"][m] = None if m in cost["missing"] else round(cost["ms"] - baseline, 1)
+    for script in dashboards:
+        mods = pre_paint_imports(script)
+        cost = import_cost(mods)
+        entry = {"pre_paint_imports": mods, "pre_paint_import_ms": round(cost["ms"] - baseline, 1),
+                 "missing": cost["missing"], "slowest": cost["slowest"]}
+        if paint:
+            entry["apptest"] = first_paint(script)
+        result["dashboards"][script] = entry
+    return result
+
+
+def report(result: Dict[str, object]) -> None:
+    print("cold import (fresh interpreter, ms):")
+    for m, ms in result["modules"].items():
+        print(f"  {m:<16} {'not installed' if ms is None else f'{ms:8.1f}'}")
+    for script, d in result["dashboards"].items():
+        print(f"\n{script}: {len(d['pre_paint_imports'])} imports before the first st.* call = "
+              f"{d['pre_paint_import_ms']:.1f} ms" + (f" (missing: {', '.join(d['missing'])})" if d["missing"] else ""))
+        for s in d["slowest"]:
+            print(f"    {s['module']:<24} {s['ms']:8.1f} ms")
+        run = d.get("apptest")
+        if run is None:
+            print("  time-to-first-paint: streamlit not installed, skipped")
+        elif "error" in run:
+            print(f"  time-to-first-paint: failed ({run['error']})")
+        else:
+            for kind in ("cold", "warm"):
+                r = run[kind]
+                fp = "—" if r["first_paint_ms"] is None else f"{r['first_paint_ms']:.0f} ms"
+                print(f"  {kind}: first paint {fp}, full run {r['total_ms']:.0f} ms"
+                      + (f", {len(r['exceptions'])} exception(s)" if r["exceptions"] else ""))
+
+
+def compare(new: Dict[str, object], old: Dict[str, object], tolerance: float = 0.2) -> List[str]:
+    """Pre-paint import time / first paint that got slower than ``old`` by more than ``tolerance``."""
+    worse = []
+    for script, d in new["dashboards"].items():
+        prev = old.get("dashboards", {}).get(script)
+        if not prev:
+            continue
+        pairs = [("pre_paint_import_ms", d["pre_paint_import_ms"], prev["pre_paint_import_ms"])]
+        for kind in ("cold", "warm"):
+            a, b = (d.get("apptest") or {}).get(kind), (prev.get("apptest") or {}).get(kind)
+            if a and b and a["first_paint_ms"] is not None and b["first_paint_ms"] is not None:
+                pairs.append((f"{kind}.first_paint_ms", a["first_paint_ms"], b["first_paint_ms"]))
+        for name, now, before in pairs:
+            if before and now > before * (1 + tolerance):
+                worse.append(f"{script} {name}: {before:.1f} -> {now:.1f}")
+    return worse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dashboard cold start: -X importtime + AppTest time-to-first-paint")
+    parser.add_argument("--dashboards", nargs="+", default=list(DASHBOARDS))
+    parser.add_argument("--no-paint", action="store_true", help="only the import timings (no AppTest run)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="fail (exit 1) if startup got slower than this run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression for --compare")
+    args = parser.parse_args()
+
+    result = run_startup(args.dashboards, paint=not args.no_paint)
+    report(result)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"✅ results -> {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            worse = compare(result, json.load(f), args.tolerance)
+        for line in worse:
+            print(f"❌ regression {line}")
+        if worse:
+            sys.exit(1)
+        print(f"✅ no regression beyond {args.tolerance:.0%} vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
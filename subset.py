@@ -0,0 +1,192 @@
+# regional extract -- poore grid se India / Bay of Bengal / Arabian Sea (ya koi bhi bbox) ka full-resolution subset
+# dataset lazy khulta hai; pehle sirf coordinate vectors se masks bante hai, phir sirf region ke andar wale
+# (time, depth) slabs disk se padhe jate hai aur seedha store (SQLite / Parquet / pickle) me stream hote hai.
+# RAM = ek slab, region kitna bhi bada ho -- isliye ab [:10] lat/lon wali truncation ki zaroorat nahi.
+#
+# usage:  python subset.py                                   (regions.json ke saare extracts)
+#         python subset.py --only india bay_of_bengal
+#         python subset.py --region "arabian sea" --time 2020-01-01 2020-12-31 --depth 0 500 --out arabian.db
+#         python subset.py --bbox 8 20 60 75 --out box_parquet --format parquet
+import argparse
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from flatten import COLUMNS, VAR_DEPTH, VAR_LAT, VAR_LON, VAR_TIME, iter_flat_chunks, to_datetime64, to_frame
+from nl_templates import REGIONS
+from queries import time_bounds
+
+CONFIG_PATH = "regions.json"
+NC_PATH = "data/argo_sample.nc"
+STORE_FORMATS = ("sqlite", "parquet", "pickle")
+
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, object]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_bbox(spec: Dict[str, object], regions: Optional[Dict[str, Sequence[float]]] = None
+                 ) -> Tuple[float, float, float, float]:
+    """(lat_min, lat_max, lon_min, lon_max) from ``spec["bbox"]`` or a named ``spec["region"]``.
+
+    Names are looked up in the config's own "regions" first, then in
+    nl_templates.REGIONS (the same boxes the chatbot understands).
+    """
+    if spec.get("bbox"):
+        lat0, lat1, lon0, lon1 = (float(v) for v in spec["bbox"])
+        return min(lat0, lat1), max(lat0, lat1), min(lon0, lon1), max(lon0, lon1)
+    name = str(spec.get("region") or "").lower().replace("_", " ").strip()
+    known = {**REGIONS, **{k.lower(): tuple(v) for k, v in (regions or {}).items()}}
+    if name not in known:
+        raise ValueError(f"unknown region {spec.get('region')!r}; use one of {sorted(known)} or give a bbox")
+    return tuple(float(v) for v in known[name])
+
+
+def axis_index(values: np.ndarray, lo: Optional[float], hi: Optional[float]) -> np.ndarray:
+    """Indexes of coordinate ``values`` inside [lo, hi] (None = open end)."""
+    keep = np.ones(len(values), dtype=bool)
+    if lo is not None:
+        keep &= values >= lo
+    if hi is not None:
+        keep &= values <= hi
+    return np.flatnonzero(keep)
+
+
+def subset_indexes(ds: xr.Dataset, bbox: Tuple[float, float, float, float], t_range=None,
+                   depth_rng=None, first: Optional[Dict[str, int]] = None) -> Dict[str, np.ndarray]:
+    """iter_flat_chunks() index arguments for a bbox + date range + depth range.
+
+    ``first`` keeps only the first N matching indexes per axis, e.g.
+    ``{"time": 1, "depth": 5}`` -- the old ``[:1]`` / ``[:5]`` sample sizes.
+    Only the four coordinate vectors are read here -- TEMP/SAL are not
+    touched until the slabs are streamed.
+    """
+    lat0, lat1, lon0, lon1 = bbox
+    idx = {
+        "lat_idx": axis_index(ds[VAR_LAT].values, lat0, lat1),
+        "lon_idx": axis_index(ds[VAR_LON].values, lon0, lon1),
+        "depth_idx": axis_index(ds[VAR_DEPTH].values, *(depth_rng or (None, None))),
+    }
+    times = to_datetime64(ds[VAR_TIME].values)
+    bounds = time_bounds(t_range)
+    if bounds is None:
+        idx["time_idx"] = np.arange(len(times))
+    else:
+        # queries.py jaisa half-open range: [t0 00:00, t1 + 1 day)
+        lo, hi = (np.datetime64(pd.Timestamp(b)) for b in bounds)
+        idx["time_idx"] = np.flatnonzero((times >= lo) & (times < hi))
+    for axis, n in (first or {}).items():
+        if f"{axis}_idx" not in idx:
+            raise ValueError(f"unknown axis {axis!r} in first (use time, depth, lat or lon)")
+        idx[f"{axis}_idx"] = idx[f"{axis}_idx"][:int(n)]
+    return idx
+
+
+def store_format(out: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        if fmt not in STORE_FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (use one of {STORE_FORMATS})")
+        return fmt
+    ext = os.path.splitext(out)[1].lower()
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return "sqlite"
+    if ext in (".pkl", ".pickle"):
+        return "pickle"
+    return "parquet"
+
+
+def write_store(chunks: Iterator[Dict[str, np.ndarray]], out: str, fmt: str, tile_deg: Optional[float] = None,
+                verbose: bool = True) -> int:
+    """Stream chunks into ``out``; returns rows written."""
+    if fmt == "sqlite":
+        from ingest import load_chunks
+        return load_chunks(chunks, out, verbose=verbose)["rows"]
+    if fmt == "parquet":
+        from parquet_store import write_parquet
+        return write_parquet(chunks, out, tile_deg=tile_deg)
+    # pickle = poora DataFrame memory me -- sirf chhote preview extracts ke liye
+    parts = list(chunks)
+    df = to_frame({c: np.concatenate([p[c] for p in parts]) for c in COLUMNS}) if parts \
+        else pd.DataFrame(columns=COLUMNS)
+    df.to_pickle(out)
+    return len(df)
+
+
+def extract(spec: Dict[str, object], nc_path: str = NC_PATH, regions: Optional[Dict[str, Sequence[float]]] = None,
+            depth_chunk: int = 5, verbose: bool = True) -> Dict[str, object]:
+    """Run one extract spec (region/bbox, time, depth, first, out, format, tile, skip_nan). Returns stats."""
+    start = time.perf_counter()
+    bbox = resolve_bbox(spec, regions)
+    fmt = store_format(str(spec["out"]), spec.get("format"))
+    with xr.open_dataset(spec.get("source") or nc_path) as ds:  # lazy -- abhi koi data nahi padha
+        idx = subset_indexes(ds, bbox, spec.get("time"), spec.get("depth"), spec.get("first"))
+        shape = tuple(len(idx[k]) for k in ("time_idx", "depth_idx", "lat_idx", "lon_idx"))
+        if verbose:
+            print(f"{spec.get('name', spec['out'])}: lat {bbox[0]}–{bbox[1]}, lon {bbox[2]}–{bbox[3]} -> "
+                  f"{' x '.join(map(str, shape))} (time x depth x lat x lon) = {int(np.prod(shape)):,} cells")
+        chunks = iter_flat_chunks(ds, depth_chunk=int(spec.get("depth_chunk") or depth_chunk),
+                                  skip_nan=bool(spec.get("skip_nan")), **idx)
+        rows = write_store(chunks, str(spec["out"]), fmt, tile_deg=spec.get("tile"), verbose=verbose)
+    elapsed = time.perf_counter() - start
+    return {"name": spec.get("name"), "out": spec["out"], "format": fmt, "shape": shape, "rows": rows,
+            "seconds": elapsed, "rows_per_sec": rows / elapsed if elapsed else 0.0}
+
+
+def run_config(path: str = CONFIG_PATH, only: Optional[Sequence[str]] = None, nc_path: Optional[str] = None,
+               verbose: bool = True):
+    """Run every extract in the config (or just the ``only`` names); returns their stats."""
+    config = load_config(path)
+    names = {e.get("name") for e in config["extracts"]}
+    missing = set(only or ()) - names
+    if missing:
+        raise ValueError(f"no extract named {sorted(missing)} in {path} (have {sorted(n for n in names if n)})")
+    out = []
+    for spec in config["extracts"]:
+        if only and spec.get("name") not in only:
+            continue
+        stats = extract(spec, nc_path or config.get("source") or NC_PATH, config.get("regions"),
+                        depth_chunk=int(config.get("depth_chunk") or 5), verbose=verbose)
+        if verbose:
+            print(f"✅ {stats['rows']:,} rows -> {stats['out']} ({stats['format']}) in {stats['seconds']:.1f}s "
+                  f"({stats['rows_per_sec']:,.0f} rows/sec)")
+        out.append(stats)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream full-resolution regional subsets of the NetCDF grid")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run just these extracts from the config")
+    parser.add_argument("--nc", help="source NetCDF (default: config 'source')")
+    one = parser.add_argument_group("one-off extract (instead of the config's list)")
+    one.add_argument("--region", help=f"named region ({', '.join(sorted(REGIONS))} or one from the config)")
+    one.add_argument("--bbox", nargs=4, type=float, metavar=("LAT_MIN", "LAT_MAX", "LON_MIN", "LON_MAX"))
+    one.add_argument("--time", nargs=2, metavar=("START", "END"), help="dates, inclusive")
+    one.add_argument("--depth", nargs=2, type=float, metavar=("MIN", "MAX"))
+    one.add_argument("--out", help=".db => SQLite, .pkl => pickle, anything else => Parquet directory")
+    one.add_argument("--format", choices=STORE_FORMATS)
+    one.add_argument("--tile", type=float, help="(parquet) also partition by lat/lon tiles")
+    one.add_argument("--skip-nan", action="store_true", help="drop land/missing cells")
+    args = parser.parse_args()
+
+    if not (args.region or args.bbox):
+        run_config(args.config, args.only, args.nc)
+        return
+    if not args.out:
+        parser.error("--out is required with --region / --bbox")
+    regions = load_config(args.config).get("regions") if os.path.exists(args.config) else None
+    spec = {"region": args.region, "bbox": args.bbox, "time": args.time, "depth": args.depth, "out": args.out,
+            "format": args.format, "tile": args.tile, "skip_nan": args.skip_nan}
+    stats = extract(spec, args.nc or NC_PATH, regions)
+    print(f"✅ {stats['rows']:,} rows -> {stats['out']} ({stats['format']}) in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
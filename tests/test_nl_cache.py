@@ -0,0 +1,17 @@
+from nl_cache import cache_key, normalize_question
+
+
+def test_normalize_drops_filler_and_punctuation():
+    assert normalize_question("Please show me the average temperature!") == "average temperature"
+
+
+def test_normalize_keeps_comparison_operators():
+    assert normalize_question("rows where temperature>20") == "rows where temperature > 20"
+    assert normalize_question("lat <> 5") == normalize_question("lat != 5") == "lat != 5"
+    assert normalize_question("depth >= 100") == "depth >= 100"
+
+
+def test_comparison_variants_get_different_keys():
+    keys = {cache_key(f"rows where temperature {op} 20", "m", "s") for op in ("<", ">", "<=", ">=", "=", "!=")}
+    assert len(keys) == 6
+    assert cache_key("rows where temperature 20", "m", "s") not in keys
@@ -0,0 +1,25 @@
+import pytest
+
+from nl_templates import corpus_report, parse_question
+
+
+@pytest.mark.parametrize("question", ["average temperature on 2020-02-30",
+                                      "average temperature from 2020-01-01 to 2020-13-01"])
+def test_invalid_date_falls_back_to_llm(question):
+    assert parse_question(question) is None
+
+
+def test_valid_leap_day_is_parsed():
+    got = parse_question("average temperature on 2020-02-29")
+    assert got["params"] == ["2020-02-29 00:00:00", "2020-03-01 00:00:00"]
+
+
+@pytest.mark.parametrize("question, window", [("average temperature at 5 m", [2.5, 7.5]),
+                                              ("average temperature at 100 m", [90.0, 110.0])])
+def test_at_depth_uses_a_window(question, window):
+    assert parse_question(question)["params"] == window
+
+
+def test_corpus_matches_expected_sql():
+    report = corpus_report()
+    assert report["matches_expected"] == report["questions"], report["failures"]
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from sql_guard import QueryRejected, apply_limit, run_guarded, statement_end, strip_sql, table_rows
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, f"row {i}") for i in range(50)])
+    yield conn
+    conn.close()
+
+
+def test_apply_limit_trailing_semicolon(conn):
+    sql, added = apply_limit("SELECT * FROM t LIMIT 5;", 100)
+    assert (sql, added) == ("SELECT * FROM t LIMIT 5", False)
+    assert len(conn.execute(sql).fetchall()) == 5
+
+
+def test_apply_limit_trailing_line_comment(conn):
+    sql, added = apply_limit("SELECT 1 LIMIT 5 -- top", 100)
+    assert (sql, added) == ("SELECT 1 LIMIT 5", False)
+    conn.execute(sql)
+
+
+def test_apply_limit_adds_limit_after_semicolon_and_comment(conn):
+    sql, added = apply_limit("SELECT * FROM t; -- all rows", 10)
+    assert added
+    assert len(conn.execute(sql).fetchall()) == 10
+
+
+def test_apply_limit_wraps_bigger_limit(conn):
+    sql, added = apply_limit("SELECT * FROM t LIMIT 40 /* many */ ;", 10)
+    assert added
+    assert len(conn.execute(sql).fetchall()) == 10
+
+
+def test_statement_end_respects_quotes():
+    sql = "SELECT '--not a comment;' AS x -- real comment"
+    assert sql[:statement_end(sql)] == "SELECT '--not a comment;' AS x"
+
+
+def test_strip_sql():
+    assert strip_sql("  select a from t ;; -- done\n") == "select a from t"
+    with pytest.raises(QueryRejected):
+        strip_sql("-- nothing here;")
+    with pytest.raises(QueryRejected):
+        strip_sql("DELETE FROM t;")
+
+
+@pytest.mark.parametrize("sql", ["SELECT * FROM t LIMIT 5;", "SELECT * FROM t LIMIT 5 -- top"])
+def test_run_guarded_keeps_user_limit(conn, sql):
+    df, report = run_guarded(conn, sql, max_rows=100, max_scan_rows=None)
+    assert len(df) == 5
+    assert not report["limit_added"]
+
+
+def test_table_rows_rtree_uses_base_count_and_sees_other_writers(tmp_path):
+    path = str(tmp_path / "t.db")
+    writer = sqlite3.connect(path)
+    writer.execute("CREATE TABLE argo_data (lat REAL)")
+    writer.execute("CREATE VIRTUAL TABLE argo_data_rtree USING rtree(id, min_lat, max_lat)")
+    writer.executemany("INSERT INTO argo_data VALUES (?)", [(i,) for i in range(10)])
+    writer.commit()
+    reader = sqlite3.connect(path)
+    sizes = table_rows(reader)
+    assert sizes["argo_data"] == 10 and sizes["argo_data_rtree"] == 10
+    writer.executemany("INSERT INTO argo_data VALUES (?)", [(i,) for i in range(5)])
+    writer.commit()
+    assert table_rows(reader)["argo_data"] == 15
@@ -2,6 +2,10 @@
 import sqlite3
 import pandas as pd
 
+from meta import build_meta
+from profile_agg import build_profile_table
+from queries import build_indexes
+
 # DataFrame load karo (jo tu read_argo.py se bana raha hai)
 df = pd.read_pickle("argo_df.pkl")  # hum next step me save karenge
 
@@ -11,6 +15,14 @@ conn = sqlite3.connect("argo.db")
 # Data ko 'argo_data' table me daalo
 df.to_sql("argo_data", conn, if_exists="replace", index=False)
 
+# lat/lon/depth ke liye R*Tree aur (time, depth) index -- dashboard queries inhi se fast chalti hai
+build_indexes(conn, "argo_data")
+# depth profile panel ke liye (time, depth, tile) sums
+build_profile_table(conn, "argo_data")
+# sidebar ke liye bounds / histograms (argo_meta)
+build_meta(conn, "argo_data")
+conn.commit()
+
 conn.close()
 
 print("Data successfully inserted into argo.db")